@@ -1,11 +1,15 @@
 import os
+import json
 import logging
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from flask import Flask, Response, has_request_context, render_template, request, redirect, url_for, flash, jsonify, stream_with_context
 from werkzeug.middleware.proxy_fix import ProxyFix
-from calculator import MolarMassCalculator
+from calculator import MolarMassCalculator, molar_mass_cache
+from atomic_weights import DEFAULT_TABLE, available_tables
 
 # Set up logging
-logging.basicConfig(level=logging.DEBUG)
+from logging_setup import configure_logging
+configure_logging()
+logger = logging.getLogger(__name__)
 
 # Create the app
 app = Flask(__name__)
@@ -23,12 +27,148 @@ app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
 from models import db, SavedCompound, CalculationHistory, UserSettings
 db.init_app(app)
 
-# Initialize calculator
-calculator = MolarMassCalculator()
+# Background jobs for batches that outlive a request
+from jobs import JobQueue, job_to_dict, map_items
+job_queue = JobQueue()
+job_queue.init_app(app, db)
+
+# Request timing and /metrics endpoint
+import metrics
+metrics.init_app(app, db)
+
+# Per-request SQL query counting
+import query_counter
+query_counter.init_app(app, db)
+
+# Opt-in cProfile capture of individual requests
+import profiling
+profiling.init_app(app)
+
+# Opt-in tracemalloc diagnostics
+import memory_profiling
+memory_profiling.init_app(app)
+
+# Span trees for requests slower than SLOW_REQUEST_THRESHOLD_MS
+import slow_log
+slow_log.init_app(app, db)
+
+# Initialize calculator (default atomic-weight table; see request_calculator)
+calculator = MolarMassCalculator.for_table()
+memory_profiling.register_cache('molar_mass', molar_mass_cache)
+metrics.register_cache('molar_mass', molar_mass_cache)
+
+# Formulas are stored once and referenced from history by id
+import formula_table
+formula_registry = formula_table.FormulaRegistry(calculator)
+memory_profiling.register_cache('formula_ids', formula_registry)
+metrics.register_cache('formula_ids', formula_registry)
 
 # Import compound library after app setup
-from compound_library import CompoundLibrary
-compound_library = CompoundLibrary()
+from compound_library import CompoundLibrary, MAX_PAGE_SIZE
+import element_index
+import library_io
+import library_search
+from composition_index import CompositionIndex
+composition_index = CompositionIndex(calculator)
+memory_profiling.register_cache('composition_index', composition_index)
+compound_library = CompoundLibrary(calculator, composition_index)
+
+# Bundled dictionary of common compound names, memory-mapped read-only
+from compound_dictionary import CompoundDictionary
+compound_dictionary = CompoundDictionary()
+compound_dictionary.init_app(app)
+
+# Equation balancer shares the calculator's parser and mass table
+from equation_balancer import EquationBalancer
+equation_balancer = EquationBalancer(calculator)
+memory_profiling.register_cache('equation_balancer', equation_balancer)
+
+# Open reaction tables (stoichiometry sheets), kept in process memory
+from reaction_table import ReactionTableStore
+from plate_planner import PlatePlan, dilution_series
+reaction_tables = ReactionTableStore(calculator)
+memory_profiling.register_cache('reaction_tables', reaction_tables)
+
+# Isotope patterns; per-element distributions are cached across formulas
+import isotope_engine
+isotopes = isotope_engine.IsotopeEngine(calculator)
+memory_profiling.register_cache('isotope_elements', isotope_engine.element_distribution)
+metrics.register_cache('isotope_elements', isotope_engine.element_distribution)
+memory_profiling.register_cache('isotope_patterns', isotope_engine.composition_pattern)
+metrics.register_cache('isotope_patterns', isotope_engine.composition_pattern)
+
+from formula_search import FormulaSearch, JOB_MAX_TIME_BUDGET, search_formulas
+from empirical_formula import EmpiricalFormulaSolver
+
+def _job_list(params, key):
+    items = params.get(key)
+    if not isinstance(items, list):
+        raise ValueError(f"'{key}' must be a list")
+    return items
+
+def _isotope_options(params):
+    return {key: params[key] for key in ('resolution', 'threshold', 'charge', 'max_peaks') if key in params}
+
+def _search_options(params):
+    return {key: params[key] for key in ('tolerance', 'elements', 'limits', 'time_budget', 'heuristics')
+            if key in params}
+
+def _pin_table(params):
+    """Record the atomic-weight table in effect at submit time, so the job uses it"""
+    params['table'] = request_calculator(params).table_version
+
+def balance_job(params, progress):
+    calc = request_calculator(params)
+    return map_items(_job_list(params, 'equations'),
+                     lambda equation: equation_balancer.balance_many([equation], calculator=calc)[0], progress)
+
+def validate_balance_job(params):
+    _job_list(params, 'equations')
+    _pin_table(params)
+
+def isotopes_job(params, progress):
+    engine = isotope_engine.IsotopeEngine(request_calculator(params))
+    options = _isotope_options(params)
+    return map_items(_job_list(params, 'formulas'),
+                     lambda formula: engine.batch([formula], **options)[0], progress)
+
+def validate_isotopes_job(params):
+    _job_list(params, 'formulas')
+    isotope_engine.pattern_options(**_isotope_options(params))
+    _pin_table(params)
+
+def empirical_formula_job(params, progress):
+    solver = EmpiricalFormulaSolver(request_calculator(params))
+    return map_items(_job_list(params, 'samples'),
+                     lambda sample: solver.solve_many([sample])[0], progress)
+
+def validate_empirical_formula_job(params):
+    _job_list(params, 'samples')
+    _pin_table(params)
+
+def formula_search_job(params, progress):
+    max_results = int(params.get('max_results', 1000))
+    search = FormulaSearch(request_calculator(params), params.get('mass', 0),
+                           max_time_budget=JOB_MAX_TIME_BUDGET, **_search_options(params))
+    progress(0, max_results)
+    for index, candidate in enumerate(search):
+        if index >= max_results:
+            break
+        yield candidate
+        progress(index + 1, max_results)
+
+def validate_formula_search_job(params):
+    _pin_table(params)
+    if int(params.get('max_results', 1000)) <= 0:
+        raise ValueError("max_results must be positive")
+    # The constructor checks every option without searching
+    FormulaSearch(request_calculator(params), params.get('mass', 0),
+                  max_time_budget=JOB_MAX_TIME_BUDGET, **_search_options(params))
+
+job_queue.register('balance', balance_job, validate_balance_job)
+job_queue.register('isotopes', isotopes_job, validate_isotopes_job)
+job_queue.register('empirical_formula', empirical_formula_job, validate_empirical_formula_job)
+job_queue.register('formula_search', formula_search_job, validate_formula_search_job)
 
 def get_setting(key, default):
     """Get a setting value from database"""
@@ -46,25 +186,34 @@ def set_setting(key, value):
         db.session.add(setting)
     db.session.commit()
 
-def save_calculation(formula, mode, molar_mass, input_value=None, result_value=None, unit='mol'):
+def save_calculation(formula, mode, molar_mass, input_value=None, result_value=None, unit='mol',
+                     atomic_weight_table=None):
     """Save calculation to history"""
     try:
         history = CalculationHistory(
-            formula=formula,
+            formula_id=formula_registry.intern(formula),
             mode=mode,
             molar_mass=molar_mass,
+            atomic_weight_table=atomic_weight_table,
             input_value=input_value,
             result_value=result_value,
             unit=unit
         )
-        db.session.add(history)
-        db.session.commit()
+        with slow_log.span('history_commit'):
+            db.session.add(history)
+            db.session.commit()
+        metrics.record_history_write(True)
     except Exception as e:
         db.session.rollback()
-        print(f"Error saving calculation history: {e}")
+        metrics.record_history_write(False)
+        logger.error("Error saving calculation history: %s", e)
 
 with app.app_context():
     db.create_all()
+    formula_table.migrate(formula_registry)
+    element_index.backfill(calculator)
+    compound_library.search = library_search.create_search(db.engine)
+    job_queue.recover()
     # Set default settings if they don't exist
     if not UserSettings.query.filter_by(setting_key='default_unit').first():
         set_setting('default_unit', 'mmol')
@@ -85,9 +234,8 @@ def calculate():
     """Handle all calculation modes"""
     if request.method == 'GET':
         mode = request.args.get('mode', '1')
-        library_compounds = compound_library.get_all_compounds()
         default_unit = get_setting('default_unit', 'mmol')
-        return render_template('calculate.html', mode=mode, library_compounds=library_compounds, default_unit=default_unit)
+        return render_template('calculate.html', mode=mode, default_unit=default_unit)
     
     mode = request.form.get('mode', '1')
     compound = request.form.get('compound', '').strip()
@@ -96,36 +244,46 @@ def calculate():
     
     if not compound:
         flash('Please enter a chemical formula.', 'error')
-        library_compounds = compound_library.get_all_compounds()
-        return render_template('calculate.html', mode=mode, library_compounds=library_compounds, default_unit=unit)
+        return render_template('calculate.html', mode=mode, default_unit=unit)
     
     try:
         results = {}
+        calc = request_calculator()
         
         # Parse and validate formula
-        element_counts = calculator.parse_formula(compound)
+        with metrics.stage('parse'):
+            element_counts = calc.parse_formula(compound)
+        if not element_counts or not calc.validate_elements(element_counts):
+            # Not a formula; it may be a compound name such as "sodium chloride"
+            resolved = resolve_compound_name(compound)
+            if resolved:
+                name, compound = resolved
+                flash(f"Using formula {compound} for '{name}'.", 'info')
+                with metrics.stage('parse'):
+                    element_counts = calc.parse_formula(compound)
         if not element_counts:
             flash('Invalid chemical formula. Please check your input.', 'error')
-            library_compounds = compound_library.get_all_compounds()
-            return render_template('calculate.html', mode=mode, compound=compound, library_compounds=library_compounds, default_unit=unit)
+            return render_template('calculate.html', mode=mode, compound=compound, default_unit=unit)
         
-        if not calculator.validate_elements(element_counts):
+        if not calc.validate_elements(element_counts):
             flash('Invalid element detected in formula. Please use valid element symbols.', 'error')
-            library_compounds = compound_library.get_all_compounds()
-            return render_template('calculate.html', mode=mode, compound=compound, library_compounds=library_compounds, default_unit=unit)
+            return render_template('calculate.html', mode=mode, compound=compound, default_unit=unit)
         
         # Calculate molar mass
-        molar_mass = calculator.calculate_molar_mass(compound)
+        with metrics.stage('parse'):
+            molar_mass = calc.calculate_molar_mass(compound)
         results['compound'] = compound
         results['molar_mass'] = molar_mass
         results['element_counts'] = element_counts
         results['unit'] = unit
+        results['atomic_weight_table'] = calc.table.name
+        results['atomic_weight_table_version'] = calc.table_version
         
         # Verbose mode calculations
         if verbose:
             verbose_calc = []
             for element, count in element_counts.items():
-                mass = calculator.element_masses[element]
+                mass = calc.element_masses[element]
                 total = mass * count
                 verbose_calc.append({
                     'element': element,
@@ -137,63 +295,89 @@ def calculate():
         
         if mode == '1':
             # Molar mass only
-            save_calculation(compound, mode, molar_mass, unit=unit)
+            save_calculation(compound, mode, molar_mass, unit=unit, atomic_weight_table=calc.table_version)
             
         elif mode == '2':
             # Molar mass and reagent mass
             moles_str = request.form.get('moles', '').strip()
             if not moles_str:
                 flash('Please enter the number of moles.', 'error')
-                library_compounds = compound_library.get_all_compounds()
-                return render_template('calculate.html', mode=mode, compound=compound, library_compounds=library_compounds, default_unit=unit)
+                return render_template('calculate.html', mode=mode, compound=compound, default_unit=unit)
             
             try:
                 moles_input = float(moles_str)
                 # Convert mmol to mol if needed
                 moles_for_calc = moles_input / 1000 if unit == 'mmol' else moles_input
-                reagent_mass = calculator.calculate_reagent_mass(moles_for_calc, compound)
+                with metrics.stage('parse'):
+                    reagent_mass = calc.calculate_reagent_mass(moles_for_calc, compound)
                 results['moles_input'] = moles_input
                 results['reagent_mass'] = reagent_mass
-                save_calculation(compound, mode, molar_mass, moles_input, reagent_mass, unit)
+                save_calculation(compound, mode, molar_mass, moles_input, reagent_mass, unit, calc.table_version)
             except ValueError:
                 flash('Please enter a valid number for moles.', 'error')
-                library_compounds = compound_library.get_all_compounds()
-                return render_template('calculate.html', mode=mode, compound=compound, library_compounds=library_compounds, default_unit=unit)
+                return render_template('calculate.html', mode=mode, compound=compound, default_unit=unit)
                 
         elif mode == '3':
             # Calculate moles from reagent mass
             mass_str = request.form.get('mass', '').strip()
             if not mass_str:
                 flash('Please enter the mass.', 'error')
-                library_compounds = compound_library.get_all_compounds()
-                return render_template('calculate.html', mode=mode, compound=compound, library_compounds=library_compounds, default_unit=unit)
+                return render_template('calculate.html', mode=mode, compound=compound, default_unit=unit)
             
             try:
                 mass = float(mass_str)
-                moles_calc = calculator.calculate_moles(mass, compound)
+                with metrics.stage('parse'):
+                    moles_calc = calc.calculate_moles(mass, compound)
                 # Convert mol to mmol if needed
                 moles_display = moles_calc * 1000 if unit == 'mmol' else moles_calc
                 results['mass'] = mass
                 results['calculated_moles'] = moles_display
-                save_calculation(compound, mode, molar_mass, mass, moles_display, unit)
+                save_calculation(compound, mode, molar_mass, mass, moles_display, unit, calc.table_version)
             except ValueError:
                 flash('Please enter a valid number for mass.', 'error')
-                library_compounds = compound_library.get_all_compounds()
-                return render_template('calculate.html', mode=mode, compound=compound, library_compounds=library_compounds, default_unit=unit)
+                return render_template('calculate.html', mode=mode, compound=compound, default_unit=unit)
         
-        library_compounds = compound_library.get_all_compounds()
-        return render_template('calculate.html', mode=mode, results=results, verbose=verbose, library_compounds=library_compounds, default_unit=unit)
+        return render_template('calculate.html', mode=mode, results=results, verbose=verbose, default_unit=unit)
         
     except Exception as e:
         flash(f'An error occurred during calculation: {str(e)}', 'error')
-        library_compounds = compound_library.get_all_compounds()
-        return render_template('calculate.html', mode=mode, compound=compound, library_compounds=library_compounds, default_unit=unit)
+        return render_template('calculate.html', mode=mode, compound=compound, default_unit=unit)
+
+def resolve_compound_name(text):
+    """(name, formula) for a compound name entered in place of a formula: the
+    user's library first, then the bundled dictionary; None if neither has it"""
+    with metrics.stage('search'):
+        compound = compound_library.find_by_name(text)
+        if compound:
+            return compound['name'], compound['formula']
+        entry = compound_dictionary.lookup(text)
+    if entry:
+        return entry['name'], entry['formula']
+    return None
+
+def request_calculator(data=None):
+    """Calculator for the atomic-weight table named by the request's 'table'
+    parameter, falling back to the saved setting"""
+    version = (data or {}).get('table')
+    if not version and has_request_context():
+        version = request.values.get('table')
+    if not version:
+        version = get_setting('atomic_weight_table', DEFAULT_TABLE)
+    if not isinstance(version, str):
+        raise ValueError("Atomic weight table must be a table version name")
+    return MolarMassCalculator.for_table(version)
+
+def flash_same_composition(formula, name):
+    """Warn when the library already holds this compound under another name"""
+    duplicates = compound_library.find_same_composition(formula, exclude_name=name)
+    if duplicates:
+        names = ', '.join(f"{compound['name']} ({compound['formula']})" for compound in duplicates)
+        flash(f'Note: the library already has a compound with the same composition: {names}.', 'warning')
 
 @app.route('/library')
 def library():
-    """Display compound library"""
-    compounds = compound_library.get_all_compounds()
-    return render_template('library.html', compounds=compounds)
+    """Display compound library; rows are loaded page by page from /api/library"""
+    return render_template('library.html')
 
 @app.route('/library/add', methods=['POST'])
 def add_compound():
@@ -205,19 +389,28 @@ def add_compound():
         flash('Please provide both name and formula.', 'error')
         return redirect(url_for('library'))
     
+    try:
+        calc = request_calculator()
+    except ValueError as e:
+        flash(str(e), 'error')
+        return redirect(url_for('library'))
+
     # Validate formula
-    element_counts = calculator.parse_formula(formula)
-    if not element_counts or not calculator.validate_elements(element_counts):
+    with metrics.stage('parse'):
+        element_counts = calc.parse_formula(formula)
+    if not element_counts or not calc.validate_elements(element_counts):
         flash('Invalid chemical formula. Please check your input.', 'error')
         return redirect(url_for('library'))
     
     # Calculate molar mass
-    molar_mass = calculator.calculate_molar_mass(formula)
+    with metrics.stage('parse'):
+        molar_mass = calc.calculate_molar_mass(formula)
     
     # Add to library
-    success = compound_library.add_compound(name, formula, molar_mass)
+    success = compound_library.add_compound(name, formula, molar_mass, calc.table_version)
     if success:
         flash(f'Added {name} ({formula}) to library.', 'success')
+        flash_same_composition(formula, name)
     else:
         flash('Compound with this name already exists.', 'error')
     
@@ -240,9 +433,8 @@ def use_compound(compound_id):
     compound = compound_library.get_compound(compound_id)
     if compound:
         mode = request.args.get('mode', '1')
-        library_compounds = compound_library.get_all_compounds()
         default_unit = get_setting('default_unit', 'mmol')
-        return render_template('calculate.html', mode=mode, compound=compound['formula'], library_compounds=library_compounds, default_unit=default_unit)
+        return render_template('calculate.html', mode=mode, compound=compound['formula'], default_unit=default_unit)
     else:
         flash('Compound not found.', 'error')
         return redirect(url_for('library'))
@@ -253,19 +445,70 @@ def add_to_library_from_result():
     name = request.form.get('name', '').strip()
     formula = request.form.get('formula', '').strip()
     molar_mass = float(request.form.get('molar_mass', 0))
+    # Table the result was computed with; unknown values are stored as NULL
+    table = request.form.get('table')
+    table = table if any(entry['version'] == table for entry in available_tables()) else None
     
     if not name or not formula:
         flash('Please provide both name and formula.', 'error')
         return redirect(request.referrer or url_for('index'))
     
-    success = compound_library.add_compound(name, formula, molar_mass)
+    success = compound_library.add_compound(name, formula, molar_mass, table)
     if success:
         flash(f'Added {name} ({formula}) to library.', 'success')
+        flash_same_composition(formula, name)
     else:
         flash('Compound with this name already exists.', 'error')
     
     return redirect(request.referrer or url_for('index'))
 
+def read_library_import():
+    """Records and conflict policy of an import request: an uploaded file,
+    a JSON body, or a raw CSV/JSON body"""
+    on_conflict = request.values.get('on_conflict', 'skip')
+    upload = request.files.get('file')
+    if upload and upload.filename:
+        format_name = library_io.detect_format(request.values.get('format'), upload.filename, upload.content_type)
+        return library_io.parse_import(upload.read().decode('utf-8-sig'), format_name), on_conflict
+    if request.is_json:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            on_conflict = data.get('on_conflict', on_conflict)
+        return library_io.parse_import(json.dumps(data), 'json'), on_conflict
+    format_name = library_io.detect_format(request.values.get('format'), content_type=request.content_type)
+    return library_io.parse_import(request.get_data(as_text=True), format_name), on_conflict
+
+@app.route('/library/import', methods=['POST'])
+def import_library():
+    """Import compounds from an uploaded CSV or JSON file"""
+    try:
+        records, on_conflict = read_library_import()
+        with metrics.stage('import'):
+            report = compound_library.import_compounds(records, on_conflict)
+    except ValueError as e:
+        flash(f'Import failed: {e}', 'error')
+        return redirect(url_for('library'))
+
+    flash(f"Imported {report['added']} new, updated {report['updated']}, "
+          f"skipped {report['skipped']} existing compound(s).", 'success')
+    for error in report['errors'][:5]:
+        flash(f"Row {error['row']}: {error['error']}", 'error')
+    if len(report['errors']) > 5:
+        flash(f"{len(report['errors']) - 5} more row(s) had errors.", 'error')
+    return redirect(url_for('library'))
+
+@app.route('/library/export')
+def export_library():
+    """Stream the whole library as CSV or JSON"""
+    try:
+        format_name = library_io.detect_format(request.args.get('format', 'csv'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    chunks = library_io.iter_export(compound_library.iter_compounds(), format_name)
+    return Response(stream_with_context(chunks),
+                    mimetype='application/json' if format_name == 'json' else 'text/csv',
+                    headers={'Content-Disposition': f'attachment; filename=compound_library.{format_name}'})
+
 @app.route('/history')
 def history():
     """Display calculation history"""
@@ -321,22 +564,442 @@ def settings():
             'default_unit': get_setting('default_unit', 'mmol'),
             'precision_molar_mass': get_setting('precision_molar_mass', '3'),
             'precision_reagent_mass': get_setting('precision_reagent_mass', '4'),
-            'precision_moles': get_setting('precision_moles', '6')
+            'precision_moles': get_setting('precision_moles', '6'),
+            'atomic_weight_table': get_setting('atomic_weight_table', DEFAULT_TABLE)
         }
-        return render_template('settings.html', settings=current_settings)
+        return render_template('settings.html', settings=current_settings, atomic_weight_tables=available_tables())
     
-    # Update settings
+    # Update settings, checking the table before anything is saved
     try:
-        set_setting('default_unit', request.form.get('default_unit', 'mmol'))
-        set_setting('precision_molar_mass', request.form.get('precision_molar_mass', '3'))
-        set_setting('precision_reagent_mass', request.form.get('precision_reagent_mass', '4'))
-        set_setting('precision_moles', request.form.get('precision_moles', '6'))
-        
-        flash('Settings saved successfully.', 'success')
-    except Exception as e:
-        flash('Failed to save settings.', 'error')
+        table = MolarMassCalculator.for_table(request.form.get('atomic_weight_table') or DEFAULT_TABLE)
+    except ValueError as e:
+        flash(f'Failed to save settings: {e}', 'error')
+        return redirect(url_for('settings'))
+
+    set_setting('default_unit', request.form.get('default_unit', 'mmol'))
+    set_setting('precision_molar_mass', request.form.get('precision_molar_mass', '3'))
+    set_setting('precision_reagent_mass', request.form.get('precision_reagent_mass', '4'))
+    set_setting('precision_moles', request.form.get('precision_moles', '6'))
+    set_setting('atomic_weight_table', table.table_version)
+    flash('Settings saved successfully.', 'success')
     
     return redirect(url_for('settings'))
 
+@app.route('/api/balance', methods=['POST'])
+def api_balance():
+    """Balance one equation, or a batch when an 'equations' list is given"""
+    data = request.get_json(silent=True) or request.form.to_dict()
+    if not isinstance(data, dict):
+        return jsonify({'error': "Provide a JSON object"}), 400
+    try:
+        calc = request_calculator(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if 'equations' in data:
+        equations = data['equations']
+        if not isinstance(equations, list):
+            return jsonify({'error': "'equations' must be a list"}), 400
+        with metrics.stage('balance'):
+            results = equation_balancer.balance_many(equations, calculator=calc)
+        for result in results:
+            if 'cached' in result:
+                metrics.record_cache('balance', result['cached'])
+        return jsonify({'results': results})
+
+    try:
+        with metrics.stage('balance'):
+            if data.get('equation'):
+                result = equation_balancer.balance(data['equation'], calculator=calc)
+            elif isinstance(data.get('reactants'), list) and isinstance(data.get('products'), list):
+                result = equation_balancer.balance(data['reactants'], data['products'], calculator=calc)
+            else:
+                return jsonify({'error': "Provide 'equation', or 'reactants' and 'products'"}), 400
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    metrics.record_cache('balance', result['cached'])
+    return jsonify(result)
+
+def _add_table_row(table, data):
+    """Add a row from a JSON payload, return (row id, changed cells)"""
+    return table.add_row(
+        data.get('formula', ''),
+        role=data.get('role', 'reactant'),
+        basis=data.get('basis'),
+        equivalents=data.get('equivalents'),
+        density=data.get('density'),
+        molarity=data.get('molarity'),
+        row_id=data.get('id'),
+        moles=data.get('moles'),
+        mass=data.get('mass'),
+        volume=data.get('volume')
+    )
+
+@app.route('/api/reaction-tables', methods=['POST'])
+def api_create_reaction_table():
+    """Create a reaction table, optionally with initial rows"""
+    data = request.get_json(silent=True) or {}
+    table_id, table = reaction_tables.create()
+    try:
+        with table.lock:
+            for row in data.get('rows', []):
+                _add_table_row(table, row)
+    except (ValueError, TypeError) as e:
+        reaction_tables.delete(table_id)
+        return jsonify({'error': str(e)}), 400
+    return jsonify(dict(table.to_dict(), id=table_id)), 201
+
+@app.route('/api/reaction-tables/<table_id>', methods=['GET', 'DELETE'])
+def api_reaction_table(table_id):
+    """Fetch or discard a reaction table"""
+    if request.method == 'DELETE':
+        if reaction_tables.delete(table_id):
+            return jsonify({'deleted': table_id})
+        return jsonify({'error': 'Reaction table not found'}), 404
+
+    table = reaction_tables.get(table_id)
+    if table is None:
+        return jsonify({'error': 'Reaction table not found'}), 404
+    with table.lock:
+        return jsonify(dict(table.to_dict(), id=table_id))
+
+@app.route('/api/reaction-tables/<table_id>/rows', methods=['POST'])
+def api_add_reaction_table_row(table_id):
+    """Add a row, return only the cells that changed"""
+    table = reaction_tables.get(table_id)
+    if table is None:
+        return jsonify({'error': 'Reaction table not found'}), 404
+    try:
+        with table.lock:
+            row_id, changed = _add_table_row(table, request.get_json(silent=True) or {})
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'row': row_id, 'changed': changed}), 201
+
+@app.route('/api/reaction-tables/<table_id>/rows/<row_id>', methods=['DELETE'])
+def api_delete_reaction_table_row(table_id, row_id):
+    """Remove a row, return only the cells that changed"""
+    table = reaction_tables.get(table_id)
+    if table is None:
+        return jsonify({'error': 'Reaction table not found'}), 404
+    try:
+        with table.lock:
+            changed = table.remove_row(row_id)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'changed': changed})
+
+@app.route('/api/reaction-tables/<table_id>/cells', methods=['PATCH'])
+def api_edit_reaction_table_cells(table_id):
+    """Apply cell edits, return only the cells that changed"""
+    table = reaction_tables.get(table_id)
+    if table is None:
+        return jsonify({'error': 'Reaction table not found'}), 404
+
+    data = request.get_json(silent=True) or {}
+    edits = data.get('edits')
+    if edits is None and 'row' in data:
+        edits = [data]
+    if not isinstance(edits, list):
+        return jsonify({'error': "Provide 'edits' as a list of {row, field, value}"}), 400
+
+    try:
+        with table.lock, metrics.stage('reaction_table'):
+            changed = table.set_cells([(edit['row'], edit['field'], edit.get('value')) for edit in edits])
+    except (KeyError, TypeError) as e:
+        return jsonify({'error': f'Malformed edit: {e}'}), 400
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'changed': changed})
+
+@app.route('/api/plate-plan', methods=['POST'])
+def api_plate_plan():
+    """Reagent mass for every well of a plate plan, as JSON or CSV"""
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': "Provide a JSON object"}), 400
+
+    try:
+        compound_ids = [int(compound_id) for compound_id in data.get('compound_ids', [])]
+        compounds = compound_library.get_compounds_by_ids(compound_ids)
+        missing = set(compound_ids) - {compound['id'] for compound in compounds}
+        if missing:
+            return jsonify({'error': f"Unknown compound ids: {', '.join(str(i) for i in sorted(missing))}"}), 400
+
+        calc = request_calculator(data)
+        # Stored masses follow the table active when the compound was saved
+        for compound in compounds:
+            if compound['atomic_weight_table'] != calc.table_version \
+                    and calc.element_counts(compound['formula']) is not None:
+                compound['molar_mass'] = calc.calculate_molar_mass(compound['formula'])
+        for formula in data.get('formulas', []):
+            if calc.element_counts(formula) is None:
+                return jsonify({'error': f"Invalid chemical formula: {formula}"}), 400
+            formula = formula.strip()
+            compounds.append({'name': formula, 'formula': formula,
+                              'molar_mass': calc.calculate_molar_mass(formula)})
+
+        if 'dilution' in data:
+            dilution = data['dilution']
+            concentrations = dilution_series(float(dilution['top_mM']), float(dilution['factor']),
+                                             int(dilution['steps']))
+        else:
+            concentrations = [float(value) for value in data.get('concentrations_mM', [])]
+        volumes = [float(value) for value in data.get('volumes_uL', [])]
+
+        with metrics.stage('plate_plan'):
+            plan = PlatePlan(compounds, concentrations, volumes, int(data.get('plate_size', 96)))
+    except (KeyError, TypeError) as e:
+        return jsonify({'error': f'Malformed plate plan request: {e}'}), 400
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if data.get('format') == 'csv' or request.args.get('format') == 'csv':
+        return Response(plan.iter_csv(), mimetype='text/csv',
+                        headers={'Content-Disposition': 'attachment; filename=plate_plan.csv'})
+    return jsonify(plan.to_dict())
+
+@app.route('/api/isotopes', methods=['POST'])
+def api_isotopes():
+    """Monoisotopic mass and isotope pattern, batched when 'formulas' is given"""
+    data = request.get_json(silent=True) or request.form.to_dict()
+    if not isinstance(data, dict):
+        return jsonify({'error': "Provide a JSON object"}), 400
+    options = {key: data[key] for key in ('resolution', 'threshold', 'charge', 'max_peaks') if key in data}
+
+    try:
+        with metrics.stage('isotopes'):
+            if 'formulas' in data:
+                if not isinstance(data['formulas'], list):
+                    return jsonify({'error': "'formulas' must be a list"}), 400
+                return jsonify({'results': isotopes.batch(data['formulas'], **options)})
+            if not data.get('formula'):
+                return jsonify({'error': "Provide 'formula' or 'formulas'"}), 400
+            return jsonify(isotopes.pattern(data['formula'], **options))
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/formula-search', methods=['POST'])
+def api_formula_search():
+    """Candidate formulas for a molar mass, best match first (JSON, or streamed NDJSON)"""
+    data = request.get_json(silent=True) or request.form.to_dict()
+    if 'mass' not in data:
+        return jsonify({'error': "Provide the target 'mass'"}), 400
+
+    options = {key: data[key] for key in ('tolerance', 'limits', 'time_budget') if key in data}
+    elements = data.get('elements')
+    if isinstance(elements, str):
+        # Accept 'C,H,N,O' as well as a JSON list
+        elements = [element.strip() for element in elements.split(',') if element.strip()]
+    options['elements'] = elements
+    options['heuristics'] = data.get('heuristics', True) not in (False, 'false', '0', 0)
+
+    try:
+        calc = request_calculator(data)
+        max_results = int(data.get('max_results', 50))
+        if data.get('format') == 'ndjson' or request.args.get('format') == 'ndjson':
+            search = FormulaSearch(calc, data['mass'], **options)
+
+            def stream():
+                for index, candidate in enumerate(search):
+                    if index >= max_results:
+                        break
+                    yield json.dumps(candidate) + '\n'
+                yield json.dumps({'complete': not search.timed_out}) + '\n'
+
+            return Response(stream(), mimetype='application/x-ndjson')
+
+        with metrics.stage('formula_search'):
+            results, timed_out = search_formulas(calc, data['mass'], max_results=max_results, **options)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'results': results, 'complete': not timed_out})
+
+@app.route('/api/empirical-formula', methods=['POST'])
+def api_empirical_formula():
+    """Empirical formula candidates from percent composition, batched when 'samples' is given"""
+    data = request.get_json(silent=True) or {}
+    try:
+        solver = EmpiricalFormulaSolver(request_calculator(data))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if 'samples' in data:
+        if not isinstance(data['samples'], list):
+            return jsonify({'error': "'samples' must be a list"}), 400
+        with metrics.stage('empirical_formula'):
+            return jsonify({'results': solver.solve_many(data['samples'])})
+
+    try:
+        with metrics.stage('empirical_formula'):
+            result = solver.solve(
+                data.get('percentages'),
+                remainder=data.get('remainder'),
+                molar_mass=data.get('molar_mass'),
+                max_denominator=data.get('max_denominator', 12),
+                max_candidates=data.get('max_candidates', 5))
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(result)
+
+@app.route('/api/library/match', methods=['POST'])
+def api_library_match():
+    """Rank library compounds by closeness to measured elemental percentages"""
+    data = request.get_json(silent=True) or {}
+
+    try:
+        with metrics.stage('library_match'):
+            matches = composition_index.match(data.get('percentages'),
+                                              limit=data.get('limit', 10),
+                                              metric=data.get('metric', 'max'),
+                                              complete=bool(data.get('complete', False)))
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'matches': matches})
+
+@app.route('/api/library/import', methods=['POST'])
+def api_library_import():
+    """Import compounds, reporting added/updated/skipped counts and per-row errors"""
+    try:
+        records, on_conflict = read_library_import()
+        with metrics.stage('import'):
+            report = compound_library.import_compounds(records, on_conflict)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(report)
+
+@app.route('/api/library')
+def api_library():
+    """Paginated library listing with sort, search and element filters"""
+    query = request.args.get('q', '').strip()
+    page = max(1, request.args.get('page', 1, type=int))
+    per_page = max(1, min(request.args.get('per_page', 50, type=int), MAX_PAGE_SIZE))
+    try:
+        with metrics.stage('search'):
+            compounds, total = compound_library.list_compounds(
+                page=page,
+                per_page=per_page,
+                sort=request.args.get('sort', 'relevance' if query else 'name'),
+                order=request.args.get('order', 'asc'),
+                query=query,
+                include=[element for element in request.args.get('include', '').split(',') if element],
+                exclude=[element for element in request.args.get('exclude', '').split(',') if element],
+                counts=element_index.parse_count_ranges(request.args.get('counts')))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    for compound in compounds:
+        compound['created_at'] = compound['created_at'].isoformat() if compound['created_at'] else None
+    return jsonify({'compounds': compounds, 'total': total, 'page': page, 'per_page': per_page})
+
+@app.route('/api/library/search')
+def api_library_search():
+    """Ranked name/formula search with prefix and fuzzy matching"""
+    limit = max(1, min(request.args.get('limit', 20, type=int), 200))
+    with metrics.stage('search'):
+        compounds = compound_library.search_compounds(request.args.get('q', ''), limit)
+    for compound in compounds:
+        compound['created_at'] = compound['created_at'].isoformat() if compound['created_at'] else None
+    return jsonify({'compounds': compounds, 'backend': compound_library.search.name})
+
+@app.route('/api/compounds/typeahead')
+def api_compound_typeahead():
+    """Name suggestions for a partly typed compound: library matches, then the bundled dictionary"""
+    query = request.args.get('q', '').strip()
+    limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+    suggestions = []
+    with metrics.stage('search'):
+        for compound in compound_library.search_compounds(query, limit):
+            if compound['match'] != 'fuzzy':
+                suggestions.append({'name': compound['name'], 'formula': compound['formula'],
+                                    'synonym': compound['name'], 'source': 'library'})
+        seen = {(suggestion['name'].lower(), suggestion['formula']) for suggestion in suggestions}
+        for entry in compound_dictionary.prefix(query, limit):
+            if len(suggestions) >= limit:
+                break
+            if (entry['name'].lower(), entry['formula']) not in seen:
+                suggestions.append(dict(entry, source='dictionary'))
+    return jsonify({'query': query, 'suggestions': suggestions})
+
+@app.route('/api/library/elements')
+def api_library_elements():
+    """Library compounds by element content, e.g. ?include=Pd&exclude=halogens&counts=C:6-10"""
+    limit = max(1, min(request.args.get('limit', 100, type=int), 1000))
+    offset = max(0, request.args.get('offset', 0, type=int))
+    try:
+        with metrics.stage('search'):
+            compounds, total = compound_library.find_by_elements(
+                include=request.args.get('include', '').split(','),
+                exclude=request.args.get('exclude', '').split(','),
+                counts=element_index.parse_count_ranges(request.args.get('counts')),
+                limit=limit, offset=offset)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    for compound in compounds:
+        compound['created_at'] = compound['created_at'].isoformat() if compound['created_at'] else None
+    return jsonify({'compounds': compounds, 'total': total, 'limit': limit, 'offset': offset})
+
+@app.route('/api/jobs', methods=['POST'])
+def api_submit_job():
+    """Queue a background job, poll it at the returned status URL"""
+    data = request.get_json(silent=True) or {}
+    try:
+        job = job_queue.submit(data.get('kind'), data.get('params', {}))
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    result = job_to_dict(job)
+    result['status_url'] = url_for('api_job_status', job_id=job.id)
+    result['result_url'] = url_for('api_job_result', job_id=job.id)
+    return jsonify(result), 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def api_job_status(job_id):
+    """Status and progress of a job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job_to_dict(job))
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+def api_job_result(job_id):
+    """Stream a finished job's results as NDJSON"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job.status != 'succeeded':
+        return jsonify({'error': f'Job is {job.status}', 'status': job.status}), 409
+    return Response(job_queue.iter_results(job), mimetype='application/x-ndjson')
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def api_cancel_job(job_id):
+    """Cancel a queued or running job"""
+    job = job_queue.cancel(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job_to_dict(job))
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def api_delete_job(job_id):
+    """Delete a finished job and its result file"""
+    try:
+        deleted = job_queue.delete(job_id)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 409
+    if not deleted:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify({'deleted': job_id})
+
+@app.route('/api/history/formulas')
+def api_history_formulas():
+    """Most calculated formulas, counted per Formula id"""
+    limit = request.args.get('limit', 20, type=int)
+    return jsonify({'formulas': formula_registry.usage(max(1, min(limit, 500)))})
+
+@app.route('/api/atomic-weight-tables')
+def api_atomic_weight_tables():
+    """Selectable atomic-weight tables and the current default"""
+    return jsonify({'tables': available_tables(),
+                    'default': get_setting('atomic_weight_table', DEFAULT_TABLE)})
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,127 @@
+"""
+Atomic Weights - Registry of atomic-weight tables covering all 118 elements
+
+Each table is built once at import into an immutable form: a read-only NumPy
+array indexed by atomic number - 1, plus a read-only symbol -> weight mapping
+over the same values for code that looks weights up by symbol. Tables are
+identified by a version string, which is also part of every cache key that
+depends on weights, so switching tables never mixes results.
+
+Tables:
+    iupac1995   Atomic Weights of the Elements 1995 (IUPAC), the app's original
+                table; elements it does not list use the iupac2021 values
+    iupac2021   IUPAC/CIAAW 2021 abridged standard atomic weights
+    integer     iupac2021 rounded to whole numbers, for quick estimates
+
+Elements without stable isotopes use the mass number of their longest-lived
+isotope, as in the IUPAC periodic table.
+"""
+from types import MappingProxyType
+
+import numpy as np
+
+SYMBOLS = (
+    'H', 'He', 'Li', 'Be', 'B', 'C', 'N', 'O', 'F', 'Ne',
+    'Na', 'Mg', 'Al', 'Si', 'P', 'S', 'Cl', 'Ar', 'K', 'Ca',
+    'Sc', 'Ti', 'V', 'Cr', 'Mn', 'Fe', 'Co', 'Ni', 'Cu', 'Zn',
+    'Ga', 'Ge', 'As', 'Se', 'Br', 'Kr', 'Rb', 'Sr', 'Y', 'Zr',
+    'Nb', 'Mo', 'Tc', 'Ru', 'Rh', 'Pd', 'Ag', 'Cd', 'In', 'Sn',
+    'Sb', 'Te', 'I', 'Xe', 'Cs', 'Ba', 'La', 'Ce', 'Pr', 'Nd',
+    'Pm', 'Sm', 'Eu', 'Gd', 'Tb', 'Dy', 'Ho', 'Er', 'Tm', 'Yb',
+    'Lu', 'Hf', 'Ta', 'W', 'Re', 'Os', 'Ir', 'Pt', 'Au', 'Hg',
+    'Tl', 'Pb', 'Bi', 'Po', 'At', 'Rn', 'Fr', 'Ra', 'Ac', 'Th',
+    'Pa', 'U', 'Np', 'Pu', 'Am', 'Cm', 'Bk', 'Cf', 'Es', 'Fm',
+    'Md', 'No', 'Lr', 'Rf', 'Db', 'Sg', 'Bh', 'Hs', 'Mt', 'Ds',
+    'Rg', 'Cn', 'Nh', 'Fl', 'Mc', 'Lv', 'Ts', 'Og',
+)
+
+ATOMIC_NUMBERS = MappingProxyType({symbol: index + 1 for index, symbol in enumerate(SYMBOLS)})
+
+# IUPAC/CIAAW 2021 abridged standard atomic weights, in atomic-number order
+IUPAC_2021 = (
+    1.008, 4.0026, 6.94, 9.0122, 10.81, 12.011, 14.007, 15.999, 18.998, 20.180,
+    22.990, 24.305, 26.982, 28.085, 30.974, 32.06, 35.45, 39.95, 39.098, 40.078,
+    44.956, 47.867, 50.942, 51.996, 54.938, 55.845, 58.933, 58.693, 63.546, 65.38,
+    69.723, 72.630, 74.922, 78.971, 79.904, 83.798, 85.468, 87.62, 88.906, 91.224,
+    92.906, 95.95, 97.0, 101.07, 102.91, 106.42, 107.87, 112.41, 114.82, 118.71,
+    121.76, 127.60, 126.90, 131.29, 132.91, 137.33, 138.91, 140.12, 140.91, 144.24,
+    145.0, 150.36, 151.96, 157.25, 158.93, 162.50, 164.93, 167.26, 168.93, 173.05,
+    174.97, 178.49, 180.95, 183.84, 186.21, 190.23, 192.22, 195.08, 196.97, 200.59,
+    204.38, 207.2, 208.98, 209.0, 210.0, 222.0, 223.0, 226.0, 227.0, 232.04,
+    231.04, 238.03, 237.0, 244.0, 243.0, 247.0, 247.0, 251.0, 252.0, 257.0,
+    258.0, 259.0, 266.0, 267.0, 268.0, 269.0, 270.0, 269.0, 278.0, 281.0,
+    282.0, 285.0, 286.0, 289.0, 290.0, 293.0, 294.0, 294.0,
+)
+
+# Atomic Weights of the Elements 1995, as originally used by MolarMassCalculator (H to U)
+IUPAC_1995 = {
+    "H": 1.008, "He": 4.003, "Li": 6.941, "Be": 9.012, "B": 10.81, "C": 12.01, "N": 14.01,
+    "O": 16.00, "F": 19.00, "Ne": 20.18, "Na": 22.99, "Mg": 24.31, "Al": 26.98, "Si": 28.09,
+    "P": 30.97, "S": 32.07, "Cl": 35.45, "Ar": 39.95, "K": 39.10, "Ca": 40.08, "Sc": 44.96,
+    "Ti": 47.87, "V": 50.94, "Cr": 52.00, "Mn": 54.94, "Fe": 55.85, "Co": 58.93, "Ni": 58.69,
+    "Cu": 63.55, "Zn": 65.39, "Ga": 69.72, "Ge": 72.61, "As": 74.92, "Se": 78.96, "Br": 79.90,
+    "Kr": 83.80, "Rb": 85.47, "Sr": 87.62, "Y": 88.91, "Zr": 91.22, "Nb": 92.91, "Mo": 95.94,
+    "Tc": 98.00, "Ru": 101.1, "Rh": 102.9, "Pd": 106.4, "Ag": 107.9, "Cd": 112.4, "In": 114.8,
+    "Sn": 118.7, "Sb": 121.8, "Te": 127.6, "I": 126.9, "Xe": 131.3, "Cs": 132.9, "Ba": 137.3,
+    "La": 138.9, "Ce": 140.1, "Pr": 140.9, "Nd": 144.2, "Pm": 145.00, "Sm": 150.4, "Eu": 152.0,
+    "Gd": 157.3, "Tb": 158.9, "Dy": 162.5, "Ho": 164.9, "Er": 167.3, "Tm": 168.9, "Yb": 173.00,
+    "Lu": 175.00, "Hf": 178.5, "Ta": 180.9, "W": 183.8, "Re": 186.2, "Os": 190.2, "Ir": 192.2,
+    "Pt": 195.1, "Au": 197.00, "Hg": 200.6, "Tl": 204.4, "Pb": 207.2, "Bi": 209.0, "Po": 209.00,
+    "At": 210.00, "Rn": 222.00, "Fr": 223.00, "Ra": 226.00, "Ac": 227.00, "Th": 232.0,
+    "Pa": 231.0, "U": 238.0,
+}
+
+DEFAULT_TABLE = 'iupac1995'
+
+
+class AtomicWeightTable:
+    def __init__(self, version, name, weights):
+        """weights is a sequence of 118 values in atomic-number order"""
+        if len(weights) != len(SYMBOLS):
+            raise ValueError(f"Table {version} must list all {len(SYMBOLS)} elements")
+        self.version = version
+        self.name = name
+        self.weights = np.array(weights, dtype=float)
+        self.weights.setflags(write=False)
+        self.masses = MappingProxyType(dict(zip(SYMBOLS, self.weights.tolist())))
+
+    def __repr__(self):
+        return f'<AtomicWeightTable {self.version}>'
+
+    def vector(self, symbols):
+        """Weights of several elements as an array, via their atomic numbers"""
+        return self.weights[[ATOMIC_NUMBERS[symbol] - 1 for symbol in symbols]]
+
+    def molar_mass(self, element_counts):
+        symbols = list(element_counts)
+        return float(self.vector(symbols) @ np.array([element_counts[symbol] for symbol in symbols], dtype=float))
+
+    def to_dict(self):
+        return {'version': self.version, 'name': self.name}
+
+
+_tables = {}
+
+
+def register_table(table):
+    """Make a table selectable by its version string"""
+    _tables[table.version] = table
+    return table
+
+
+def get_table(version=None):
+    """Table for a version string (the default table for None)"""
+    table = _tables.get(version or DEFAULT_TABLE)
+    if table is None:
+        raise ValueError(f"Unknown atomic weight table: {version}. Available: {', '.join(_tables)}")
+    return table
+
+
+def available_tables():
+    return [table.to_dict() for table in _tables.values()]
+
+
+register_table(AtomicWeightTable('iupac1995', 'IUPAC 1995 (original)',
+                                 [IUPAC_1995.get(symbol, weight) for symbol, weight in zip(SYMBOLS, IUPAC_2021)]))
+register_table(AtomicWeightTable('iupac2021', 'IUPAC 2021 standard atomic weights', IUPAC_2021))
+register_table(AtomicWeightTable('integer', 'Integer (rounded IUPAC 2021)', [float(round(weight)) for weight in IUPAC_2021]))
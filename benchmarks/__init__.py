@@ -0,0 +1,5 @@
+"""
+Benchmarks - Micro benchmarks for the calculator and end-to-end route benchmarks
+Run with: python -m benchmarks.run
+Load test a local server with: python -m benchmarks.loadgen --start-server
+"""
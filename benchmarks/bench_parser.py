@@ -0,0 +1,63 @@
+"""
+Parser benchmarks - parse_formula and calculate_molar_mass across formula
+lengths, nesting depths and element counts
+
+calculate_molar_mass is memoized, so it is timed through the uncached
+function behind the cache; the cached.* cases time a cache hit.
+"""
+from calculator import MolarMassCalculator, molar_mass_cache
+from benchmarks.common import time_call
+
+FORMULA_LENGTHS = [1, 4, 16, 64]
+NESTING_DEPTHS = [1, 4, 16]
+ELEMENT_COUNTS = [2, 8, 32]
+
+
+def linear_formula(repeats):
+    """Flat formula made of repeated CH2 units, e.g. CH2CH2CH2"""
+    return "CH2" * repeats
+
+
+def nested_formula(depth):
+    """Formula nested depth levels deep, e.g. ((CH3)2N)2"""
+    formula = "CH3"
+    for _ in range(depth):
+        formula = f"({formula})2N"
+    return formula
+
+
+def multi_element_formula(calculator, count):
+    """Formula containing count distinct elements, each with a subscript"""
+    elements = list(calculator.element_masses)[:count]
+    return "".join(f"{element}2" for element in elements)
+
+
+def build_cases(calculator):
+    """Return a dict of case name -> formula"""
+    cases = {}
+    for repeats in FORMULA_LENGTHS:
+        cases[f"length_{repeats * 3}"] = linear_formula(repeats)
+    for depth in NESTING_DEPTHS:
+        cases[f"depth_{depth}"] = nested_formula(depth)
+    for count in ELEMENT_COUNTS:
+        cases[f"elements_{count}"] = multi_element_formula(calculator, count)
+    return cases
+
+
+def run(iterations=2000, repeat=5):
+    """Run parser benchmarks, return a dict of benchmark name -> stats"""
+    calculator = MolarMassCalculator()
+    results = {}
+
+    for name, formula in build_cases(calculator).items():
+        results[f"parse_formula.{name}"] = time_call(
+            lambda formula=formula: calculator.parse_formula(formula),
+            iterations=iterations, repeat=repeat)
+        results[f"calculate_molar_mass.{name}"] = time_call(
+            lambda formula=formula: molar_mass_cache.__wrapped__(calculator.table_version, formula),
+            iterations=iterations, repeat=repeat)
+        results[f"calculate_molar_mass.cached.{name}"] = time_call(
+            lambda formula=formula: calculator.calculate_molar_mass(formula),
+            iterations=iterations, repeat=repeat)
+
+    return results
@@ -0,0 +1,90 @@
+"""
+Route benchmarks - Every Flask route end to end through the test client
+against a seeded SQLite database
+"""
+import os
+import sys
+import tempfile
+
+from benchmarks.common import time_call
+
+LIBRARY_SIZE = 200
+HISTORY_SIZE = 500
+
+SEED_FORMULAS = ["H2O", "NaCl", "H2SO4", "Ca(OH)2", "C6H12O6", "CH3COOH", "Mg3(PO4)2", "K4Fe(CN)6"]
+
+
+def create_app():
+    """Import the app against a fresh temporary SQLite database"""
+    if 'app' in sys.modules:
+        raise RuntimeError("Route benchmarks must import app.py themselves to point it at a temporary database")
+
+    db_dir = tempfile.mkdtemp(prefix='mmcalc-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(db_dir, 'bench.db')}"
+
+    import app as app_module
+    return app_module
+
+
+def seed_database(app_module):
+    """Fill the library and history tables with representative rows"""
+    from models import db, SavedCompound, CalculationHistory
+
+    calculator = app_module.calculator
+    with app_module.app.app_context():
+        for i in range(LIBRARY_SIZE):
+            formula = SEED_FORMULAS[i % len(SEED_FORMULAS)]
+            db.session.add(SavedCompound(
+                name=f"Compound {i:04d}",
+                formula=formula,
+                molar_mass=calculator.calculate_molar_mass(formula)
+            ))
+        for i in range(HISTORY_SIZE):
+            formula = SEED_FORMULAS[i % len(SEED_FORMULAS)]
+            db.session.add(CalculationHistory(
+                formula_id=app_module.formula_registry.intern(formula),
+                mode=str(i % 3 + 1),
+                molar_mass=calculator.calculate_molar_mass(formula),
+                input_value=1.0,
+                result_value=1.0,
+                unit='mmol'
+            ))
+        db.session.commit()
+
+
+def build_requests():
+    """Return a dict of benchmark name -> (method, path, form data)"""
+    return {
+        'GET /': ('GET', '/', None),
+        'GET /calculate?mode=1': ('GET', '/calculate?mode=1', None),
+        'POST /calculate mode 1': ('POST', '/calculate', {'mode': '1', 'compound': 'K4Fe(CN)6'}),
+        'POST /calculate mode 1 verbose': ('POST', '/calculate', {'mode': '1', 'compound': 'K4Fe(CN)6', 'verbose': 'on'}),
+        'POST /calculate mode 2': ('POST', '/calculate', {'mode': '2', 'compound': 'H2SO4', 'moles': '2.5', 'unit': 'mmol'}),
+        'POST /calculate mode 3': ('POST', '/calculate', {'mode': '3', 'compound': 'C6H12O6', 'mass': '10.0', 'unit': 'mmol'}),
+        'POST /calculate invalid': ('POST', '/calculate', {'mode': '1', 'compound': 'Xx2'}),
+        'GET /library': ('GET', '/library', None),
+        'GET /history': ('GET', '/history', None),
+        'GET /history?page=5': ('GET', '/history?page=5', None),
+        'GET /settings': ('GET', '/settings', None),
+        'POST /settings': ('POST', '/settings', {'default_unit': 'mmol', 'precision_molar_mass': '3',
+                                                 'precision_reagent_mass': '4', 'precision_moles': '6'}),
+    }
+
+
+def run(iterations=50, repeat=3):
+    """Run route benchmarks, return a dict of benchmark name -> stats"""
+    app_module = create_app()
+    seed_database(app_module)
+    client = app_module.app.test_client()
+
+    results = {}
+    for name, (method, path, data) in build_requests().items():
+        def request_once(method=method, path=path, data=data):
+            response = client.open(path, method=method, data=data)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{name} returned HTTP {response.status_code}")
+
+        request_once()  # Warm up templates and connection pool
+        results[f"route.{name}"] = time_call(request_once, iterations=iterations, repeat=repeat)
+
+    return results
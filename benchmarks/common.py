@@ -0,0 +1,33 @@
+"""
+Benchmark helpers - Timing and result formatting shared by all benchmark modules
+"""
+import statistics
+import time
+
+
+def time_call(func, iterations=1000, repeat=5):
+    """Time a callable, return per-call statistics in microseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed / iterations * 1e6)
+
+    return {
+        'median_us': statistics.median(samples),
+        'min_us': min(samples),
+        'max_us': max(samples),
+        'iterations': iterations,
+        'repeat': repeat
+    }
+
+
+def print_results(title, results):
+    """Print a table of benchmark results"""
+    print(f"\n{title}")
+    print("-" * len(title))
+    width = max((len(name) for name in results), default=0)
+    for name, stats in results.items():
+        print(f"{name.ljust(width)}  {stats['median_us']:12.2f} us  (min {stats['min_us']:.2f})")
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Load generator - Drives a realistic mix of calculate, library and history
+requests against a running MMCalc server from concurrent threads and reports
+throughput and p50/p95/p99 latency per route. Standard library only.
+
+Usage:
+    python -m benchmarks.loadgen --start-server                 # start a local server on a temp DB
+    python -m benchmarks.loadgen --url http://127.0.0.1:5000    # target an already running server
+    python -m benchmarks.loadgen --users 20 --duration 60 --output load.json
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime, timezone
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'load_results.json')
+
+FORMULAS = ["H2O", "NaCl", "H2SO4", "Ca(OH)2", "C6H12O6", "CH3COOH", "Mg3(PO4)2", "K4Fe(CN)6", "CH3(CH2)3OH"]
+
+# (route name, weight) - roughly what a lab session looks like: mostly
+# calculations, with regular trips to the library and history pages
+SCENARIOS = [
+    ('GET /', 5),
+    ('GET /calculate', 10),
+    ('POST /calculate mode 1', 20),
+    ('POST /calculate mode 2', 15),
+    ('POST /calculate mode 3', 10),
+    ('GET /library', 15),
+    ('GET /history', 15),
+    ('GET /history?page=N', 5),
+    ('GET /settings', 5),
+]
+
+
+def build_request(base_url, route, rng):
+    """Return (url, encoded form data or None) for a scenario"""
+    formula = rng.choice(FORMULAS)
+    if route == 'GET /':
+        return f"{base_url}/", None
+    if route == 'GET /calculate':
+        return f"{base_url}/calculate?mode={rng.choice('123')}", None
+    if route == 'POST /calculate mode 1':
+        form = {'mode': '1', 'compound': formula}
+    elif route == 'POST /calculate mode 2':
+        form = {'mode': '2', 'compound': formula, 'moles': f"{rng.uniform(0.1, 100):.3f}", 'unit': 'mmol'}
+    elif route == 'POST /calculate mode 3':
+        form = {'mode': '3', 'compound': formula, 'mass': f"{rng.uniform(0.1, 50):.3f}", 'unit': 'mmol'}
+    elif route == 'GET /library':
+        return f"{base_url}/library", None
+    elif route == 'GET /history':
+        return f"{base_url}/history", None
+    elif route == 'GET /history?page=N':
+        return f"{base_url}/history?page={rng.randint(2, 10)}", None
+    elif route == 'GET /settings':
+        return f"{base_url}/settings", None
+    else:
+        raise ValueError(f"Unknown scenario: {route}")
+    return f"{base_url}/calculate", urllib.parse.urlencode(form).encode()
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class LoadRunner:
+    def __init__(self, base_url, users, duration, timeout=30, seed=0):
+        self.base_url = base_url.rstrip('/')
+        self.users = users
+        self.duration = duration
+        self.timeout = timeout
+        self.seed = seed
+        self.samples = []  # (route, latency seconds, ok)
+        self.lock = threading.Lock()
+
+    def worker(self, index, deadline):
+        """Issue requests until the deadline, recording one sample per request"""
+        rng = random.Random(self.seed + index)
+        routes = [route for route, _ in SCENARIOS]
+        weights = [weight for _, weight in SCENARIOS]
+        local_samples = []
+
+        while time.perf_counter() < deadline:
+            route = rng.choices(routes, weights)[0]
+            url, data = build_request(self.base_url, route, rng)
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, data=data, timeout=self.timeout) as response:
+                    response.read()
+                    ok = response.status < 400
+            except (urllib.error.URLError, OSError):
+                ok = False
+            local_samples.append((route, time.perf_counter() - start, ok))
+
+        with self.lock:
+            self.samples.extend(local_samples)
+
+    def run(self):
+        """Run all users concurrently, return the wall-clock duration"""
+        start = time.perf_counter()
+        deadline = start + self.duration
+        threads = [threading.Thread(target=self.worker, args=(i, deadline), daemon=True)
+                   for i in range(self.users)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - start
+
+    def summarize(self, elapsed):
+        """Per-route and overall throughput and latency percentiles in milliseconds"""
+        by_route = {}
+        for route, latency, ok in self.samples:
+            by_route.setdefault(route, []).append((latency, ok))
+        by_route['ALL'] = [(latency, ok) for _, latency, ok in self.samples]
+
+        summary = {}
+        for route, samples in by_route.items():
+            latencies = sorted(latency * 1000 for latency, _ in samples)
+            errors = sum(1 for _, ok in samples if not ok)
+            summary[route] = {
+                'requests': len(samples),
+                'errors': errors,
+                'throughput_rps': len(samples) / elapsed if elapsed else 0.0,
+                'mean_ms': sum(latencies) / len(latencies) if latencies else 0.0,
+                'p50_ms': percentile(latencies, 50),
+                'p95_ms': percentile(latencies, 95),
+                'p99_ms': percentile(latencies, 99),
+                'max_ms': latencies[-1] if latencies else 0.0,
+            }
+        return summary
+
+
+def wait_for_server(base_url, timeout=30):
+    """Poll the server until it answers or the timeout expires"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base_url}/", timeout=2):
+                return True
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.25)
+    return False
+
+
+def start_server(port, workers):
+    """Start the app like start.sh does, against a temporary SQLite database"""
+    db_dir = tempfile.mkdtemp(prefix='mmcalc-load-')
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(db_dir, 'load.db')}")
+
+    if shutil.which('gunicorn'):
+        command = ['gunicorn', '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+                   '--timeout', '120', 'main:app']
+    else:
+        # Development fallback when gunicorn is not installed
+        command = [sys.executable, '-c',
+                   "import sys; from werkzeug.serving import run_simple; from main import app; "
+                   "run_simple('127.0.0.1', int(sys.argv[1]), app, threaded=True)", str(port)]
+
+    process = subprocess.Popen(command, cwd=PROJECT_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return process, db_dir
+
+
+def print_summary(summary):
+    """Print the per-route summary table"""
+    header = f"{'route':<26}{'reqs':>7}{'errs':>6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    print(header)
+    print('-' * len(header))
+    for route in sorted(summary, key=lambda r: (r == 'ALL', r)):
+        stats = summary[route]
+        print(f"{route:<26}{stats['requests']:>7}{stats['errors']:>6}{stats['throughput_rps']:>9.1f}"
+              f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate load against a local MMCalc server")
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help="Base URL of the server")
+    parser.add_argument('--start-server', action='store_true', help="Start a local server on a temporary database")
+    parser.add_argument('--port', type=int, default=5055, help="Port for --start-server")
+    parser.add_argument('--server-workers', type=int, default=1, help="gunicorn workers for --start-server")
+    parser.add_argument('--users', type=int, default=10, help="Concurrent simulated users")
+    parser.add_argument('--duration', type=float, default=30, help="Measured run length in seconds")
+    parser.add_argument('--warmup', type=float, default=3, help="Unmeasured warm-up in seconds")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for the request mix")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="Where to write the results JSON")
+    args = parser.parse_args(argv)
+
+    process = None
+    db_dir = None
+    base_url = args.url
+    if args.start_server:
+        base_url = f"http://127.0.0.1:{args.port}"
+        process, db_dir = start_server(args.port, args.server_workers)
+
+    try:
+        if not wait_for_server(base_url):
+            print(f"Server at {base_url} did not respond")
+            return 1
+
+        if args.warmup > 0:
+            LoadRunner(base_url, args.users, args.warmup, seed=args.seed).run()
+
+        runner = LoadRunner(base_url, args.users, args.duration, seed=args.seed)
+        elapsed = runner.run()
+        summary = runner.summarize(elapsed)
+    finally:
+        if process:
+            process.terminate()
+            process.wait(timeout=10)
+        if db_dir:
+            shutil.rmtree(db_dir, ignore_errors=True)
+
+    print_summary(summary)
+
+    payload = {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'url': base_url,
+        'users': args.users,
+        'duration_s': elapsed,
+        'seed': args.seed,
+        'routes': summary
+    }
+    with open(args.output, 'w') as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+        f.write('\n')
+    print(f"\nResults written to {args.output}")
+
+    return 1 if summary.get('ALL', {}).get('errors') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
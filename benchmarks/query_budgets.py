@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Query budgets - Assert that every route stays within its declared number of
+SQL queries, so N+1 patterns and redundant lookups fail loudly
+
+Usage:
+    python -m benchmarks.query_budgets
+
+When a change legitimately needs more queries, raise the budget here in the
+same commit so the increase is visible in review.
+"""
+import sys
+
+from benchmarks import bench_routes
+from query_counter import QueryBudgetExceeded, assert_query_budget
+
+# (method, path, form data, maximum queries)
+ROUTE_QUERY_BUDGETS = {
+    'GET /': ('GET', '/', None, 0),
+    'GET /calculate': ('GET', '/calculate?mode=1', None, 1),
+    'POST /calculate mode 1': ('POST', '/calculate', {'mode': '1', 'compound': 'H2O'}, 3),
+    'POST /calculate mode 2': ('POST', '/calculate', {'mode': '2', 'compound': 'H2SO4', 'moles': '2.5', 'unit': 'mmol'}, 3),
+    'POST /calculate mode 3': ('POST', '/calculate', {'mode': '3', 'compound': 'C6H12O6', 'mass': '10.0', 'unit': 'mmol'}, 3),
+    'POST /calculate empty formula': ('POST', '/calculate', {'mode': '1', 'compound': ''}, 1),
+    'POST /calculate invalid formula': ('POST', '/calculate', {'mode': '1', 'compound': 'Xx2'}, 3),
+    'POST /calculate compound name': ('POST', '/calculate', {'mode': '1', 'compound': 'sodium chloride'}, 4),
+    'POST /calculate missing moles': ('POST', '/calculate', {'mode': '2', 'compound': 'H2O'}, 2),
+    'GET /library': ('GET', '/library', None, 0),
+    'POST /library/add': ('POST', '/library/add', {'name': 'Budget Water', 'formula': 'H2O'}, 5),  # + table setting
+    'POST /add_to_library': ('POST', '/add_to_library', {'name': 'Budget Salt', 'formula': 'NaCl', 'molar_mass': '58.44'}, 4),
+    'GET /library/use': ('GET', '/library/use/1?mode=2', None, 2),
+    'GET /library/delete': ('GET', '/library/delete/2', None, 3),
+    'GET /history': ('GET', '/history', None, 2),
+    'GET /history?page=5': ('GET', '/history?page=5', None, 2),
+    'GET /history/delete': ('GET', '/history/delete/1', None, 2),
+    'GET /settings': ('GET', '/settings', None, 5),
+    'POST /settings': ('POST', '/settings', {'default_unit': 'mmol', 'precision_molar_mass': '3',
+                                             'precision_reagent_mass': '4', 'precision_moles': '6'}, 10),
+    'POST /api/balance': ('POST', '/api/balance', {'equation': 'C3H8 + O2 -> CO2 + H2O'}, 1),
+    'POST /api/isotopes': ('POST', '/api/isotopes', {'formula': 'C6H12O6'}, 0),
+    'POST /api/formula-search': ('POST', '/api/formula-search', {'mass': '180.156', 'elements': 'C,H,O'}, 1),
+    'GET /api/library': ('GET', '/api/library?sort=molar_mass&order=desc&page=2&per_page=10', None, 2),
+    'GET /api/library/search': ('GET', '/api/library/search?q=chlor', None, 1),
+    'GET /api/compounds/typeahead': ('GET', '/api/compounds/typeahead?q=sod', None, 1),
+    'GET /api/library/elements': ('GET', '/api/library/elements?include=C&exclude=halogens&counts=C:1-6', None, 2),
+    'GET /history/clear': ('GET', '/history/clear', None, 1),
+}
+
+
+def main():
+    app_module = bench_routes.create_app()
+    bench_routes.seed_database(app_module)
+    client = app_module.app.test_client()
+
+    from models import db
+
+    failures = 0
+    for name, (method, path, data, budget) in ROUTE_QUERY_BUDGETS.items():
+        try:
+            _, stats = assert_query_budget(app_module.app, db, client, method, path, budget, data=data)
+            print(f"  ok    {name}: {stats.count}/{budget} queries")
+        except QueryBudgetExceeded as e:
+            failures += 1
+            print(f"  FAIL  {name}: {e}")
+
+    if failures:
+        print(f"\n{failures} route(s) exceeded their query budget")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark runner - Runs the parser and route benchmarks, saves the results
+as JSON and compares them against a stored baseline
+
+Usage:
+    python -m benchmarks.run                      # run and compare against baseline
+    python -m benchmarks.run --update-baseline    # run and store results as the new baseline
+    python -m benchmarks.run --only parser        # run a single suite
+
+Timings are machine specific: regenerate baseline.json with --update-baseline
+on the machine that runs the comparison.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import datetime, timezone
+
+from benchmarks import bench_parser, bench_routes
+from benchmarks.common import print_results
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, 'results.json')
+DEFAULT_THRESHOLD = 0.25  # Fail when a benchmark is more than 25% slower than baseline
+
+SUITES = {
+    'parser': bench_parser,
+    'routes': bench_routes,
+}
+
+
+def run_suites(names, quick=False):
+    """Run the selected suites, return a combined dict of results"""
+    results = {}
+    for name in names:
+        suite = SUITES[name]
+        if quick:
+            suite_results = suite.run(iterations=10, repeat=1)
+        else:
+            suite_results = suite.run()
+        print_results(f"{name} benchmarks", suite_results)
+        results.update(suite_results)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Compare results against baseline, return a list of regressions"""
+    regressions = []
+    print(f"\nComparison against baseline (threshold {threshold:.0%})")
+    for name, stats in results.items():
+        if name not in baseline:
+            print(f"  NEW        {name}")
+            continue
+        # Best-of-repeats is far less sensitive to scheduler noise than the median
+        previous = baseline[name]['min_us']
+        current = stats['min_us']
+        change = (current - previous) / previous if previous else 0.0
+        status = 'ok'
+        if change > threshold:
+            status = 'REGRESSION'
+            regressions.append((name, previous, current, change))
+        print(f"  {status:<10} {name}: {previous:.2f} -> {current:.2f} us ({change:+.1%})")
+    return regressions
+
+
+def load_json(path):
+    """Load a JSON results file, return its benchmark dict or None"""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)['benchmarks']
+
+
+def save_json(path, results):
+    """Save benchmark results with some environment metadata"""
+    payload = {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'benchmarks': results
+    }
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run MMCalc benchmarks")
+    parser.add_argument('--only', choices=sorted(SUITES), action='append',
+                        help="Run only the given suite (may be repeated)")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="Where to write the results JSON")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown as a fraction of the baseline best time")
+    parser.add_argument('--update-baseline', action='store_true', help="Store the results as the new baseline")
+    parser.add_argument('--quick', action='store_true', help="Few iterations, for smoke testing the suite")
+    args = parser.parse_args(argv)
+
+    results = run_suites(args.only or list(SUITES), quick=args.quick)
+    save_json(args.output, results)
+    print(f"\nResults written to {args.output}")
+
+    if args.update_baseline:
+        save_json(args.baseline, results)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    baseline = load_json(args.baseline)
+    if baseline is None:
+        print(f"No baseline found at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed beyond {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
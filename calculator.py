@@ -1,112 +1,64 @@
 """
 Molar Mass Calculator - Core calculation logic
 Preserves exact functionality from the original CLI script
-Based on Atomic Weights of the Elements 1995 published by IUPAC
+Atomic weights come from the table registry in atomic_weights (IUPAC 1995 by default)
 """
+import hashlib
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+from atomic_weights import ATOMIC_NUMBERS, get_table
+
+
+def hill_formula(element_counts):
+    """Formula string in Hill order: C, H, then alphabetical (all alphabetical without C)"""
+    if 'C' in element_counts:
+        order = ['C'] + (['H'] if 'H' in element_counts else []) + \
+            sorted(e for e in element_counts if e not in ('C', 'H'))
+    else:
+        order = sorted(element_counts)
+    return ''.join(element + (str(element_counts[element]) if element_counts[element] != 1 else '')
+                   for element in order if element_counts[element])
+
+
+def composition_hash(canonical):
+    """Compact, stable key for a Hill-order formula (16 hex characters)"""
+    return hashlib.blake2b(canonical.encode('ascii'), digest_size=8).hexdigest()
+
 
 class MolarMassCalculator:
-    def __init__(self):
-        # Elements' atomic masses based on Atomic Weights of the Elements 1995 published by IUPAC
-        self.element_masses = {
-            "H": 1.008,
-            "He": 4.003,
-            "Li": 6.941,
-            "Be": 9.012,
-            "B": 10.81,
-            "C": 12.01,
-            "N": 14.01,
-            "O": 16.00,
-            "F": 19.00,
-            "Ne": 20.18,
-            "Na": 22.99,
-            "Mg": 24.31,
-            "Al": 26.98,
-            "Si": 28.09,
-            "P": 30.97,
-            "S": 32.07,
-            "Cl": 35.45,
-            "Ar": 39.95,
-            "K": 39.10,
-            "Ca": 40.08,
-            "Sc": 44.96,
-            "Ti": 47.87,
-            "V": 50.94,
-            "Cr": 52.00,
-            "Mn": 54.94,
-            "Fe": 55.85,
-            "Co": 58.93,
-            "Ni": 58.69,
-            "Cu": 63.55,
-            "Zn": 65.39,
-            "Ga": 69.72,
-            "Ge": 72.61,
-            "As": 74.92,
-            "Se": 78.96,
-            "Br": 79.90,
-            "Kr": 83.80,
-            "Rb": 85.47,
-            "Sr": 87.62,
-            "Y": 88.91,
-            "Zr": 91.22,
-            "Nb": 92.91,
-            "Mo": 95.94,
-            "Tc": 98.00,
-            "Ru": 101.1,
-            "Rh": 102.9,
-            "Pd": 106.4,
-            "Ag": 107.9,
-            "Cd": 112.4,
-            "In": 114.8,
-            "Sn": 118.7,
-            "Sb": 121.8,
-            "Te": 127.6,
-            "I": 126.9,
-            "Xe": 131.3,
-            "Cs": 132.9,
-            "Ba": 137.3,
-            "La": 138.9,
-            "Ce": 140.1,
-            "Pr": 140.9,
-            "Nd": 144.2,
-            "Pm": 145.00,
-            "Sm": 150.4,
-            "Eu": 152.0,
-            "Gd": 157.3,
-            "Tb": 158.9,
-            "Dy": 162.5,
-            "Ho": 164.9,
-            "Er": 167.3,
-            "Tm": 168.9,
-            "Yb": 173.00,
-            "Lu": 175.00,
-            "Hf": 178.5,
-            "Ta": 180.9,
-            "W": 183.8,
-            "Re": 186.2,
-            "Os": 190.2,
-            "Ir": 192.2,
-            "Pt": 195.1,
-            "Au": 197.00,
-            "Hg": 200.6,
-            "Tl": 204.4,
-            "Pb": 207.2,
-            "Bi": 209.0,
-            "Po": 209.00,
-            "At": 210.00,
-            "Rn": 222.00,
-            "Fr": 223.00,
-            "Ra": 226.00,
-            "Ac": 227.00,
-            "Th": 232.0,
-            "Pa": 231.0,
-            "U": 238.0
-        }
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, table=None):
+        # Atomic weights come from a shared, immutable table (IUPAC 1995 by default)
+        self.table = get_table(table)
+        self.element_masses = self.table.masses
+
+    @classmethod
+    def for_table(cls, version=None):
+        """Shared calculator for an atomic-weight table version"""
+        version = get_table(version).version
+        with cls._instances_lock:
+            calculator = cls._instances.get(version)
+            if calculator is None:
+                calculator = cls._instances[version] = cls(version)
+            return calculator
+
+    @property
+    def table_version(self):
+        return self.table.version
 
     def parse_formula(self, formula):
         """
         Read inputted formula, return a dictionary containing parsed elements and quantity
-        Preserves exact logic from original CLI script
+        Preserves exact logic from original CLI script; unbalanced parentheses
+        give an empty dictionary like any other invalid formula
         """
+        if not isinstance(formula, str):
+            return {}
         element_counts = {}  # Final count of elements
         stack = []  # Stack for handling parentheses
         i = 0  # Position in the formula
@@ -143,6 +95,9 @@ class MolarMassCalculator:
                     i += 1
                 num = max(num, 1)
 
+                if not stack:  # ")" without a matching "("
+                    return {}
+
                 # Merge back with previous counts
                 prev_counts, _ = stack.pop()
                 for elem, count in element_counts.items():
@@ -154,6 +109,8 @@ class MolarMassCalculator:
                 return {}
                 # i += 1  # Skip unexpected characters (shouldn't occur in valid formulas)
 
+        if stack:  # "(" never closed
+            return {}
         return element_counts
 
     def validate_elements(self, element_counts):
@@ -163,14 +120,46 @@ class MolarMassCalculator:
                 return False
         return True
 
+    def element_counts(self, formula):
+        """Parsed element counts of a formula, None when it cannot be parsed
+        or uses unknown elements"""
+        if not isinstance(formula, str):
+            return None
+        element_counts = self.parse_formula(formula.strip())
+        if not element_counts or not self.validate_elements(element_counts):
+            return None
+        return element_counts
+
+    def canonical_formula(self, formula):
+        """Hill-order formula for any way of writing a compound ("HOH" -> "H2O"),
+        or an empty string when the formula is invalid"""
+        element_counts = self.element_counts(formula)
+        return hill_formula(element_counts) if element_counts else ''
+
+    def composition_hash(self, formula):
+        """Composition hash of a formula, None when the formula is invalid"""
+        canonical = self.canonical_formula(formula)
+        return composition_hash(canonical) if canonical else None
+
     def calculate_molar_mass(self, formula):
         """Calculate molar mass based on input formula"""
-        element_counts = self.parse_formula(formula)
-        if self.validate_elements(element_counts):
-            total_mass = sum(self.element_masses[element] * count for element, count in element_counts.items())
-            return total_mass
-        else:
-            return 0
+        return _molar_mass(self.table.version, formula)
+
+    def molar_masses(self, formulas):
+        """Molar masses of many formulas at once, NaN where a formula is invalid.
+        Counts go into one formula x element matrix multiplied by the table's weights"""
+        counts = np.zeros((len(formulas), len(self.table.weights)))
+        invalid = np.zeros(len(formulas), dtype=bool)
+        for row, formula in enumerate(formulas):
+            element_counts = self.element_counts(formula)
+            if not element_counts:
+                invalid[row] = True
+                continue
+            for element, count in element_counts.items():
+                counts[row, ATOMIC_NUMBERS[element] - 1] = count
+        masses = counts @ self.table.weights
+        masses[invalid] = np.nan
+        return masses
 
     def calculate_reagent_mass(self, moles, compound):
         """Calculate reagent mass from moles and compound"""
@@ -184,3 +173,16 @@ class MolarMassCalculator:
             moles = mass / molar_mass
             return moles
         return 0
+
+
+@lru_cache(maxsize=8192)
+def _molar_mass(version, formula):
+    """Molar mass cache, keyed by table version so tables never share entries"""
+    calculator = MolarMassCalculator.for_table(version)
+    element_counts = calculator.parse_formula(formula)
+    if calculator.validate_elements(element_counts):
+        return sum(calculator.element_masses[element] * count for element, count in element_counts.items())
+    return 0
+
+
+molar_mass_cache = _molar_mass
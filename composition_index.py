@@ -0,0 +1,187 @@
+"""
+Composition Index - Percent-composition matrix of the compound library for
+ranking compounds against elemental analysis results
+
+Each SavedCompound is one row of a NumPy matrix holding the mass percent of
+every element (one column per element seen in the library). The matrix is
+built from the database on first use, then updated in place when
+CompoundLibrary adds or deletes compounds. Other worker processes are picked
+up by comparing a cheap (count, max id) signature of the table before each
+match and rebuilding when it differs.
+
+Matching is a single vectorized distance over the measured columns followed
+by a partial sort, so it stays in the millisecond range for tens of
+thousands of compounds.
+"""
+import logging
+import threading
+
+import numpy as np
+
+from models import SavedCompound, db
+
+logger = logging.getLogger(__name__)
+
+METRICS = ('max', 'rms')
+INITIAL_CAPACITY = 256
+
+
+class CompositionIndex:
+    def __init__(self, calculator):
+        self.calculator = calculator
+        self._lock = threading.Lock()
+        self._reset()
+        self._built = False
+
+    def _reset(self):
+        self.columns = {}
+        self.ids = np.zeros(INITIAL_CAPACITY, dtype=np.int64)
+        self.names = []
+        self.formulas = []
+        self.row_of = {}
+        self.unparsed = set()  # ids of compounds whose formula cannot be indexed
+        self.matrix = np.zeros((INITIAL_CAPACITY, 0))
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def percentages(self, formula):
+        """Mass percent of each element in a formula, or None if it cannot be parsed"""
+        element_counts = self.calculator.element_counts(formula)
+        if not element_counts:
+            return None
+        masses = {element: self.calculator.element_masses[element] * count
+                  for element, count in element_counts.items()}
+        total = sum(masses.values())
+        if total <= 0:
+            return None
+        return {element: 100.0 * mass / total for element, mass in masses.items()}
+
+    def _signature(self):
+        return db.session.query(db.func.count(SavedCompound.id), db.func.max(SavedCompound.id)).one()
+
+    def _local_signature(self):
+        ids = [int(self.ids[:self.size].max())] if self.size else []
+        ids.extend(self.unparsed)
+        return (self.size + len(self.unparsed), max(ids) if ids else None)
+
+    def _append(self, compound_id, name, formula):
+        percentages = self.percentages(formula)
+        if percentages is None:
+            self.unparsed.add(compound_id)
+            return
+        for element in percentages:
+            if element not in self.columns:
+                self.columns[element] = len(self.columns)
+                self.matrix = np.hstack([self.matrix, np.zeros((self.matrix.shape[0], 1))])
+        if self.size == self.matrix.shape[0]:
+            # Amortized growth, same as a Python list
+            self.matrix = np.vstack([self.matrix, np.zeros_like(self.matrix)])
+            self.ids = np.concatenate([self.ids, np.zeros_like(self.ids)])
+
+        row = self.size
+        self.matrix[row] = 0.0
+        for element, percent in percentages.items():
+            self.matrix[row, self.columns[element]] = percent
+        self.ids[row] = compound_id
+        self.names.append(name)
+        self.formulas.append(formula)
+        self.row_of[compound_id] = row
+        self.size += 1
+
+    def rebuild(self):
+        """Load every compound from the database"""
+        rows = db.session.query(SavedCompound.id, SavedCompound.name, SavedCompound.formula).all()
+        with self._lock:
+            self._reset()
+            for compound_id, name, formula in rows:
+                self._append(compound_id, name, formula)
+            self._built = True
+        logger.info("Built composition index with %d compounds", self.size)
+
+    def add(self, compound_id, name, formula):
+        """Add a compound that was just committed"""
+        with self._lock:
+            if self._built and compound_id not in self.row_of and compound_id not in self.unparsed:
+                self._append(compound_id, name, formula)
+
+    def remove(self, compound_id):
+        """Drop a deleted compound by moving the last row into its place"""
+        with self._lock:
+            self.unparsed.discard(compound_id)
+            row = self.row_of.pop(compound_id, None)
+            if row is None:
+                return
+            last = self.size - 1
+            if row != last:
+                self.matrix[row] = self.matrix[last]
+                self.ids[row] = self.ids[last]
+                self.names[row] = self.names[last]
+                self.formulas[row] = self.formulas[last]
+                self.row_of[int(self.ids[row])] = row
+            self.names.pop()
+            self.formulas.pop()
+            self.size = last
+
+    def invalidate(self):
+        """Force a rebuild on the next match, e.g. after a bulk import"""
+        with self._lock:
+            self._built = False
+
+    def ensure_current(self):
+        """Rebuild when the table was changed outside this process"""
+        if not self._built or tuple(self._signature()) != self._local_signature():
+            self.rebuild()
+
+    def match(self, percentages, limit=10, metric='max', complete=False):
+        """Library compounds closest to a measured composition.
+
+        Distances only use the measured elements unless complete is set, in
+        which case unmeasured elements count as 0%. metric 'max' is the
+        largest deviation in percentage points (the usual +/-0.4 criterion),
+        'rms' the root mean square deviation.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Metric must be one of {', '.join(METRICS)}")
+        if not isinstance(percentages, dict) or not percentages:
+            raise ValueError("Provide percentages as a mapping of element to percent")
+        measured = {}
+        for element, percent in percentages.items():
+            if element not in self.calculator.element_masses:
+                raise ValueError(f"Unknown element: {element}")
+            measured[element] = float(percent)
+        limit = int(limit)
+        if limit < 1:
+            raise ValueError("Limit must be at least 1")
+
+        self.ensure_current()
+        with self._lock:
+            if self.size == 0:
+                return []
+            elements = list(measured)
+            if complete:
+                elements += [element for element in self.columns if element not in measured]
+            target = np.array([measured.get(element, 0.0) for element in elements])
+            # Elements absent from the whole library read from a trailing zero column
+            padded = np.hstack([self.matrix[:self.size], np.zeros((self.size, 1))])
+            block = padded[:, [self.columns.get(element, -1) for element in elements]]
+
+            deviations = np.abs(block - target)
+            if metric == 'max':
+                distances = deviations.max(axis=1)
+            else:
+                distances = np.sqrt((deviations ** 2).mean(axis=1))
+
+            count = min(limit, self.size)
+            best = np.argpartition(distances, count - 1)[:count]
+            best = best[np.argsort(distances[best], kind='stable')]
+
+            return [{
+                'id': int(self.ids[row]),
+                'name': self.names[row],
+                'formula': self.formulas[row],
+                'distance': float(distances[row]),
+                'theoretical_percentages': {element: float(block[row, index])
+                                            for index, element in enumerate(elements)}
+            } for row in best]
@@ -0,0 +1,220 @@
+"""
+Compound Dictionary - Bundled, read-only dictionary of common compound names
+and synonyms, memory-mapped for prefix typeahead
+
+The dictionary lives in one binary file (data/compound_names.dict) that is
+memory-mapped when the app starts. Nothing is loaded into Python dicts, so
+worker processes share the same pages and startup costs nothing. Layout
+(little endian):
+
+    header    b'MMCD', format version (uint32), record count N (uint32)
+    offsets   N uint32: where each record starts, relative to the records
+    records   "key\\tsynonym\\tname\\tformula\\n" in UTF-8, sorted by key
+
+The key is the normalized synonym (casefolded, single spaces). Every synonym
+is a record of its own, so lookups and prefix searches are a binary search
+over the offsets followed by a short scan.
+
+The file is generated from compound_names_data.py; rebuild it after
+changing that module:
+    python compound_dictionary.py
+
+Configuration:
+    COMPOUND_DICTIONARY_PATH   dictionary file (default data/compound_names.dict)
+"""
+import bisect
+import logging
+import mmap
+import os
+import struct
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'MMCD'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sII')
+OFFSET = struct.Struct('<I')
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'compound_names.dict')
+
+
+def normalize(name):
+    """Dictionary key for a name: casefolded with whitespace collapsed"""
+    return ' '.join(str(name).casefold().split())
+
+
+class _Keys:
+    """Sequence view of the record keys, for bisect"""
+
+    def __init__(self, dictionary):
+        self.dictionary = dictionary
+
+    def __len__(self):
+        return len(self.dictionary)
+
+    def __getitem__(self, index):
+        start = self.dictionary._record_start(index)
+        return self.dictionary._map[start:self.dictionary._map.find(b'\t', start)]
+
+
+class CompoundDictionary:
+    def __init__(self):
+        self.path = None
+        self._file = None
+        self._map = None
+        self._count = 0
+        self._records = 0
+
+    def init_app(self, app):
+        app.config.setdefault('COMPOUND_DICTIONARY_PATH',
+                              os.environ.get('COMPOUND_DICTIONARY_PATH', DEFAULT_PATH))
+        self.open(app.config['COMPOUND_DICTIONARY_PATH'])
+
+    def open(self, path):
+        """Map a dictionary file; a missing or invalid file leaves the dictionary empty"""
+        self.close()
+        try:
+            self._file = open(path, 'rb')
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, count = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"{path} is not a version {FORMAT_VERSION} compound dictionary")
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning("Compound dictionary unavailable: %s", e)
+            self.close()
+            return
+        self.path = path
+        self._count = count
+        self._records = HEADER.size + OFFSET.size * count
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
+        self._file = self._map = None
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def _record_start(self, index):
+        return self._records + OFFSET.unpack_from(self._map, HEADER.size + OFFSET.size * index)[0]
+
+    def _record(self, index):
+        start = self._record_start(index)
+        key, synonym, name, formula = self._map[start:self._map.find(b'\n', start)].decode('utf-8').split('\t')
+        return key, {'synonym': synonym, 'name': name, 'formula': formula}
+
+    def lookup(self, name):
+        """Entry for an exact name or synonym (case and spacing ignored), or None"""
+        key = normalize(name).encode('utf-8')
+        if not key or not self._count:
+            return None
+        index = bisect.bisect_left(_Keys(self), key)
+        if index < self._count and _Keys(self)[index] == key:
+            return self._record(index)[1]
+        return None
+
+    def prefix(self, query, limit=10):
+        """Entries whose name or synonym starts with query, one per compound, in key order"""
+        key = normalize(query).encode('utf-8')
+        if not key or not self._count:
+            return []
+        results = []
+        seen = set()
+        index = bisect.bisect_left(_Keys(self), key)
+        while index < self._count and len(results) < limit:
+            record_key, entry = self._record(index)
+            if not record_key.encode('utf-8').startswith(key):
+                break
+            if (entry['name'], entry['formula']) not in seen:
+                seen.add((entry['name'], entry['formula']))
+                results.append(entry)
+            index += 1
+        return results
+
+
+def write(entries, path):
+    """Write (synonym, name, formula) entries as a dictionary file; the first
+    entry wins when two share a key"""
+    records = {}
+    for synonym, name, formula in entries:
+        key = normalize(synonym)
+        if key and key not in records:
+            records[key] = f'{key}\t{synonym}\t{name}\t{formula}\n'.encode('utf-8')
+    keys = sorted(records, key=lambda key: key.encode('utf-8'))
+
+    offsets = []
+    position = 0
+    for key in keys:
+        offsets.append(position)
+        position += len(records[key])
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'wb') as out:
+        out.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(keys)))
+        for offset in offsets:
+            out.write(OFFSET.pack(offset))
+        for key in keys:
+            out.write(records[key])
+    return len(keys)
+
+
+def _salt_formula(cation, cation_count, anion, anion_count):
+    def part(formula, count, polyatomic):
+        if count == 1:
+            return formula
+        return f'({formula}){count}' if polyatomic else f'{formula}{count}'
+
+    def polyatomic(formula):
+        # More than one element symbol (or a repeated one, as in O2 or N3)
+        return sum(1 for char in formula if char.isupper()) > 1 or any(char.isdigit() for char in formula)
+
+    return part(cation, cation_count, polyatomic(cation)) + part(anion, anion_count, polyatomic(anion))
+
+
+def source_entries():
+    """(synonym, name, formula) for every name in compound_names_data, curated names first"""
+    from math import gcd
+
+    from atomic_weights import SYMBOLS
+    from compound_names_data import (ANIONS, CATIONS, COMPOUNDS, DIATOMIC, ELEMENT_NAMES,
+                                     ELEMENT_SYNONYMS)
+
+    for name, formula, synonyms in COMPOUNDS:
+        for synonym in (name,) + tuple(synonyms):
+            yield synonym, name, formula
+
+    for element_name, symbol in zip(ELEMENT_NAMES, SYMBOLS):
+        formula = f'{symbol}2' if symbol in DIATOMIC else symbol
+        for synonym in (element_name,) + ELEMENT_SYNONYMS.get(element_name, ()):
+            yield synonym, element_name, formula
+
+    for cation_name, cation, cation_charge, cation_synonyms in CATIONS:
+        for anion_name, anion, anion_charge, anion_synonyms, allowed in ANIONS:
+            if allowed is not None and cation not in allowed:
+                continue
+            divisor = gcd(cation_charge, anion_charge)
+            formula = _salt_formula(cation, anion_charge // divisor, anion, cation_charge // divisor)
+            name = f'{cation_name} {anion_name}'
+            for first in (cation_name,) + tuple(cation_synonyms):
+                for second in (anion_name,) + tuple(anion_synonyms):
+                    yield f'{first} {second}', name, formula
+
+
+def build(path=DEFAULT_PATH):
+    """Regenerate the dictionary file, rejecting any formula the calculator cannot parse"""
+    from calculator import MolarMassCalculator
+
+    calculator = MolarMassCalculator.for_table()
+    entries = []
+    for synonym, name, formula in source_entries():
+        element_counts = calculator.parse_formula(formula)
+        if not element_counts or not calculator.validate_elements(element_counts):
+            raise ValueError(f"Invalid formula for {name}: {formula}")
+        entries.append((synonym, name, formula))
+    return write(entries, path)
+
+
+if __name__ == '__main__':
+    count = build()
+    print(f"Wrote {count} names to {DEFAULT_PATH}")
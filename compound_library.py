@@ -2,15 +2,37 @@
 Compound Library - Handle saving and retrieving commonly used compounds
 """
 import json
+import logging
+import math
 import os
+import element_index
+from library_search import CANDIDATE_LIMIT, LikeSearch
 from models import SavedCompound, db
 
+logger = logging.getLogger(__name__)
+
+CONFLICT_POLICIES = ('skip', 'update')
+SORT_COLUMNS = {
+    'name': SavedCompound.name,
+    'formula': SavedCompound.formula,
+    'molar_mass': SavedCompound.molar_mass,
+    'created_at': SavedCompound.created_at,
+}
+MAX_PAGE_SIZE = 200
+NAME_LOOKUP_CHUNK = 500  # names per IN (...) lookup, well under SQLite's variable limit
+NAME_MAX_LENGTH = SavedCompound.__table__.c.name.type.length
+FORMULA_MAX_LENGTH = SavedCompound.__table__.c.formula.type.length
+
 class CompoundLibrary:
-    def __init__(self):
+    def __init__(self, calculator=None, composition_index=None, search=None):
         self.db = db
+        self.calculator = calculator
+        self.composition_index = composition_index
+        self.search = search  # library_search backend, chosen once the database is known
 
-    def add_compound(self, name, formula, molar_mass):
-        """Add a compound to the library"""
+    def add_compound(self, name, formula, molar_mass, atomic_weight_table=None):
+        """Add a compound to the library; atomic_weight_table is the table version
+        molar_mass was computed with (None if unknown)"""
         try:
             # Check if compound with this name already exists
             existing = SavedCompound.query.filter_by(name=name).first()
@@ -20,16 +42,24 @@ class CompoundLibrary:
             compound = SavedCompound(
                 name=name,
                 formula=formula,
-                molar_mass=molar_mass
+                molar_mass=molar_mass,
+                atomic_weight_table=atomic_weight_table,
+                composition_hash=self.calculator.composition_hash(formula) if self.calculator else None
             )
             
             db.session.add(compound)
+            db.session.flush()
+            compound_id = compound.id
+            if self.calculator:
+                element_index.index_compounds(self.calculator, [(compound_id, formula)])
             db.session.commit()
+            if self.composition_index is not None:
+                self.composition_index.add(compound_id, name, formula)
             return True
             
         except Exception as e:
             db.session.rollback()
-            print(f"Error adding compound: {e}")
+            logger.error("Error adding compound: %s", e)
             return False
 
     def delete_compound(self, compound_id):
@@ -37,16 +67,191 @@ class CompoundLibrary:
         try:
             compound = SavedCompound.query.get(compound_id)
             if compound:
+                element_index.unindex_compounds([compound_id])
                 db.session.delete(compound)
                 db.session.commit()
+                if self.composition_index is not None:
+                    self.composition_index.remove(compound_id)
                 return True
             return False
             
         except Exception as e:
             db.session.rollback()
-            print(f"Error deleting compound: {e}")
+            logger.error("Error deleting compound: %s", e)
             return False
 
+    def _existing_ids(self, names):
+        """Ids of saved compounds by name, looked up in chunks"""
+        existing = {}
+        for start in range(0, len(names), NAME_LOOKUP_CHUNK):
+            chunk = names[start:start + NAME_LOOKUP_CHUNK]
+            existing.update(db.session.query(SavedCompound.name, SavedCompound.id)
+                            .filter(SavedCompound.name.in_(chunk)).all())
+        return existing
+
+    def import_compounds(self, records, on_conflict='skip'):
+        """Add many compounds in one transaction.
+
+        records are dicts with 'name' and 'formula'. Formulas are validated and
+        their molar masses computed in one batch; invalid records are reported
+        by row number (1-based) and the rest are imported. Names already in the
+        library are skipped or overwritten depending on on_conflict.
+        """
+        if on_conflict not in CONFLICT_POLICIES:
+            raise ValueError(f"on_conflict must be one of {', '.join(CONFLICT_POLICIES)}")
+
+        errors = []
+        valid = []
+        first_row = {}
+        for row, record in enumerate(records, start=1):
+            if not isinstance(record, dict):
+                errors.append({'row': row, 'error': "Each compound must be an object"})
+                continue
+            name = str(record.get('name') or '').strip()
+            formula = ''.join(str(record.get('formula') or '').split())
+            if not name or not formula:
+                errors.append({'row': row, 'name': name, 'error': "Name and formula are required"})
+            elif len(name) > NAME_MAX_LENGTH or len(formula) > FORMULA_MAX_LENGTH:
+                errors.append({'row': row, 'name': name, 'error': "Name or formula is too long"})
+            elif name in first_row:
+                errors.append({'row': row, 'name': name, 'error': f"Duplicate name (first on row {first_row[name]})"})
+            elif self.calculator.element_counts(formula) is None:
+                errors.append({'row': row, 'name': name, 'error': f"Invalid chemical formula: {formula}"})
+            else:
+                first_row[name] = row
+                valid.append((row, name, formula))
+
+        masses = self.calculator.molar_masses([formula for _, _, formula in valid])
+        compounds = []
+        for (row, name, formula), mass in zip(valid, masses):
+            if math.isnan(mass):
+                errors.append({'row': row, 'name': name, 'error': f"Invalid chemical formula: {formula}"})
+            else:
+                compounds.append({'name': name, 'formula': formula, 'molar_mass': float(mass),
+                                  'atomic_weight_table': self.calculator.table_version,
+                                  'composition_hash': self.calculator.composition_hash(formula)})
+
+        existing = self._existing_ids([compound['name'] for compound in compounds])
+        inserts = [compound for compound in compounds if compound['name'] not in existing]
+        updates = [dict(compound, id=existing[compound['name']])
+                   for compound in compounds if compound['name'] in existing] if on_conflict == 'update' else []
+
+        try:
+            if inserts:
+                db.session.execute(db.insert(SavedCompound), inserts)
+            if updates:
+                db.session.execute(db.update(SavedCompound), updates)
+                element_index.unindex_compounds([compound['id'] for compound in updates])
+            # Bulk inserts do not return ids, so read the new ones back by name
+            added = self._existing_ids([compound['name'] for compound in inserts])
+            element_index.index_compounds(
+                self.calculator,
+                [(added[compound['name']], compound['formula']) for compound in inserts] +
+                [(compound['id'], compound['formula']) for compound in updates])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        if (inserts or updates) and self.composition_index is not None:
+            self.composition_index.invalidate()
+        errors.sort(key=lambda error: error['row'])
+        return {
+            'added': len(inserts),
+            'updated': len(updates),
+            'skipped': len(compounds) - len(inserts) - len(updates),
+            'errors': errors
+        }
+
+    def find_by_elements(self, include=None, exclude=None, counts=None, limit=100, offset=0):
+        """Compounds filtered by the elements they contain, via the element index.
+
+        include/exclude are element symbols or group names, counts maps an
+        element to a (min, max) atom count range; see element_index.
+        Returns (compounds, total) with compounds in name order.
+        """
+        criteria = element_index.element_filters(self.calculator, include, exclude, counts)
+        query = SavedCompound.query.filter(*criteria)
+        total = query.count()
+        compounds = query.order_by(SavedCompound.name).offset(offset).limit(limit).all()
+        return [{
+            'id': compound.id,
+            'name': compound.name,
+            'formula': compound.formula,
+            'molar_mass': compound.molar_mass,
+            'created_at': compound.created_at
+        } for compound in compounds], total
+
+    def list_compounds(self, page=1, per_page=50, sort='name', order='asc', query=None,
+                       include=None, exclude=None, counts=None):
+        """One page of the library, sorted and filtered; returns (compounds, total).
+
+        query narrows the list to search matches (see search_compounds); with
+        sort='relevance' they stay in search order. include/exclude/counts are
+        element filters as in find_by_elements.
+        """
+        if sort not in SORT_COLUMNS and not (sort == 'relevance' and query):
+            raise ValueError(f"Sort must be one of {', '.join(SORT_COLUMNS)}" + (", relevance" if query else ""))
+        if order not in ('asc', 'desc'):
+            raise ValueError("Order must be asc or desc")
+        page = max(1, int(page))
+        per_page = max(1, min(int(per_page), MAX_PAGE_SIZE))
+
+        criteria = element_index.element_filters(self.calculator, include, exclude, counts) \
+            if (include or exclude or counts) and self.calculator else []
+        ranked_ids = None
+        if query:
+            ranked_ids = [compound['id'] for compound in
+                          (self.search or LikeSearch()).search(query, limit=CANDIDATE_LIMIT)]
+            criteria.append(SavedCompound.id.in_(ranked_ids))
+
+        results = SavedCompound.query.filter(*criteria)
+        if sort == 'relevance':
+            by_id = {compound.id: compound for compound in results.all()}
+            matches = [by_id[compound_id] for compound_id in ranked_ids if compound_id in by_id]
+            total = len(matches)
+            compounds = matches[(page - 1) * per_page:page * per_page]
+        else:
+            total = results.count()
+            column = SORT_COLUMNS[sort]
+            # id breaks ties so pages never overlap
+            ordering = [column.desc(), SavedCompound.id.desc()] if order == 'desc' else [column, SavedCompound.id]
+            compounds = results.order_by(*ordering).offset((page - 1) * per_page).limit(per_page).all()
+        return [{
+            'id': compound.id,
+            'name': compound.name,
+            'formula': compound.formula,
+            'molar_mass': compound.molar_mass,
+            'created_at': compound.created_at
+        } for compound in compounds], total
+
+    def iter_compounds(self, batch_size=1000):
+        """Yield every compound in name order, fetching batch_size rows at a time"""
+        query = db.select(SavedCompound.id, SavedCompound.name, SavedCompound.formula, SavedCompound.molar_mass,
+                          SavedCompound.atomic_weight_table, SavedCompound.created_at) \
+            .order_by(SavedCompound.name).execution_options(yield_per=batch_size)
+        for row in db.session.execute(query):
+            yield row._asdict()
+
+    def find_same_composition(self, formula, exclude_name=None):
+        """Saved compounds with the same composition as formula, whatever their name
+        or how their formula is written; one indexed lookup on composition_hash"""
+        if self.calculator is None:
+            return []
+        key = self.calculator.composition_hash(formula)
+        if key is None:
+            return []
+        try:
+            query = SavedCompound.query.filter_by(composition_hash=key)
+            if exclude_name is not None:
+                query = query.filter(SavedCompound.name != exclude_name)
+            return [{'id': compound.id, 'name': compound.name, 'formula': compound.formula}
+                    for compound in query.order_by(SavedCompound.name).all()]
+
+        except Exception as e:
+            logger.error("Error finding duplicate compounds: %s", e)
+            return []
+
     def get_compound(self, compound_id):
         """Get a specific compound by ID"""
         try:
@@ -62,9 +267,46 @@ class CompoundLibrary:
             return None
             
         except Exception as e:
-            print(f"Error getting compound: {e}")
+            logger.error("Error getting compound: %s", e)
             return None
 
+    def find_by_name(self, name):
+        """Get a compound by name, ignoring case"""
+        try:
+            compound = SavedCompound.query.filter(
+                db.func.lower(SavedCompound.name) == ' '.join(name.split()).lower()).first()
+            if compound:
+                return {
+                    'id': compound.id,
+                    'name': compound.name,
+                    'formula': compound.formula,
+                    'molar_mass': compound.molar_mass,
+                    'created_at': compound.created_at
+                }
+            return None
+
+        except Exception as e:
+            logger.error("Error finding compound by name: %s", e)
+            return None
+
+    def get_compounds_by_ids(self, compound_ids):
+        """Get several compounds in one query, in the order of compound_ids"""
+        try:
+            compounds = SavedCompound.query.filter(SavedCompound.id.in_(compound_ids)).all()
+            by_id = {compound.id: compound for compound in compounds}
+            return [{
+                'id': by_id[compound_id].id,
+                'name': by_id[compound_id].name,
+                'formula': by_id[compound_id].formula,
+                'molar_mass': by_id[compound_id].molar_mass,
+                'atomic_weight_table': by_id[compound_id].atomic_weight_table,
+                'created_at': by_id[compound_id].created_at
+            } for compound_id in compound_ids if compound_id in by_id]
+
+        except Exception as e:
+            logger.error("Error getting compounds: %s", e)
+            return []
+
     def get_all_compounds(self):
         """Get all compounds from the library"""
         try:
@@ -78,27 +320,14 @@ class CompoundLibrary:
             } for compound in compounds]
             
         except Exception as e:
-            print(f"Error getting compounds: {e}")
+            logger.error("Error getting compounds: %s", e)
             return []
 
-    def search_compounds(self, query):
-        """Search compounds by name or formula"""
+    def search_compounds(self, query, limit=20):
+        """Search compounds by name or formula, best matches first (see library_search)"""
         try:
-            compounds = SavedCompound.query.filter(
-                db.or_(
-                    SavedCompound.name.contains(query),
-                    SavedCompound.formula.contains(query)
-                )
-            ).order_by(SavedCompound.name).all()
-            
-            return [{
-                'id': compound.id,
-                'name': compound.name,
-                'formula': compound.formula,
-                'molar_mass': compound.molar_mass,
-                'created_at': compound.created_at
-            } for compound in compounds]
-            
+            return (self.search or LikeSearch()).search(query, limit)
+
         except Exception as e:
-            print(f"Error searching compounds: {e}")
+            logger.error("Error searching compounds: %s", e)
             return []
@@ -0,0 +1,483 @@
+"""
+Compound Names Data - Source lists for the bundled compound name dictionary
+
+compound_dictionary.py builds data/compound_names.dict from these:
+    ELEMENT_NAMES   element names in atomic-number order (diatomic gases map to X2)
+    CATIONS/ANIONS  combined into systematic salt names ("iron(III) sulfate")
+    COMPOUNDS       curated reagents, solvents and common names with synonyms
+Formulas are written so parse_formula accepts them; hydrates use a
+parenthesized water group, e.g. CuSO4(H2O)5.
+"""
+
+ELEMENT_NAMES = (
+    'hydrogen', 'helium', 'lithium', 'beryllium', 'boron', 'carbon', 'nitrogen', 'oxygen', 'fluorine', 'neon',
+    'sodium', 'magnesium', 'aluminium', 'silicon', 'phosphorus', 'sulfur', 'chlorine', 'argon', 'potassium',
+    'calcium', 'scandium', 'titanium', 'vanadium', 'chromium', 'manganese', 'iron', 'cobalt', 'nickel',
+    'copper', 'zinc', 'gallium', 'germanium', 'arsenic', 'selenium', 'bromine', 'krypton', 'rubidium',
+    'strontium', 'yttrium', 'zirconium', 'niobium', 'molybdenum', 'technetium', 'ruthenium', 'rhodium',
+    'palladium', 'silver', 'cadmium', 'indium', 'tin', 'antimony', 'tellurium', 'iodine', 'xenon', 'caesium',
+    'barium', 'lanthanum', 'cerium', 'praseodymium', 'neodymium', 'promethium', 'samarium', 'europium',
+    'gadolinium', 'terbium', 'dysprosium', 'holmium', 'erbium', 'thulium', 'ytterbium', 'lutetium', 'hafnium',
+    'tantalum', 'tungsten', 'rhenium', 'osmium', 'iridium', 'platinum', 'gold', 'mercury', 'thallium', 'lead',
+    'bismuth', 'polonium', 'astatine', 'radon', 'francium', 'radium', 'actinium', 'thorium', 'protactinium',
+    'uranium', 'neptunium', 'plutonium', 'americium', 'curium', 'berkelium', 'californium', 'einsteinium',
+    'fermium', 'mendelevium', 'nobelium', 'lawrencium', 'rutherfordium', 'dubnium', 'seaborgium', 'bohrium',
+    'hassium', 'meitnerium', 'darmstadtium', 'roentgenium', 'copernicium', 'nihonium', 'flerovium',
+    'moscovium', 'livermorium', 'tennessine', 'oganesson',
+)
+
+ELEMENT_SYNONYMS = {'aluminium': ('aluminum',), 'sulfur': ('sulphur',), 'caesium': ('cesium',)}
+
+DIATOMIC = ('H', 'N', 'O', 'F', 'Cl', 'Br', 'I')
+
+# (name, formula, charge, synonyms)
+CATIONS = (
+    ('lithium', 'Li', 1, ()),
+    ('sodium', 'Na', 1, ()),
+    ('potassium', 'K', 1, ()),
+    ('rubidium', 'Rb', 1, ()),
+    ('caesium', 'Cs', 1, ('cesium',)),
+    ('ammonium', 'NH4', 1, ()),
+    ('silver', 'Ag', 1, ()),
+    ('thallium(I)', 'Tl', 1, ('thallous',)),
+    ('copper(I)', 'Cu', 1, ('cuprous',)),
+    ('copper(II)', 'Cu', 2, ('cupric',)),
+    ('beryllium', 'Be', 2, ()),
+    ('magnesium', 'Mg', 2, ()),
+    ('calcium', 'Ca', 2, ()),
+    ('strontium', 'Sr', 2, ()),
+    ('barium', 'Ba', 2, ()),
+    ('zinc', 'Zn', 2, ()),
+    ('cadmium', 'Cd', 2, ()),
+    ('mercury(II)', 'Hg', 2, ('mercuric',)),
+    ('lead(II)', 'Pb', 2, ('plumbous',)),
+    ('tin(II)', 'Sn', 2, ('stannous',)),
+    ('tin(IV)', 'Sn', 4, ('stannic',)),
+    ('iron(II)', 'Fe', 2, ('ferrous',)),
+    ('iron(III)', 'Fe', 3, ('ferric',)),
+    ('cobalt(II)', 'Co', 2, ('cobaltous',)),
+    ('nickel(II)', 'Ni', 2, ('nickel',)),
+    ('manganese(II)', 'Mn', 2, ('manganous',)),
+    ('chromium(III)', 'Cr', 3, ('chromic',)),
+    ('aluminium', 'Al', 3, ('aluminum',)),
+    ('gallium', 'Ga', 3, ()),
+    ('indium', 'In', 3, ()),
+    ('bismuth(III)', 'Bi', 3, ('bismuth',)),
+    ('lanthanum', 'La', 3, ()),
+    ('cerium(III)', 'Ce', 3, ('cerous',)),
+    ('yttrium', 'Y', 3, ()),
+    ('scandium', 'Sc', 3, ()),
+    ('palladium(II)', 'Pd', 2, ('palladium',)),
+    ('platinum(II)', 'Pt', 2, ()),
+    ('gold(III)', 'Au', 3, ('auric',)),
+    ('titanium(IV)', 'Ti', 4, ()),
+)
+
+# Anions paired only with these cations (by formula); everything else pairs with all
+S_BLOCK = ('Li', 'Na', 'K', 'Rb', 'Cs', 'Be', 'Mg', 'Ca', 'Sr', 'Ba')
+
+# (name, formula, charge, synonyms, restricted to cation formulas or None)
+ANIONS = (
+    ('fluoride', 'F', 1, (), None),
+    ('chloride', 'Cl', 1, (), None),
+    ('bromide', 'Br', 1, (), None),
+    ('iodide', 'I', 1, (), None),
+    ('hydroxide', 'OH', 1, (), None),
+    ('cyanide', 'CN', 1, (), None),
+    ('cyanate', 'OCN', 1, (), None),
+    ('thiocyanate', 'SCN', 1, (), None),
+    ('azide', 'N3', 1, (), None),
+    ('nitrate', 'NO3', 1, (), None),
+    ('nitrite', 'NO2', 1, (), None),
+    ('acetate', 'CH3COO', 1, ('ethanoate',), None),
+    ('formate', 'HCOO', 1, ('methanoate',), None),
+    ('perchlorate', 'ClO4', 1, (), None),
+    ('chlorate', 'ClO3', 1, (), None),
+    ('chlorite', 'ClO2', 1, (), None),
+    ('hypochlorite', 'ClO', 1, (), None),
+    ('bromate', 'BrO3', 1, (), None),
+    ('iodate', 'IO3', 1, (), None),
+    ('periodate', 'IO4', 1, (), None),
+    ('permanganate', 'MnO4', 1, (), None),
+    ('hydrogen carbonate', 'HCO3', 1, ('bicarbonate',), None),
+    ('hydrogen sulfate', 'HSO4', 1, ('bisulfate', 'hydrogen sulphate', 'bisulphate'), None),
+    ('hydrogen sulfite', 'HSO3', 1, ('bisulfite', 'hydrogen sulphite', 'bisulphite'), None),
+    ('dihydrogen phosphate', 'H2PO4', 1, (), None),
+    ('tetrafluoroborate', 'BF4', 1, (), None),
+    ('hexafluorophosphate', 'PF6', 1, (), None),
+    ('trifluoromethanesulfonate', 'CF3SO3', 1, ('triflate',), None),
+    ('oxide', 'O', 2, (), tuple(cation[1] for cation in CATIONS if cation[1] != 'NH4')),
+    ('peroxide', 'O2', 2, (), S_BLOCK + ('Zn',)),
+    ('sulfide', 'S', 2, ('sulphide',), None),
+    ('selenide', 'Se', 2, (), tuple(cation[1] for cation in CATIONS if cation[1] != 'NH4')),
+    ('sulfate', 'SO4', 2, ('sulphate',), None),
+    ('sulfite', 'SO3', 2, ('sulphite',), None),
+    ('thiosulfate', 'S2O3', 2, ('thiosulphate',), None),
+    ('peroxydisulfate', 'S2O8', 2, ('persulfate', 'peroxydisulphate', 'persulphate'), None),
+    ('carbonate', 'CO3', 2, (), None),
+    ('oxalate', 'C2O4', 2, (), None),
+    ('chromate', 'CrO4', 2, (), None),
+    ('dichromate', 'Cr2O7', 2, (), None),
+    ('molybdate', 'MoO4', 2, (), None),
+    ('tungstate', 'WO4', 2, (), None),
+    ('metasilicate', 'SiO3', 2, ('silicate',), None),
+    ('hydrogen phosphate', 'HPO4', 2, (), None),
+    ('phosphate', 'PO4', 3, (), None),
+    ('arsenate', 'AsO4', 3, (), None),
+    ('borate', 'BO3', 3, (), None),
+    ('citrate', 'C6H5O7', 3, (), None),
+    ('nitride', 'N', 3, (), S_BLOCK + ('Al', 'Ga')),
+    ('phosphide', 'P', 3, (), S_BLOCK + ('Al', 'Ga', 'Zn')),
+)
+
+# (name, formula, synonyms)
+COMPOUNDS = (
+    # Solvents
+    ('water', 'H2O', ('dihydrogen monoxide',)),
+    ('methanol', 'CH4O', ('methyl alcohol', 'MeOH', 'wood alcohol')),
+    ('ethanol', 'C2H6O', ('ethyl alcohol', 'EtOH', 'alcohol')),
+    ('1-propanol', 'C3H8O', ('n-propanol', 'propan-1-ol', 'propyl alcohol')),
+    ('2-propanol', 'C3H8O', ('isopropanol', 'isopropyl alcohol', 'IPA', 'propan-2-ol')),
+    ('1-butanol', 'C4H10O', ('n-butanol', 'butan-1-ol', 'butyl alcohol')),
+    ('2-butanol', 'C4H10O', ('sec-butanol', 'butan-2-ol')),
+    ('tert-butanol', 'C4H10O', ('tert-butyl alcohol', 't-BuOH', '2-methyl-2-propanol')),
+    ('isobutanol', 'C4H10O', ('2-methyl-1-propanol', 'isobutyl alcohol')),
+    ('ethylene glycol', 'C2H6O2', ('ethane-1,2-diol', 'glycol')),
+    ('propylene glycol', 'C3H8O2', ('propane-1,2-diol',)),
+    ('glycerol', 'C3H8O3', ('glycerin', 'glycerine', 'propane-1,2,3-triol')),
+    ('acetone', 'C3H6O', ('propanone', 'dimethyl ketone')),
+    ('2-butanone', 'C4H8O', ('methyl ethyl ketone', 'MEK', 'butanone')),
+    ('methyl isobutyl ketone', 'C6H12O', ('MIBK', '4-methyl-2-pentanone')),
+    ('cyclohexanone', 'C6H10O', ()),
+    ('acetonitrile', 'C2H3N', ('MeCN', 'ACN', 'methyl cyanide')),
+    ('propionitrile', 'C3H5N', ('propanenitrile', 'ethyl cyanide')),
+    ('benzonitrile', 'C7H5N', ()),
+    ('dimethyl sulfoxide', 'C2H6OS', ('DMSO', 'methyl sulfoxide')),
+    ('N,N-dimethylformamide', 'C3H7NO', ('DMF', 'dimethylformamide')),
+    ('N,N-dimethylacetamide', 'C4H9NO', ('DMAc', 'DMA', 'dimethylacetamide')),
+    ('N-methyl-2-pyrrolidone', 'C5H9NO', ('NMP', 'N-methylpyrrolidone')),
+    ('hexamethylphosphoramide', 'C6H18N3OP', ('HMPA',)),
+    ('tetrahydrofuran', 'C4H8O', ('THF', 'oxolane')),
+    ('2-methyltetrahydrofuran', 'C5H10O', ('2-MeTHF',)),
+    ('1,4-dioxane', 'C4H8O2', ('dioxane',)),
+    ('diethyl ether', 'C4H10O', ('ether', 'ethyl ether', 'Et2O')),
+    ('methyl tert-butyl ether', 'C5H12O', ('MTBE', 'tert-butyl methyl ether')),
+    ('1,2-dimethoxyethane', 'C4H10O2', ('DME', 'glyme', 'monoglyme')),
+    ('diglyme', 'C6H14O3', ('bis(2-methoxyethyl) ether',)),
+    ('dichloromethane', 'CH2Cl2', ('DCM', 'methylene chloride')),
+    ('chloroform', 'CHCl3', ('trichloromethane',)),
+    ('carbon tetrachloride', 'CCl4', ('tetrachloromethane',)),
+    ('1,2-dichloroethane', 'C2H4Cl2', ('DCE', 'ethylene dichloride')),
+    ('chlorobenzene', 'C6H5Cl', ()),
+    ('1,2-dichlorobenzene', 'C6H4Cl2', ('o-dichlorobenzene', 'ODCB')),
+    ('benzene', 'C6H6', ()),
+    ('toluene', 'C7H8', ('methylbenzene',)),
+    ('o-xylene', 'C8H10', ('1,2-dimethylbenzene',)),
+    ('m-xylene', 'C8H10', ('1,3-dimethylbenzene',)),
+    ('p-xylene', 'C8H10', ('1,4-dimethylbenzene',)),
+    ('mesitylene', 'C9H12', ('1,3,5-trimethylbenzene',)),
+    ('pentane', 'C5H12', ('n-pentane',)),
+    ('hexane', 'C6H14', ('n-hexane',)),
+    ('heptane', 'C7H16', ('n-heptane',)),
+    ('cyclopentane', 'C5H10', ()),
+    ('cyclohexane', 'C6H12', ()),
+    ('isooctane', 'C8H18', ('2,2,4-trimethylpentane',)),
+    ('ethyl acetate', 'C4H8O2', ('EtOAc', 'ethyl ethanoate')),
+    ('methyl acetate', 'C3H6O2', ('methyl ethanoate',)),
+    ('isopropyl acetate', 'C5H10O2', ('iPrOAc',)),
+    ('butyl acetate', 'C6H12O2', ('n-butyl acetate',)),
+    ('pyridine', 'C5H5N', ('py',)),
+    ('2,6-lutidine', 'C7H9N', ('2,6-dimethylpyridine',)),
+    ('nitromethane', 'CH3NO2', ('MeNO2',)),
+    ('nitrobenzene', 'C6H5NO2', ()),
+    ('carbon disulfide', 'CS2', ()),
+    ('formamide', 'CH3NO', ()),
+    # Bases and amines
+    ('ammonia', 'NH3', ('azane',)),
+    ('triethylamine', 'C6H15N', ('TEA', 'Et3N')),
+    ('N,N-diisopropylethylamine', 'C8H19N', ('DIPEA', 'DIEA', "Hunig's base")),
+    ('diisopropylamine', 'C6H15N', ('DIPA',)),
+    ('diethylamine', 'C4H11N', ('Et2NH',)),
+    ('morpholine', 'C4H9NO', ()),
+    ('piperidine', 'C5H11N', ()),
+    ('pyrrolidine', 'C4H9N', ()),
+    ('N-methylmorpholine', 'C5H11NO', ('NMM',)),
+    ('4-dimethylaminopyridine', 'C7H10N2', ('DMAP',)),
+    ('1,8-diazabicyclo[5.4.0]undec-7-ene', 'C9H16N2', ('DBU',)),
+    ('1,4-diazabicyclo[2.2.2]octane', 'C6H12N2', ('DABCO',)),
+    ('imidazole', 'C3H4N2', ()),
+    ('aniline', 'C6H7N', ('aminobenzene', 'phenylamine')),
+    ('hydrazine', 'N2H4', ()),
+    ('hydrazine hydrate', 'N2H4(H2O)', ()),
+    ('hydroxylamine hydrochloride', 'NH2OHHCl', ('hydroxylammonium chloride',)),
+    ('N,N,N\',N\'-tetramethylethylenediamine', 'C6H16N2', ('TEMED', 'TMEDA')),
+    # Acids
+    ('hydrochloric acid', 'HCl', ('hydrogen chloride', 'muriatic acid')),
+    ('hydrobromic acid', 'HBr', ('hydrogen bromide',)),
+    ('hydroiodic acid', 'HI', ('hydrogen iodide',)),
+    ('hydrofluoric acid', 'HF', ('hydrogen fluoride',)),
+    ('sulfuric acid', 'H2SO4', ('sulphuric acid', 'oil of vitriol')),
+    ('sulfurous acid', 'H2SO3', ()),
+    ('nitric acid', 'HNO3', ()),
+    ('nitrous acid', 'HNO2', ()),
+    ('phosphoric acid', 'H3PO4', ('orthophosphoric acid',)),
+    ('perchloric acid', 'HClO4', ()),
+    ('chloric acid', 'HClO3', ()),
+    ('hypochlorous acid', 'HClO', ()),
+    ('boric acid', 'H3BO3', ('boracic acid',)),
+    ('carbonic acid', 'H2CO3', ()),
+    ('hydrogen cyanide', 'HCN', ('prussic acid', 'hydrocyanic acid')),
+    ('hydrogen sulfide', 'H2S', ()),
+    ('chromic acid', 'H2CrO4', ()),
+    ('acetic acid', 'CH3COOH', ('ethanoic acid', 'AcOH', 'glacial acetic acid')),
+    ('acetic anhydride', 'C4H6O3', ('Ac2O',)),
+    ('formic acid', 'HCOOH', ('methanoic acid',)),
+    ('propionic acid', 'C3H6O2', ('propanoic acid',)),
+    ('trifluoroacetic acid', 'C2HF3O2', ('TFA',)),
+    ('trifluoroacetic anhydride', 'C4F6O3', ('TFAA',)),
+    ('trichloroacetic acid', 'C2HCl3O2', ('TCA',)),
+    ('methanesulfonic acid', 'CH4O3S', ('MsOH',)),
+    ('p-toluenesulfonic acid', 'C7H8O3S', ('TsOH', 'tosic acid', 'PTSA')),
+    ('trifluoromethanesulfonic acid', 'CHF3O3S', ('triflic acid', 'TfOH')),
+    ('oxalic acid', 'C2H2O4', ('ethanedioic acid',)),
+    ('citric acid', 'C6H8O7', ()),
+    ('tartaric acid', 'C4H6O6', ()),
+    ('lactic acid', 'C3H6O3', ()),
+    ('malonic acid', 'C3H4O4', ()),
+    ('succinic acid', 'C4H6O4', ()),
+    ('maleic acid', 'C4H4O4', ()),
+    ('fumaric acid', 'C4H4O4', ()),
+    ('benzoic acid', 'C7H6O2', ()),
+    ('salicylic acid', 'C7H6O3', ()),
+    ('ascorbic acid', 'C6H8O6', ('vitamin C',)),
+    ('ethylenediaminetetraacetic acid', 'C10H16N2O8', ('EDTA',)),
+    ('disodium EDTA', 'C10H14N2Na2O8', ('Na2EDTA', 'edetate disodium')),
+    # Gases and simple inorganics
+    ('carbon dioxide', 'CO2', ('dry ice',)),
+    ('carbon monoxide', 'CO', ()),
+    ('nitric oxide', 'NO', ('nitrogen monoxide',)),
+    ('nitrogen dioxide', 'NO2', ()),
+    ('nitrous oxide', 'N2O', ('laughing gas', 'dinitrogen monoxide')),
+    ('sulfur dioxide', 'SO2', ()),
+    ('sulfur trioxide', 'SO3', ()),
+    ('ozone', 'O3', ('trioxygen',)),
+    ('hydrogen peroxide', 'H2O2', ()),
+    ('silicon dioxide', 'SiO2', ('silica', 'quartz')),
+    ('titanium(IV) oxide', 'TiO2', ('titanium dioxide', 'titania')),
+    ('manganese(IV) oxide', 'MnO2', ('manganese dioxide',)),
+    ('osmium tetroxide', 'OsO4', ('osmium(VIII) oxide',)),
+    ('phosphorus pentoxide', 'P4O10', ('phosphorus(V) oxide', 'P4O10')),
+    ('methane', 'CH4', ()),
+    ('ethane', 'C2H6', ()),
+    ('propane', 'C3H8', ()),
+    ('butane', 'C4H10', ('n-butane',)),
+    ('ethylene', 'C2H4', ('ethene',)),
+    ('propylene', 'C3H6', ('propene',)),
+    ('acetylene', 'C2H2', ('ethyne',)),
+    # Common and trivial names of salts
+    ('sodium chloride', 'NaCl', ('table salt', 'common salt', 'halite', 'rock salt')),
+    ('sodium bicarbonate', 'NaHCO3', ('baking soda', 'sodium hydrogen carbonate')),
+    ('sodium carbonate', 'Na2CO3', ('washing soda', 'soda ash')),
+    ('sodium hydroxide', 'NaOH', ('caustic soda', 'lye')),
+    ('potassium hydroxide', 'KOH', ('caustic potash',)),
+    ('potassium nitrate', 'KNO3', ('saltpeter', 'saltpetre', 'nitre')),
+    ('sodium nitrate', 'NaNO3', ('Chile saltpeter',)),
+    ('ammonium chloride', 'NH4Cl', ('sal ammoniac',)),
+    ('ammonium hydroxide', 'NH4OH', ('ammonia solution', 'aqueous ammonia')),
+    ('ammonium peroxydisulfate', '(NH4)2S2O8', ('ammonium persulfate', 'APS')),
+    ('calcium oxide', 'CaO', ('quicklime', 'burnt lime', 'lime')),
+    ('calcium hydroxide', 'Ca(OH)2', ('slaked lime', 'hydrated lime')),
+    ('calcium carbonate', 'CaCO3', ('chalk', 'calcite', 'limestone')),
+    ('calcium sulfate dihydrate', 'CaSO4(H2O)2', ('gypsum',)),
+    ('magnesium sulfate heptahydrate', 'MgSO4(H2O)7', ('Epsom salt', 'epsomite')),
+    ('copper(II) sulfate pentahydrate', 'CuSO4(H2O)5', ('blue vitriol', 'bluestone')),
+    ('iron(II) sulfate heptahydrate', 'FeSO4(H2O)7', ('green vitriol',)),
+    ('zinc sulfate heptahydrate', 'ZnSO4(H2O)7', ('white vitriol',)),
+    ('sodium thiosulfate pentahydrate', 'Na2S2O3(H2O)5', ('hypo',)),
+    ('sodium sulfate decahydrate', 'Na2SO4(H2O)10', ("Glauber's salt",)),
+    ('sodium carbonate decahydrate', 'Na2CO3(H2O)10', ('sal soda',)),
+    ('sodium acetate trihydrate', 'CH3COONa(H2O)3', ()),
+    ('sodium tetraborate decahydrate', 'Na2B4O7(H2O)10', ('borax',)),
+    ('potassium aluminium sulfate dodecahydrate', 'KAl(SO4)2(H2O)12', ('alum', 'potash alum')),
+    ('calcium chloride dihydrate', 'CaCl2(H2O)2', ()),
+    ('magnesium chloride hexahydrate', 'MgCl2(H2O)6', ()),
+    ('cobalt(II) chloride hexahydrate', 'CoCl2(H2O)6', ()),
+    ('nickel(II) chloride hexahydrate', 'NiCl2(H2O)6', ()),
+    ('iron(III) chloride hexahydrate', 'FeCl3(H2O)6', ()),
+    ('barium chloride dihydrate', 'BaCl2(H2O)2', ()),
+    ('potassium ferricyanide', 'K3Fe(CN)6', ('potassium hexacyanoferrate(III)',)),
+    ('potassium ferrocyanide', 'K4Fe(CN)6', ('potassium hexacyanoferrate(II)',)),
+    ('potassium peroxymonosulfate', 'KHSO5', ()),
+    ('ammonium molybdate tetrahydrate', '(NH4)6Mo7O24(H2O)4', ()),
+    ('ceric ammonium nitrate', '(NH4)2Ce(NO3)6', ('CAN', 'ammonium cerium(IV) nitrate')),
+    ('lead(IV) acetate', 'Pb(CH3COO)4', ('lead tetraacetate',)),
+    ('palladium(II) acetate', 'Pd(CH3COO)2', ('Pd(OAc)2',)),
+    ('cisplatin', 'Pt(NH3)2Cl2', ('cis-diamminedichloroplatinum(II)',)),
+    # Hydrides, organometallics and reducing agents
+    ('sodium hydride', 'NaH', ()),
+    ('lithium hydride', 'LiH', ()),
+    ('potassium hydride', 'KH', ()),
+    ('calcium hydride', 'CaH2', ()),
+    ('sodium borohydride', 'NaBH4', ('sodium tetrahydroborate',)),
+    ('lithium borohydride', 'LiBH4', ()),
+    ('sodium cyanoborohydride', 'NaBH3CN', ()),
+    ('sodium triacetoxyborohydride', 'C6H10BNaO6', ('STAB', 'NaBH(OAc)3')),
+    ('lithium aluminium hydride', 'LiAlH4', ('lithium aluminum hydride', 'LAH', 'LiAlH4')),
+    ('diisobutylaluminium hydride', 'C8H19Al', ('DIBAL', 'DIBAL-H', 'diisobutylaluminum hydride')),
+    ('borane tetrahydrofuran complex', 'C4H11BO', ('BH3-THF', 'borane-THF')),
+    ('9-borabicyclo[3.3.1]nonane', 'C8H15B', ('9-BBN',)),
+    ('n-butyllithium', 'C4H9Li', ('n-BuLi', 'butyllithium')),
+    ('sec-butyllithium', 'C4H9Li', ('s-BuLi',)),
+    ('tert-butyllithium', 'C4H9Li', ('t-BuLi',)),
+    ('methyllithium', 'CH3Li', ('MeLi',)),
+    ('phenyllithium', 'C6H5Li', ('PhLi',)),
+    ('lithium diisopropylamide', 'C6H14LiN', ('LDA',)),
+    ('lithium bis(trimethylsilyl)amide', 'C6H18LiNSi2', ('LiHMDS', 'LHMDS')),
+    ('sodium bis(trimethylsilyl)amide', 'C6H18NNaSi2', ('NaHMDS',)),
+    ('potassium bis(trimethylsilyl)amide', 'C6H18KNSi2', ('KHMDS',)),
+    ('potassium tert-butoxide', 'C4H9KO', ('KOtBu', 't-BuOK')),
+    ('sodium tert-butoxide', 'C4H9NaO', ('NaOtBu',)),
+    ('sodium methoxide', 'CH3NaO', ('NaOMe', 'sodium methylate')),
+    ('sodium ethoxide', 'C2H5NaO', ('NaOEt',)),
+    ('methylmagnesium bromide', 'CH3MgBr', ('MeMgBr',)),
+    ('phenylmagnesium bromide', 'C6H5MgBr', ('PhMgBr',)),
+    ('isopropylmagnesium chloride', 'C3H7MgCl', ('iPrMgCl',)),
+    ('trimethylaluminium', 'C3H9Al', ('trimethylaluminum', 'AlMe3')),
+    ('diethylzinc', 'C4H10Zn', ('Et2Zn',)),
+    ('titanium(IV) isopropoxide', 'C12H28O4Ti', ('Ti(OiPr)4', 'titanium tetraisopropoxide')),
+    ('ferrocene', 'C10H10Fe', ()),
+    # Synthesis reagents
+    ('methyl iodide', 'CH3I', ('iodomethane', 'MeI')),
+    ('ethyl bromide', 'C2H5Br', ('bromoethane', 'EtBr')),
+    ('allyl bromide', 'C3H5Br', ('3-bromopropene',)),
+    ('benzyl bromide', 'C7H7Br', ('BnBr',)),
+    ('benzyl chloride', 'C7H7Cl', ('BnCl',)),
+    ('acetyl chloride', 'C2H3ClO', ('AcCl', 'ethanoyl chloride')),
+    ('benzoyl chloride', 'C7H5ClO', ('BzCl',)),
+    ('oxalyl chloride', 'C2Cl2O2', ('(COCl)2',)),
+    ('thionyl chloride', 'SOCl2', ()),
+    ('phosphorus oxychloride', 'POCl3', ('phosphoryl chloride',)),
+    ('phosphorus pentachloride', 'PCl5', ()),
+    ('phosphorus trichloride', 'PCl3', ()),
+    ('methanesulfonyl chloride', 'CH3ClO2S', ('MsCl', 'mesyl chloride')),
+    ('p-toluenesulfonyl chloride', 'C7H7ClO2S', ('TsCl', 'tosyl chloride')),
+    ('trifluoromethanesulfonic anhydride', 'C2F6O5S2', ('Tf2O', 'triflic anhydride')),
+    ('di-tert-butyl dicarbonate', 'C10H18O5', ('Boc2O', 'Boc anhydride')),
+    ('N,N\'-dicyclohexylcarbodiimide', 'C13H22N2', ('DCC',)),
+    ('EDC hydrochloride', 'C8H18ClN3', ('EDC', 'EDCI', '1-ethyl-3-(3-dimethylaminopropyl)carbodiimide hydrochloride')),
+    ('HATU', 'C10H15F6N6OP', ()),
+    ('HBTU', 'C11H16F6N5OP', ()),
+    ('1-hydroxybenzotriazole', 'C6H5N3O', ('HOBt',)),
+    ('N-hydroxysuccinimide', 'C4H5NO3', ('NHS',)),
+    ('1,1\'-carbonyldiimidazole', 'C7H6N4O', ('CDI', 'carbonyldiimidazole')),
+    ('N-bromosuccinimide', 'C4H4BrNO2', ('NBS',)),
+    ('N-chlorosuccinimide', 'C4H4ClNO2', ('NCS',)),
+    ('N-iodosuccinimide', 'C4H4INO2', ('NIS',)),
+    ('azobisisobutyronitrile', 'C8H12N4', ('AIBN',)),
+    ('benzoyl peroxide', 'C14H10O4', ('BPO', 'dibenzoyl peroxide')),
+    ('meta-chloroperoxybenzoic acid', 'C7H5ClO3', ('mCPBA', '3-chloroperbenzoic acid')),
+    ('Dess-Martin periodinane', 'C13H13IO8', ('DMP',)),
+    ('2-iodoxybenzoic acid', 'C7H5IO4', ('IBX',)),
+    ('TEMPO', 'C9H18NO', ('2,2,6,6-tetramethylpiperidine 1-oxyl',)),
+    ('triphenylphosphine', 'C18H15P', ('PPh3', 'TPP')),
+    ('triphenylphosphine oxide', 'C18H15OP', ('TPPO',)),
+    ('tributylphosphine', 'C12H27P', ('PBu3',)),
+    ('diethyl azodicarboxylate', 'C6H10N2O4', ('DEAD',)),
+    ('diisopropyl azodicarboxylate', 'C8H14N2O4', ('DIAD',)),
+    ('tetrakis(triphenylphosphine)palladium(0)', 'C72H60P4Pd', ('Pd(PPh3)4',)),
+    ('bis(triphenylphosphine)palladium(II) dichloride', 'C36H30Cl2P2Pd', ('Pd(PPh3)2Cl2',)),
+    ('tris(dibenzylideneacetone)dipalladium(0)', 'C51H42O3Pd2', ('Pd2(dba)3',)),
+    ('[1,1\'-bis(diphenylphosphino)ferrocene]dichloropalladium(II)', 'C34H28Cl2FeP2Pd', ('Pd(dppf)Cl2',)),
+    ('1,1\'-bis(diphenylphosphino)ferrocene', 'C34H28FeP2', ('dppf',)),
+    ("Wilkinson's catalyst", 'C54H45ClP3Rh', ('chlorotris(triphenylphosphine)rhodium(I)',)),
+    ('XPhos', 'C33H49P', ()),
+    ('SPhos', 'C26H35O2P', ()),
+    ('BINAP', 'C44H32P2', ()),
+    ('Xantphos', 'C39H32OP2', ()),
+    ('bis(pinacolato)diboron', 'C12H24B2O4', ('B2pin2',)),
+    ('pinacol', 'C6H14O2', ()),
+    ('phenylboronic acid', 'C6H7BO2', ()),
+    ('trimethyl borate', 'C3H9BO3', ()),
+    ('trimethylsilyl chloride', 'C3H9ClSi', ('TMSCl', 'chlorotrimethylsilane')),
+    ('tert-butyldimethylsilyl chloride', 'C6H15ClSi', ('TBSCl', 'TBDMSCl')),
+    ('triisopropylsilyl chloride', 'C9H21ClSi', ('TIPSCl',)),
+    ('tetrabutylammonium fluoride', 'C16H36FN', ('TBAF',)),
+    ('tetrabutylammonium bromide', 'C16H36BrN', ('TBAB',)),
+    ('tetrabutylammonium iodide', 'C16H36IN', ('TBAI',)),
+    ('18-crown-6', 'C12H24O6', ()),
+    ('acetylacetone', 'C5H8O2', ('acac', '2,4-pentanedione')),
+    # Organic building blocks
+    ('formaldehyde', 'CH2O', ('methanal',)),
+    ('acetaldehyde', 'C2H4O', ('ethanal',)),
+    ('benzaldehyde', 'C7H6O', ()),
+    ('benzyl alcohol', 'C7H8O', ('BnOH',)),
+    ('acetophenone', 'C8H8O', ()),
+    ('anisole', 'C7H8O', ('methoxybenzene',)),
+    ('phenol', 'C6H6O', ('carbolic acid',)),
+    ('naphthalene', 'C10H8', ()),
+    ('anthracene', 'C14H10', ()),
+    ('styrene', 'C8H8', ('vinylbenzene',)),
+    ('acrylamide', 'C3H5NO', ()),
+    ('N,N\'-methylenebisacrylamide', 'C7H10N2O2', ('bis-acrylamide', 'bisacrylamide')),
+    ('urea', 'CH4N2O', ('carbamide',)),
+    ('thiourea', 'CH4N2S', ()),
+    # Biochemistry
+    ('glucose', 'C6H12O6', ('dextrose', 'D-glucose')),
+    ('fructose', 'C6H12O6', ('D-fructose', 'fruit sugar')),
+    ('galactose', 'C6H12O6', ('D-galactose',)),
+    ('sucrose', 'C12H22O11', ('table sugar', 'saccharose')),
+    ('lactose', 'C12H22O11', ('milk sugar',)),
+    ('maltose', 'C12H22O11', ('malt sugar',)),
+    ('ribose', 'C5H10O5', ('D-ribose',)),
+    ('deoxyribose', 'C5H10O4', ('2-deoxyribose',)),
+    ('mannitol', 'C6H14O6', ('D-mannitol',)),
+    ('sorbitol', 'C6H14O6', ('D-sorbitol', 'glucitol')),
+    ('glycine', 'C2H5NO2', ('Gly',)),
+    ('alanine', 'C3H7NO2', ('L-alanine', 'Ala')),
+    ('valine', 'C5H11NO2', ('L-valine', 'Val')),
+    ('leucine', 'C6H13NO2', ('L-leucine', 'Leu')),
+    ('isoleucine', 'C6H13NO2', ('L-isoleucine', 'Ile')),
+    ('proline', 'C5H9NO2', ('L-proline', 'Pro')),
+    ('serine', 'C3H7NO3', ('L-serine', 'Ser')),
+    ('threonine', 'C4H9NO3', ('L-threonine', 'Thr')),
+    ('cysteine', 'C3H7NO2S', ('L-cysteine', 'Cys')),
+    ('methionine', 'C5H11NO2S', ('L-methionine', 'Met')),
+    ('asparagine', 'C4H8N2O3', ('L-asparagine', 'Asn')),
+    ('glutamine', 'C5H10N2O3', ('L-glutamine', 'Gln')),
+    ('aspartic acid', 'C4H7NO4', ('L-aspartic acid', 'Asp')),
+    ('glutamic acid', 'C5H9NO4', ('L-glutamic acid', 'Glu')),
+    ('lysine', 'C6H14N2O2', ('L-lysine', 'Lys')),
+    ('arginine', 'C6H14N4O2', ('L-arginine', 'Arg')),
+    ('histidine', 'C6H9N3O2', ('L-histidine', 'His')),
+    ('phenylalanine', 'C9H11NO2', ('L-phenylalanine', 'Phe')),
+    ('tyrosine', 'C9H11NO3', ('L-tyrosine', 'Tyr')),
+    ('tryptophan', 'C11H12N2O2', ('L-tryptophan', 'Trp')),
+    ('tris(hydroxymethyl)aminomethane', 'C4H11NO3', ('Tris', 'THAM', 'tromethamine')),
+    ('HEPES', 'C8H18N2O4S', ()),
+    ('MES', 'C6H13NO4S', ('2-(N-morpholino)ethanesulfonic acid',)),
+    ('MOPS', 'C7H15NO4S', ('3-(N-morpholino)propanesulfonic acid',)),
+    ('PIPES', 'C8H18N2O6S2', ()),
+    ('bicine', 'C6H13NO4', ()),
+    ('tricine', 'C6H13NO5', ()),
+    ('guanidine hydrochloride', 'CH6ClN3', ('guanidinium chloride', 'GuHCl')),
+    ('dithiothreitol', 'C4H10O2S2', ('DTT', "Cleland's reagent")),
+    ('2-mercaptoethanol', 'C2H6OS', ('beta-mercaptoethanol', 'BME', '2-ME')),
+    ('sodium dodecyl sulfate', 'C12H25NaO4S', ('SDS', 'sodium lauryl sulfate')),
+    ('phenylmethylsulfonyl fluoride', 'C7H7FO2S', ('PMSF',)),
+    ('isopropyl beta-D-1-thiogalactopyranoside', 'C9H18O5S', ('IPTG',)),
+    ('X-gal', 'C14H15BrClNO6', ('5-bromo-4-chloro-3-indolyl beta-D-galactopyranoside',)),
+    ('diethyl pyrocarbonate', 'C6H10O5', ('DEPC',)),
+    ('adenosine triphosphate', 'C10H16N5O13P3', ('ATP',)),
+    ('adenosine diphosphate', 'C10H15N5O10P2', ('ADP',)),
+    ('ampicillin', 'C16H19N3O4S', ()),
+    ('kanamycin', 'C18H36N4O11', ('kanamycin A',)),
+    ('chloramphenicol', 'C11H12Cl2N2O5', ()),
+    ('ethidium bromide', 'C21H20BrN3', ('EtBr stain',)),
+    ('bromophenol blue', 'C19H10Br4O5S', ()),
+    # Drugs and natural products
+    ('caffeine', 'C8H10N4O2', ()),
+    ('aspirin', 'C9H8O4', ('acetylsalicylic acid', 'ASA')),
+    ('paracetamol', 'C8H9NO2', ('acetaminophen',)),
+    ('ibuprofen', 'C13H18O2', ()),
+    ('cholesterol', 'C27H46O', ()),
+)
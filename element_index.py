@@ -0,0 +1,140 @@
+"""
+Element Index - Inverted index from elements to the library compounds that
+contain them
+
+Every SavedCompound has one CompoundElement row per element in its parsed
+formula, holding the atom count. "Contains Pd", "no halogens" and "6 to 10
+carbons" then become lookups on the (element, count, compound_id) index
+instead of LIKE scans over formula strings, which also cannot tell C from
+Cl. CompoundLibrary keeps the rows in sync on add, delete and import;
+backfill() indexes compounds saved before the table existed.
+
+Filters:
+    include   elements that must be present
+    exclude   elements that must be absent
+    counts    element -> (min, max) atom counts, either bound may be None;
+              a minimum of 0 (or None) also allows the element to be absent
+Group names from ELEMENT_GROUPS (e.g. "halogens") stand for their elements.
+"""
+import logging
+
+from models import CompoundElement, SavedCompound, db
+
+logger = logging.getLogger(__name__)
+
+ELEMENT_GROUPS = {
+    'halogens': ('F', 'Cl', 'Br', 'I', 'At'),
+    'alkali_metals': ('Li', 'Na', 'K', 'Rb', 'Cs', 'Fr'),
+    'alkaline_earth_metals': ('Be', 'Mg', 'Ca', 'Sr', 'Ba', 'Ra'),
+    'noble_gases': ('He', 'Ne', 'Ar', 'Kr', 'Xe', 'Rn'),
+    'platinum_group': ('Ru', 'Rh', 'Pd', 'Os', 'Ir', 'Pt'),
+}
+
+
+def element_rows(calculator, compound_id, formula):
+    """CompoundElement values for a compound, empty if its formula cannot be parsed"""
+    element_counts = calculator.element_counts(formula)
+    if not element_counts:
+        return []
+    return [{'compound_id': compound_id, 'element': element, 'count': count}
+            for element, count in element_counts.items() if count]
+
+
+def index_compounds(calculator, compounds):
+    """Add element rows for (id, formula) pairs in the current transaction"""
+    rows = []
+    for compound_id, formula in compounds:
+        rows.extend(element_rows(calculator, compound_id, formula))
+    if rows:
+        db.session.execute(db.insert(CompoundElement), rows)
+    return len(rows)
+
+
+def unindex_compounds(compound_ids):
+    """Remove the element rows of compounds in the current transaction"""
+    if compound_ids:
+        CompoundElement.query.filter(CompoundElement.compound_id.in_(compound_ids)) \
+            .delete(synchronize_session=False)
+
+
+def backfill(calculator):
+    """Index saved compounds that have no element rows yet, return how many were indexed"""
+    indexed = db.session.query(CompoundElement.compound_id)
+    compounds = db.session.query(SavedCompound.id, SavedCompound.formula) \
+        .filter(SavedCompound.id.not_in(indexed)).all()
+    if not compounds:
+        return 0
+    index_compounds(calculator, compounds)
+    db.session.commit()
+    # Compounds with unparsable formulas get no rows and are retried, which is cheap
+    logger.info("Indexed elements of %d saved compounds", len(compounds))
+    return len(compounds)
+
+
+def expand_elements(calculator, elements):
+    """Element symbols from a list of symbols and group names"""
+    symbols = []
+    for element in elements or []:
+        element = str(element).strip()
+        if not element:
+            continue
+        group = ELEMENT_GROUPS.get(element.lower())
+        if group:
+            symbols.extend(group)
+        elif element in calculator.element_masses:
+            symbols.append(element)
+        else:
+            raise ValueError(f"Unknown element or group: {element}")
+    return list(dict.fromkeys(symbols))
+
+
+def parse_count_ranges(text):
+    """Count ranges from "C:6-10,H:-12,N:1-" style text"""
+    counts = {}
+    for part in (text or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        element, _, bounds = part.partition(':')
+        low, dash, high = bounds.partition('-')
+        try:
+            low = int(low) if low.strip() else None
+            high = int(high) if high.strip() else (None if dash else low)
+        except ValueError:
+            raise ValueError(f"Invalid count range: {part}")
+        counts[element.strip()] = (low, high)
+    return counts
+
+
+def element_filters(calculator, include=None, exclude=None, counts=None):
+    """SQL criteria on SavedCompound.id for element include/exclude/count filters"""
+    include = expand_elements(calculator, include)
+    exclude = expand_elements(calculator, exclude)
+    criteria = []
+    for element in include:
+        criteria.append(SavedCompound.id.in_(
+            db.select(CompoundElement.compound_id).where(CompoundElement.element == element)))
+    if exclude:
+        criteria.append(SavedCompound.id.not_in(
+            db.select(CompoundElement.compound_id).where(CompoundElement.element.in_(exclude))))
+
+    for element, bounds in (counts or {}).items():
+        if element not in calculator.element_masses:
+            raise ValueError(f"Unknown element: {element}")
+        low, high = bounds
+        if low is not None and high is not None and low > high:
+            raise ValueError(f"Count range for {element} is empty")
+        if low:
+            conditions = [CompoundElement.element == element, CompoundElement.count >= low]
+            if high is not None:
+                conditions.append(CompoundElement.count <= high)
+            criteria.append(SavedCompound.id.in_(db.select(CompoundElement.compound_id).where(*conditions)))
+        elif high is not None:
+            # Absent counts as zero, so only too many atoms rule a compound out
+            criteria.append(SavedCompound.id.not_in(db.select(CompoundElement.compound_id).where(
+                CompoundElement.element == element, CompoundElement.count > high)))
+
+    if not include and not any(low for low, _ in (counts or {}).values()):
+        # Pure exclusions would otherwise also match compounds that were never indexed
+        criteria.append(SavedCompound.id.in_(db.select(CompoundElement.compound_id)))
+    return criteria
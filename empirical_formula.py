@@ -0,0 +1,186 @@
+"""
+Empirical Formula - Most likely formulas from percent composition
+(combustion/elemental analysis), using the element_masses table of
+MolarMassCalculator
+
+Percentages are turned into mole ratios relative to the scarcest element.
+Each ratio is expanded as a continued fraction; the denominators of its
+convergents are the multipliers that make that ratio nearly whole. Every
+multiplier up to max_denominator built from those is tried, along with the
+small integers up to SMALL_MULTIPLIERS, so near misses show up as
+alternatives (Fe 69.9 / O 30.1 gives Fe2O3, then Fe9O14, Fe7O11, Fe5O8 and
+Fe3O5). The rounded counts are scored by how far their theoretical
+composition is from the measurement, and all candidates are ranked by that
+error.
+"""
+from fractions import Fraction
+from math import gcd
+
+from calculator import hill_formula
+
+DEFAULT_MAX_DENOMINATOR = 12
+DEFAULT_MAX_CANDIDATES = 5
+DEFAULT_MASS_TOLERANCE = 0.01  # relative, for molecular formula multiples
+MAX_DENOMINATOR_LIMIT = 60
+SMALL_MULTIPLIERS = 10  # every multiplier up to this is tried (capped by max_denominator)
+
+
+def convergents(value, max_denominator):
+    """Continued fraction convergents of value with denominator <= max_denominator"""
+    results = []
+    p_prev, q_prev, p, q = 1, 0, int(value), 1
+    remainder = value - int(value)
+    results.append(Fraction(p, q))
+    while remainder > 1e-9:
+        value = 1 / remainder
+        term = int(value)
+        remainder = value - term
+        p_prev, q_prev, p, q = p, q, term * p + p_prev, term * q + q_prev
+        if q > max_denominator:
+            break
+        results.append(Fraction(p, q))
+    return results
+
+
+def composition_percentages(element_counts, element_masses):
+    """Mass percent of each element in a composition"""
+    masses = {element: element_masses[element] * count for element, count in element_counts.items()}
+    total = sum(masses.values())
+    return {element: 100.0 * mass / total for element, mass in masses.items()}
+
+
+class EmpiricalFormulaSolver:
+    def __init__(self, calculator):
+        self.calculator = calculator
+
+    def _normalize(self, percentages, remainder):
+        """Validate percentages, fill in the remainder element, scale to 100"""
+        if not isinstance(percentages, dict) or not percentages:
+            raise ValueError("Provide percentages as a mapping of element to percent")
+        measured = {}
+        for element, percent in percentages.items():
+            if element not in self.calculator.element_masses:
+                raise ValueError(f"Unknown element: {element}")
+            percent = float(percent)
+            if percent < 0:
+                raise ValueError(f"Percentage for {element} must not be negative")
+            if percent > 0:
+                measured[element] = percent
+
+        total = sum(measured.values())
+        if remainder:
+            if remainder not in self.calculator.element_masses:
+                raise ValueError(f"Unknown element: {remainder}")
+            if remainder in measured:
+                raise ValueError(f"{remainder} cannot be both measured and the remainder")
+            if total >= 100:
+                raise ValueError("Percentages leave nothing for the remainder element")
+            measured[remainder] = 100.0 - total
+            total = 100.0
+        if not measured:
+            raise ValueError("At least one percentage must be positive")
+        # Analyses rarely sum to exactly 100; ratios are unaffected by rescaling
+        return {element: 100.0 * percent / total for element, percent in measured.items()}
+
+    def _multipliers(self, ratios, max_denominator):
+        """Multipliers under which some ratio becomes (nearly) an integer, plus
+        every small integer up to SMALL_MULTIPLIERS"""
+        denominators = {1}
+        for ratio in ratios:
+            denominators.update(fraction.denominator for fraction in convergents(ratio, max_denominator))
+        multipliers = set(denominators)
+        # Least common multiples of pairs cover ratios that need different denominators
+        for a in denominators:
+            for b in denominators:
+                lcm = a * b // gcd(a, b)
+                if lcm <= max_denominator:
+                    multipliers.add(lcm)
+        multipliers.update(range(1, min(SMALL_MULTIPLIERS, max_denominator) + 1))
+        return sorted(multipliers)
+
+    def solve(self, percentages, remainder=None, molar_mass=None,
+              max_denominator=DEFAULT_MAX_DENOMINATOR, max_candidates=DEFAULT_MAX_CANDIDATES,
+              mass_tolerance=DEFAULT_MASS_TOLERANCE):
+        """Ranked empirical formula candidates for one analysis.
+
+        When molar_mass is given each candidate also carries the integer
+        multiple and molecular formula that match it within mass_tolerance,
+        and candidates with a matching multiple rank first.
+        """
+        max_denominator = int(max_denominator)
+        if not 1 <= max_denominator <= MAX_DENOMINATOR_LIMIT:
+            raise ValueError(f"max_denominator must be between 1 and {MAX_DENOMINATOR_LIMIT}")
+        if molar_mass is not None:
+            molar_mass = float(molar_mass)
+            if molar_mass <= 0:
+                raise ValueError("Molar mass must be positive")
+
+        measured = self._normalize(percentages, remainder)
+        element_masses = self.calculator.element_masses
+        elements = sorted(measured)
+        moles = [measured[element] / element_masses[element] for element in elements]
+        smallest = min(moles)
+        ratios = [value / smallest for value in moles]
+
+        candidates = {}
+        for multiplier in self._multipliers(ratios, max_denominator):
+            counts = [max(1, round(ratio * multiplier)) for ratio in ratios]
+            divisor = 0
+            for value in counts:
+                divisor = gcd(divisor, value)
+            counts = tuple(value // divisor for value in counts)
+            if counts in candidates:
+                continue
+
+            element_counts = dict(zip(elements, counts))
+            theoretical = composition_percentages(element_counts, element_masses)
+            deviations = [abs(theoretical[element] - measured[element]) for element in elements]
+            empirical_mass = sum(element_masses[element] * count for element, count in element_counts.items())
+
+            candidate = {
+                'formula': hill_formula(element_counts),
+                'elements': element_counts,
+                'empirical_mass': empirical_mass,
+                'max_deviation': max(deviations),
+                'rms_deviation': (sum(d * d for d in deviations) / len(deviations)) ** 0.5,
+                'theoretical_percentages': theoretical
+            }
+            if molar_mass is not None:
+                multiple = max(1, round(molar_mass / empirical_mass))
+                mass_error = abs(multiple * empirical_mass - molar_mass) / molar_mass
+                candidate['multiple'] = multiple
+                candidate['molecular_formula'] = (hill_formula({element: count * multiple
+                                                                for element, count in element_counts.items()})
+                                                  if mass_error <= mass_tolerance else None)
+                candidate['molecular_mass_error'] = mass_error
+            candidates[counts] = candidate
+
+        def rank(candidate):
+            unmatched = molar_mass is not None and candidate['molecular_formula'] is None
+            return (unmatched, round(candidate['max_deviation'], 6), sum(candidate['elements'].values()))
+
+        ranked = sorted(candidates.values(), key=rank)[:int(max_candidates)]
+        return {
+            'measured_percentages': measured,
+            'molar_mass': molar_mass,
+            'candidates': ranked
+        }
+
+    def solve_many(self, samples):
+        """Solve a sheet of analyses, one result or error dict per sample"""
+        results = []
+        for sample in samples:
+            try:
+                if not isinstance(sample, dict):
+                    raise ValueError("Each sample must be an object")
+                result = self.solve(sample.get('percentages'),
+                                    remainder=sample.get('remainder'),
+                                    molar_mass=sample.get('molar_mass'),
+                                    max_denominator=sample.get('max_denominator', DEFAULT_MAX_DENOMINATOR),
+                                    max_candidates=sample.get('max_candidates', DEFAULT_MAX_CANDIDATES))
+            except (TypeError, ValueError) as e:
+                result = {'error': str(e)}
+            if isinstance(sample, dict) and 'name' in sample:
+                result['name'] = sample['name']
+            results.append(result)
+        return results
@@ -0,0 +1,250 @@
+"""
+Equation Balancer - Balance chemical equations with exact rational linear algebra
+Builds the element-by-species matrix from MolarMassCalculator.parse_formula and
+solves for the smallest positive integer coefficients from its nullspace
+"""
+import re
+import threading
+from collections import OrderedDict
+from fractions import Fraction
+from math import gcd
+
+ARROW_PATTERN = re.compile(r'\s*(?:->|=>|→|=)\s*')
+COEFFICIENT_PATTERN = re.compile(r'^(\d+)\s*(.+)$')
+
+
+class CacheInfo:
+    def __init__(self, hits, misses, maxsize, currsize):
+        self.hits = hits
+        self.misses = misses
+        self.maxsize = maxsize
+        self.currsize = currsize
+
+
+def split_equation(equation):
+    """Split 'Fe + O2 -> Fe2O3' into (['Fe', 'O2'], ['Fe2O3'])"""
+    if not isinstance(equation, str):
+        raise ValueError("Equation must be a string, e.g. 'H2 + O2 -> H2O'")
+    sides = ARROW_PATTERN.split(equation.strip())
+    if len(sides) != 2:
+        raise ValueError("Equation must have exactly one arrow, e.g. 'H2 + O2 -> H2O'")
+
+    def species(side):
+        formulas = []
+        for term in side.split('+'):
+            term = term.strip()
+            # Ignore any coefficients typed by the user; they are solved for
+            match = COEFFICIENT_PATTERN.match(term)
+            if match:
+                term = match.group(2).strip()
+            if term:
+                formulas.append(term)
+        return formulas
+
+    reactants, products = species(sides[0]), species(sides[1])
+    if not reactants or not products:
+        raise ValueError("Equation needs at least one reactant and one product")
+    return reactants, products
+
+
+def nullspace(matrix, columns):
+    """Basis of the rational nullspace of a matrix given as a list of Fraction rows"""
+    rows = [row[:] for row in matrix]
+    pivot_columns = []
+    pivot_row = 0
+
+    # Reduced row echelon form
+    for col in range(columns):
+        pivot = next((r for r in range(pivot_row, len(rows)) if rows[r][col] != 0), None)
+        if pivot is None:
+            continue
+        rows[pivot_row], rows[pivot] = rows[pivot], rows[pivot_row]
+        factor = rows[pivot_row][col]
+        rows[pivot_row] = [value / factor for value in rows[pivot_row]]
+        for r in range(len(rows)):
+            if r != pivot_row and rows[r][col] != 0:
+                scale = rows[r][col]
+                rows[r] = [a - scale * b for a, b in zip(rows[r], rows[pivot_row])]
+        pivot_columns.append(col)
+        pivot_row += 1
+        if pivot_row == len(rows):
+            break
+
+    # One basis vector per free column
+    basis = []
+    for free in (c for c in range(columns) if c not in pivot_columns):
+        vector = [Fraction(0)] * columns
+        vector[free] = Fraction(1)
+        for r, col in enumerate(pivot_columns):
+            vector[col] = -rows[r][free]
+        basis.append(vector)
+    return basis
+
+
+def smallest_integers(vector):
+    """Scale a rational vector to the smallest integer vector with the same direction"""
+    denominator_lcm = 1
+    for value in vector:
+        denominator_lcm = denominator_lcm * value.denominator // gcd(denominator_lcm, value.denominator)
+    integers = [int(value * denominator_lcm) for value in vector]
+    divisor = 0
+    for value in integers:
+        divisor = gcd(divisor, abs(value))
+    return [value // divisor for value in integers] if divisor else integers
+
+
+class EquationBalancer:
+    def __init__(self, calculator, cache_size=1024):
+        self.calculator = calculator
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def _parse_species(self, formulas):
+        """Parse and validate every formula, return a list of element count dicts"""
+        compositions = []
+        for formula in formulas:
+            element_counts = self.calculator.parse_formula(formula)
+            if not element_counts:
+                raise ValueError(f"Invalid chemical formula: {formula}")
+            if not self.calculator.validate_elements(element_counts):
+                raise ValueError(f"Invalid element in formula: {formula}")
+            compositions.append(element_counts)
+        return compositions
+
+    def _solve(self, reactants, products):
+        """Integer coefficients for species in the given order"""
+        species = list(reactants) + list(products)
+        if len(set(species)) != len(species):
+            raise ValueError("Each species may only appear once in an equation")
+
+        compositions = self._parse_species(species)
+        elements = sorted({element for counts in compositions for element in counts})
+        reactant_count = len(reactants)
+
+        # Reactant columns count positive, product columns negative
+        matrix = []
+        for element in elements:
+            row = []
+            for index, counts in enumerate(compositions):
+                sign = 1 if index < reactant_count else -1
+                row.append(Fraction(sign * counts.get(element, 0)))
+            matrix.append(row)
+
+        if len(elements) == 0:
+            raise ValueError("Equation contains no elements")
+        basis = nullspace(matrix, len(species))
+        if not basis:
+            raise ValueError("Equation cannot be balanced: elements do not match on both sides")
+        if len(basis) > 1:
+            raise ValueError("Equation has more than one independent balanced form; split it into separate reactions")
+
+        coefficients = smallest_integers(basis[0])
+        if all(value <= 0 for value in coefficients):
+            coefficients = [-value for value in coefficients]
+        if any(value <= 0 for value in coefficients):
+            raise ValueError("Equation cannot be balanced with positive coefficients")
+        return coefficients
+
+    def _cached_solve(self, reactants, products):
+        """Solve once per canonical reaction, return (coefficients, cache hit)"""
+        # Canonical form ignores how species were written ("HOH" is "H2O") and
+        # the order they were typed in; invalid formulas keep their text so the
+        # solver reports them as written
+        canonical = {formula: self.calculator.canonical_formula(formula) or formula
+                     for formula in list(reactants) + list(products)}
+        canonical_reactants = tuple(sorted(canonical[formula] for formula in reactants))
+        canonical_products = tuple(sorted(canonical[formula] for formula in products))
+        key = (canonical_reactants, canonical_products)
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self._hits += 1
+        if cached is None:
+            cached = dict(zip(canonical_reactants + canonical_products,
+                              self._solve(canonical_reactants, canonical_products)))
+            with self._lock:
+                self._misses += 1
+                self._cache[key] = cached
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            hit = False
+        else:
+            hit = True
+
+        return [cached[canonical[formula]] for formula in list(reactants) + list(products)], hit
+
+    def balance(self, reactants, products=None, calculator=None):
+        """Balance an equation given as a string or as reactant and product lists.
+
+        Returns a dict with the balanced equation, per-species coefficients and
+        the mass of each species at the solved stoichiometry (coefficient moles).
+        Masses use calculator's atomic-weight table when one is given; the
+        cached coefficients do not depend on atomic weights.
+        """
+        calculator = calculator or self.calculator
+        if products is None:
+            reactants, products = split_equation(reactants)
+        for side in (reactants, products):
+            if not isinstance(side, list) or not all(isinstance(formula, str) for formula in side):
+                raise ValueError("Reactants and products must be lists of formulas")
+        reactants = [formula.strip() for formula in reactants]
+        products = [formula.strip() for formula in products]
+
+        coefficients, cached = self._cached_solve(reactants, products)
+
+        species = []
+        for index, formula in enumerate(reactants + products):
+            molar_mass = calculator.calculate_molar_mass(formula)
+            coefficient = coefficients[index]
+            species.append({
+                'formula': formula,
+                'side': 'reactant' if index < len(reactants) else 'product',
+                'coefficient': coefficient,
+                'molar_mass': molar_mass,
+                'mass': coefficient * molar_mass
+            })
+
+        def side_text(side):
+            return ' + '.join(
+                (f"{item['coefficient']} " if item['coefficient'] != 1 else '') + item['formula']
+                for item in species if item['side'] == side)
+
+        return {
+            'equation': f"{side_text('reactant')} -> {side_text('product')}",
+            'species': species,
+            'reactant_mass': sum(item['mass'] for item in species if item['side'] == 'reactant'),
+            'product_mass': sum(item['mass'] for item in species if item['side'] == 'product'),
+            'atomic_weight_table': calculator.table_version,
+            'cached': cached
+        }
+
+    def balance_many(self, equations, calculator=None):
+        """Balance a batch of equations, one result or error dict per input"""
+        results = []
+        for equation in equations:
+            try:
+                if isinstance(equation, dict):
+                    result = self.balance(equation.get('reactants', []), equation.get('products', []),
+                                          calculator=calculator)
+                else:
+                    result = self.balance(equation, calculator=calculator)
+                results.append(result)
+            except ValueError as e:
+                results.append({'error': str(e), 'input': equation})
+        return results
+
+    def cache_info(self):
+        """Cache statistics in the shape of functools.lru_cache's cache_info()"""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self.cache_size, len(self._cache))
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+            self._hits = 0
+            self._misses = 0
@@ -15,8 +15,31 @@ def create_deployment_package():
     files_to_copy = [
         'app.py',
         'calculator.py', 
+        'atomic_weights.py',
+        'recompute_masses.py',
+        'library_io.py',
+        'element_index.py',
+        'library_search.py',
+        'compound_dictionary.py',
+        'compound_names_data.py',
+        'equation_balancer.py',
+        'reaction_table.py',
+        'plate_planner.py',
+        'isotope_data.py',
+        'isotope_engine.py',
+        'formula_search.py',
+        'empirical_formula.py',
         'compound_library.py',
+        'composition_index.py',
         'models.py',
+        'formula_table.py',
+        'jobs.py',
+        'metrics.py',
+        'query_counter.py',
+        'profiling.py',
+        'memory_profiling.py',
+        'slow_log.py',
+        'logging_setup.py',
         'main.py',
         'runtime.txt',
         'render.yaml'
@@ -24,7 +47,8 @@ def create_deployment_package():
     
     folders_to_copy = [
         'templates',
-        'static'
+        'static',
+        'data'
     ]
     
     # Create deployment folder
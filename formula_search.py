@@ -0,0 +1,218 @@
+"""
+Formula Search - Candidate formulas for a measured molar mass
+Best-first branch-and-bound over element counts, using the same
+element_masses table as MolarMassCalculator
+
+Elements are assigned heaviest first. A branch is only created when the mass
+still missing can be covered by the lighter elements left to assign, so most
+of the count space is never visited. Candidates sit in the same priority queue
+as open branches, keyed by error (a branch's key is a lower bound on the error
+of anything below it), so results come out in order of increasing error.
+Branches whose bound already exceeds the tolerance are dropped.
+"""
+import heapq
+import time
+from itertools import count as counter
+
+from calculator import hill_formula
+
+DEFAULT_ELEMENTS = ('C', 'H', 'N', 'O', 'P', 'S', 'F', 'Cl', 'Br', 'I')
+
+DEFAULT_LIMITS = {
+    'C': 100, 'H': 200, 'N': 20, 'O': 30, 'P': 6, 'S': 6,
+    'F': 12, 'Cl': 8, 'Br': 6, 'I': 4,
+}
+DEFAULT_LIMIT = 10
+
+# Valences for the ring-plus-double-bond check; formulas containing any other
+# element skip it
+VALENCES = {
+    'H': 1, 'Li': 1, 'Na': 1, 'K': 1, 'F': 1, 'Cl': 1, 'Br': 1, 'I': 1,
+    'O': 2, 'S': 2, 'Se': 2,
+    'B': 3, 'N': 3, 'P': 3,
+    'C': 4, 'Si': 4,
+}
+
+# Maximum heteroatom-to-carbon ratios seen in known organic compounds
+# (Kind & Fiehn, "Seven Golden Rules"), applied when carbon is present
+CARBON_RATIOS = {'H': 6, 'N': 4, 'O': 3, 'P': 2, 'S': 3, 'F': 6, 'Cl': 3, 'Br': 3, 'I': 3}
+
+MAX_TOLERANCE = 1.0
+MAX_TIME_BUDGET = 30.0
+JOB_MAX_TIME_BUDGET = 600.0  # searches run as background jobs may take longer
+
+
+def ring_double_bonds(element_counts):
+    """Rings plus double bonds, or None when an element has no known valence"""
+    total = 0
+    for element, number in element_counts.items():
+        valence = VALENCES.get(element)
+        if valence is None:
+            return None
+        total += number * (valence - 2)
+    return 1 + total / 2
+
+
+def plausible(element_counts):
+    """Chemical sanity checks for a complete candidate"""
+    rdbe = ring_double_bonds(element_counts)
+    # Negative or half-integer values are impossible for a neutral closed-shell molecule
+    if rdbe is not None and (rdbe < 0 or rdbe != int(rdbe)):
+        return False
+    carbon = element_counts.get('C', 0)
+    if carbon:
+        for element, ratio in CARBON_RATIOS.items():
+            if element_counts.get(element, 0) > ratio * carbon:
+                return False
+    return True
+
+
+class FormulaSearch:
+    """Iterate candidate formulas for a target mass, best match first.
+
+    After iteration, timed_out tells whether the time budget cut the search
+    short; in that case the results are the best of what was explored, still
+    in error order.
+    """
+
+    def __init__(self, calculator, target_mass, tolerance=0.01, elements=None, limits=None,
+                 time_budget=2.0, heuristics=True, max_time_budget=MAX_TIME_BUDGET):
+        target_mass = float(target_mass)
+        tolerance = float(tolerance)
+        time_budget = float(time_budget)
+        if target_mass <= 0:
+            raise ValueError("Target mass must be positive")
+        if not 0 < tolerance <= MAX_TOLERANCE:
+            raise ValueError(f"Tolerance must be between 0 and {MAX_TOLERANCE} g/mol")
+        if not 0 < time_budget <= max_time_budget:
+            raise ValueError(f"Time budget must be between 0 and {max_time_budget} seconds")
+
+        elements = list(dict.fromkeys(elements or DEFAULT_ELEMENTS))
+        unknown = [element for element in elements if element not in calculator.element_masses]
+        if unknown:
+            raise ValueError(f"Unknown element(s): {', '.join(unknown)}")
+
+        limits = limits or {}
+        if not isinstance(limits, dict):
+            raise ValueError("Count limits must map element symbols to maximum counts")
+        self.calculator = calculator
+        self.target_mass = target_mass
+        self.tolerance = tolerance
+        self.time_budget = time_budget
+        self.heuristics = heuristics
+
+        # Heaviest first keeps the branching factor low near the root
+        self.elements = sorted(elements, key=lambda element: -calculator.element_masses[element])
+        self.masses = [calculator.element_masses[element] for element in self.elements]
+        self.limits = []
+        for element in self.elements:
+            limit = limits.get(element, DEFAULT_LIMITS.get(element, DEFAULT_LIMIT))
+            try:
+                limit = int(limit)
+            except (TypeError, ValueError):
+                raise ValueError(f"Count limit for {element} must be a whole number")
+            if limit < 0:
+                raise ValueError(f"Count limit for {element} must not be negative")
+            self.limits.append(limit)
+
+        # Most mass, most atoms and lightest/heaviest usable element from index i onwards
+        size = len(self.elements) + 1
+        self.suffix_max = [0.0] * size
+        self.suffix_atoms = [0] * size
+        self.suffix_lightest = [None] * size
+        self.suffix_heaviest = [None] * size
+        for i in range(len(self.elements) - 1, -1, -1):
+            self.suffix_max[i] = self.suffix_max[i + 1] + self.limits[i] * self.masses[i]
+            self.suffix_atoms[i] = self.suffix_atoms[i + 1] + self.limits[i]
+            self.suffix_heaviest[i] = self.suffix_heaviest[i + 1]
+            self.suffix_lightest[i] = self.suffix_lightest[i + 1]
+            if self.limits[i]:
+                # Elements are sorted heaviest first, so index i is the heaviest so far
+                self.suffix_heaviest[i] = self.masses[i]
+                if self.suffix_lightest[i] is None:
+                    self.suffix_lightest[i] = self.masses[i]
+
+        self.timed_out = False
+        self.branches = 0
+
+    def _bound(self, depth, remaining):
+        """Lower bound on the error of any completion of a branch.
+
+        Besides running out of mass, k atoms of the elements left weigh
+        between k * lightest and k * heaviest, so a remaining mass that falls
+        between the k and k + 1 atom windows cannot be hit; with one element
+        left this is the exact error.
+        """
+        if remaining < 0:
+            return -remaining
+        bound = max(0.0, remaining - self.suffix_max[depth])
+        heaviest = self.suffix_heaviest[depth]
+        if heaviest is None:
+            return remaining
+        atoms = int(remaining // heaviest)
+        lightest = self.suffix_lightest[depth]
+        if (atoms + 1) * lightest > remaining:
+            gap = remaining - atoms * heaviest
+            if atoms + 1 <= self.suffix_atoms[depth]:
+                gap = min(gap, (atoms + 1) * lightest - remaining)
+            bound = max(bound, gap)
+        return bound
+
+    def __iter__(self):
+        tie = counter()
+        deadline = time.perf_counter() + self.time_budget
+        last = len(self.elements) - 1
+        # (error bound, -depth, tiebreak, depth, counts, remaining mass); depth None marks a candidate
+        heap = [(self._bound(0, self.target_mass), 0, next(tie), 0, (), self.target_mass)]
+
+        while heap:
+            bound, _, _, depth, counts, remaining = heapq.heappop(heap)
+            if depth is None:
+                element_counts = {element: n for element, n in zip(self.elements, counts) if n}
+                yield {
+                    'formula': hill_formula(element_counts),
+                    'molar_mass': sum(self.calculator.element_masses[element] * n
+                                      for element, n in element_counts.items()),
+                    'error': -remaining,
+                    'ppm': -remaining / self.target_mass * 1e6,
+                    'rdbe': ring_double_bonds(element_counts),
+                    'elements': element_counts
+                }
+                continue
+
+            if self.timed_out or time.perf_counter() > deadline:
+                # Out of time: stop branching but still hand out what was found
+                self.timed_out = True
+                continue
+
+            self.branches += 1
+            mass = self.masses[depth]
+            rest = self.suffix_max[depth + 1]
+            # Counts leaving a shortfall the lighter elements can still fill
+            low = max(0, -int(-(remaining - rest - self.tolerance) // mass))
+            high = min(self.limits[depth], int((remaining + self.tolerance) // mass))
+
+            for n in range(low, high + 1):
+                left = remaining - n * mass
+                child = counts + (n,)
+                if depth == last:
+                    if abs(left) > self.tolerance or not any(child):
+                        continue
+                    if self.heuristics and not plausible(dict(zip(self.elements, child))):
+                        continue
+                    heapq.heappush(heap, (abs(left), -(last + 2), next(tie), None, child, left))
+                else:
+                    bound = self._bound(depth + 1, left)
+                    if bound <= self.tolerance:
+                        heapq.heappush(heap, (bound, -(depth + 1), next(tie), depth + 1, child, left))
+
+
+def search_formulas(calculator, target_mass, max_results=50, **options):
+    """Up to max_results candidates as a list, plus whether the time budget ran out"""
+    search = FormulaSearch(calculator, target_mass, **options)
+    results = []
+    for candidate in search:
+        results.append(candidate)
+        if len(results) >= max_results:
+            break
+    return results, search.timed_out
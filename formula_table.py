@@ -0,0 +1,226 @@
+"""
+Formula Table - Store each distinct formula once and point calculation
+history at it by integer foreign key
+
+FormulaRegistry.intern() returns the Formula id for a formula string,
+creating the row (with its composition, composition hash and molar mass) the
+first time it is seen. Ids are cached in process, so a history write for a
+known formula costs no extra query. Rows keep the formula as written; the
+composition hash (of the Hill-order formula) groups different spellings of
+the same compound.
+
+migrate() upgrades databases created by earlier versions:
+    1. create the formula table and the calculation_history.formula_id column
+    2. insert one Formula row per distinct history formula
+    3. fill formula_id with a single correlated UPDATE
+    4. drop the old calculation_history.formula column
+    5. add and backfill composition_hash on formula and saved_compound
+    6. add the atomic_weight_table column to every table storing a molar mass
+       (left NULL for existing rows: the table they were computed with is
+       unknown, so recompute_masses.py treats them as stale)
+It is idempotent and runs at startup, so deployments upgrade on their next
+boot. Run it by hand (python formula_table.py) to migrate before deploying.
+"""
+import json
+import logging
+import threading
+from collections import OrderedDict, namedtuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+
+from models import CalculationHistory, Formula, SavedCompound, db
+
+logger = logging.getLogger(__name__)
+
+CacheInfo = namedtuple('CacheInfo', 'hits misses maxsize currsize')
+
+
+def canonical(formula):
+    """Key used for interning: the formula as written, without whitespace"""
+    return ''.join(formula.split())
+
+
+class FormulaRegistry:
+    def __init__(self, calculator, cache_size=4096):
+        self.calculator = calculator
+        self.cache_size = cache_size
+        self._ids = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def cache_info(self):
+        """Id cache statistics in the shape of functools.lru_cache's cache_info()"""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self.cache_size, len(self._ids))
+
+    def clear_cache(self):
+        with self._lock:
+            self._ids.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def _remember(self, key, formula_id):
+        with self._lock:
+            self._ids[key] = formula_id
+            self._ids.move_to_end(key)
+            while len(self._ids) > self.cache_size:
+                self._ids.popitem(last=False)
+
+    def new_row(self, key):
+        """Formula row with composition and molar mass filled in"""
+        element_counts = self.calculator.element_counts(key) or {}
+        molar_mass = sum(self.calculator.element_masses[element] * count
+                         for element, count in element_counts.items())
+        return Formula(formula=key, composition=json.dumps(element_counts, sort_keys=True),
+                       composition_hash=self.calculator.composition_hash(key), molar_mass=molar_mass,
+                       atomic_weight_table=self.calculator.table_version)
+
+    def intern(self, formula):
+        """Id of the Formula row for a formula string, created if needed"""
+        key = canonical(formula)
+        if not key:
+            raise ValueError("Formula must not be empty")
+        with self._lock:
+            formula_id = self._ids.get(key)
+            if formula_id is not None:
+                self._ids.move_to_end(key)
+                self._hits += 1
+                return formula_id
+            self._misses += 1
+
+        formula_id = db.session.query(Formula.id).filter_by(formula=key).scalar()
+        if formula_id is not None:
+            self._remember(key, formula_id)
+            return formula_id
+
+        # A new row is not cached until it has been read back committed, so a
+        # rolled back caller transaction cannot leave a dangling id behind
+        row = self.new_row(key)
+        try:
+            # Savepoint, so losing a race with another worker leaves the
+            # caller's transaction intact
+            with db.session.begin_nested():
+                db.session.add(row)
+            return row.id
+        except IntegrityError:
+            return db.session.query(Formula.id).filter_by(formula=key).scalar()
+
+    def usage(self, limit=20):
+        """Most used compounds in the history; spellings of one compound count together"""
+        # Invalid formulas have no hash and are grouped by their own row
+        group = db.func.coalesce(Formula.composition_hash, db.cast(Formula.id, db.String))
+        uses = db.func.count(CalculationHistory.id)
+        rows = db.session.query(db.func.min(Formula.formula), db.func.max(Formula.molar_mass), uses) \
+            .join(CalculationHistory, CalculationHistory.formula_id == Formula.id) \
+            .group_by(group) \
+            .order_by(uses.desc(), db.func.min(Formula.formula)) \
+            .limit(limit).all()
+        return [{'formula': self.calculator.canonical_formula(formula) or formula,
+                 'molar_mass': molar_mass, 'count': count}
+                for formula, molar_mass, count in rows]
+
+
+def migrate(registry):
+    """Bring an older database up to the current schema, return True if anything changed"""
+    Formula.__table__.create(db.engine, checkfirst=True)
+    migrated = False
+    for model in (Formula, SavedCompound, CalculationHistory):
+        migrated = _add_atomic_weight_table_column(model) or migrated
+    migrated = _migrate_history_formulas(registry) or migrated
+    for model in (Formula, SavedCompound):
+        migrated = _add_composition_hashes(model, registry.calculator) or migrated
+    return migrated
+
+
+def _add_atomic_weight_table_column(model):
+    """Add the atomic_weight_table column to a table if missing"""
+    table = model.__tablename__
+    columns = {column['name'] for column in inspect(db.engine).get_columns(table)}
+    if 'atomic_weight_table' in columns:
+        return False
+    with db.engine.begin() as connection:
+        connection.execute(text(f'ALTER TABLE {table} ADD COLUMN atomic_weight_table VARCHAR(20)'))
+    logger.info("Added atomic_weight_table column to %s", table)
+    return True
+
+
+def _add_composition_hashes(model, calculator):
+    """Add the composition_hash column to a table if missing and fill it in"""
+    table = model.__tablename__
+    columns = {column['name'] for column in inspect(db.engine).get_columns(table)}
+    with db.engine.begin() as connection:
+        if 'composition_hash' not in columns:
+            connection.execute(text(f'ALTER TABLE {table} ADD COLUMN composition_hash VARCHAR(16)'))
+            connection.execute(text(f'CREATE INDEX IF NOT EXISTS ix_{table}_composition_hash '
+                                    f'ON {table} (composition_hash)'))
+        # Only rows never hashed; invalid formulas stay NULL and are retried, which is cheap
+        rows = connection.execute(text(f'SELECT id, formula FROM {table} WHERE composition_hash IS NULL')).all()
+        updates = [{'row_id': row_id, 'hash': calculator.composition_hash(formula)}
+                   for row_id, formula in rows]
+        updates = [update for update in updates if update['hash']]
+        if updates:
+            connection.execute(text(f'UPDATE {table} SET composition_hash = :hash WHERE id = :row_id'), updates)
+    if updates:
+        logger.info("Computed composition hashes for %d %s rows", len(updates), table)
+    return bool(updates) or 'composition_hash' not in columns
+
+
+def _migrate_history_formulas(registry):
+    """Move legacy calculation_history.formula strings into the formula table"""
+    columns = {column['name'] for column in inspect(db.engine).get_columns('calculation_history')}
+    if 'formula' not in columns:
+        return False
+
+    logger.info("Migrating calculation_history formulas to the formula table")
+    with db.engine.begin() as connection:
+        if 'formula_id' not in columns:
+            connection.execute(text('ALTER TABLE calculation_history ADD COLUMN formula_id INTEGER '
+                                    'REFERENCES formula (id)'))
+            connection.execute(text('CREATE INDEX IF NOT EXISTS ix_calculation_history_formula_id '
+                                    'ON calculation_history (formula_id)'))
+
+        legacy = [row[0] for row in connection.execute(text(
+            'SELECT DISTINCT formula FROM calculation_history WHERE formula_id IS NULL'))]
+        known = {row[0] for row in connection.execute(text('SELECT formula FROM formula'))}
+
+        # Rows are keyed by the whitespace-free form; map each legacy spelling to it
+        mapping = {}
+        for written in legacy:
+            key = canonical(written) or written
+            mapping[written] = key
+            if key not in known:
+                row = registry.new_row(key)
+                connection.execute(Formula.__table__.insert().values(
+                    formula=row.formula, composition=row.composition,
+                    composition_hash=row.composition_hash, molar_mass=row.molar_mass,
+                    atomic_weight_table=row.atomic_weight_table))
+                known.add(key)
+
+        # One correlated UPDATE covers every spelling that is already canonical
+        connection.execute(text(
+            'UPDATE calculation_history SET formula_id = '
+            '(SELECT id FROM formula WHERE formula.formula = calculation_history.formula) '
+            'WHERE formula_id IS NULL'))
+        for written, key in mapping.items():
+            if written != key:
+                connection.execute(text(
+                    'UPDATE calculation_history SET formula_id = '
+                    '(SELECT id FROM formula WHERE formula.formula = :key) '
+                    'WHERE formula_id IS NULL AND formula = :written'),
+                    {'key': key, 'written': written})
+
+        connection.execute(text('ALTER TABLE calculation_history DROP COLUMN formula'))
+
+    logger.info("Migrated %d distinct history formulas", len(legacy))
+    return True
+
+
+if __name__ == '__main__':
+    # Importing the app creates missing tables and runs migrate()
+    import app  # noqa: F401
+    print("Database schema is up to date")
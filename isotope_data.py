@@ -0,0 +1,74 @@
+"""
+Isotope Data - Exact masses and natural abundances of stable isotopes
+Based on the NIST Atomic Weights and Isotopic Compositions tables
+
+Covers the elements that occur in organic, biological and common inorganic
+and organometallic compounds. Each entry is a list of (exact mass, abundance).
+"""
+
+ELECTRON_MASS = 0.00054857990946
+
+ISOTOPES = {
+    "H": [(1.00782503207, 0.999885), (2.0141017778, 0.000115)],
+    "He": [(3.0160293191, 0.00000134), (4.00260325415, 0.99999866)],
+    "Li": [(6.015122795, 0.0759), (7.01600455, 0.9241)],
+    "Be": [(9.0121822, 1.0)],
+    "B": [(10.0129370, 0.199), (11.0093054, 0.801)],
+    "C": [(12.0, 0.9893), (13.0033548378, 0.0107)],
+    "N": [(14.0030740048, 0.99636), (15.0001088982, 0.00364)],
+    "O": [(15.99491461956, 0.99757), (16.99913170, 0.00038), (17.9991610, 0.00205)],
+    "F": [(18.99840322, 1.0)],
+    "Na": [(22.9897692809, 1.0)],
+    "Mg": [(23.985041700, 0.7899), (24.98583692, 0.1000), (25.982592929, 0.1101)],
+    "Al": [(26.98153863, 1.0)],
+    "Si": [(27.9769265325, 0.92223), (28.976494700, 0.04685), (29.97377017, 0.03092)],
+    "P": [(30.97376163, 1.0)],
+    "S": [(31.97207100, 0.9499), (32.97145876, 0.0075), (33.96786690, 0.0425), (35.96708076, 0.0001)],
+    "Cl": [(34.96885268, 0.7576), (36.96590259, 0.2424)],
+    "K": [(38.96370668, 0.932581), (39.96399848, 0.000117), (40.96182576, 0.067302)],
+    "Ca": [(39.96259098, 0.96941), (41.95861801, 0.00647), (42.9587666, 0.00135),
+           (43.9554818, 0.02086), (45.9536926, 0.00004), (47.952534, 0.00187)],
+    "Sc": [(44.9559119, 1.0)],
+    "Ti": [(45.9526316, 0.0825), (46.9517631, 0.0744), (47.9479463, 0.7372),
+           (48.9478700, 0.0541), (49.9447912, 0.0518)],
+    "V": [(49.9471585, 0.00250), (50.9439595, 0.99750)],
+    "Cr": [(49.9460442, 0.04345), (51.9405075, 0.83789), (52.9406494, 0.09501), (53.9388804, 0.02365)],
+    "Mn": [(54.9380451, 1.0)],
+    "Fe": [(53.9396105, 0.05845), (55.9349375, 0.91754), (56.9353940, 0.02119), (57.9332756, 0.00282)],
+    "Co": [(58.9331950, 1.0)],
+    "Ni": [(57.9353429, 0.680769), (59.9307864, 0.262231), (60.9310560, 0.011399),
+           (61.9283451, 0.036345), (63.9279660, 0.009256)],
+    "Cu": [(62.9295975, 0.6915), (64.9277895, 0.3085)],
+    "Zn": [(63.9291422, 0.48268), (65.9260334, 0.27975), (66.9271273, 0.04102),
+           (67.9248442, 0.19024), (69.9253193, 0.00631)],
+    "Ga": [(68.9255736, 0.60108), (70.9247013, 0.39892)],
+    "Ge": [(69.9242474, 0.2038), (71.9220758, 0.2731), (72.9234589, 0.0776),
+           (73.9211778, 0.3672), (75.9214026, 0.0783)],
+    "As": [(74.9215965, 1.0)],
+    "Se": [(73.9224764, 0.0089), (75.9192136, 0.0937), (76.9199140, 0.0763),
+           (77.9173091, 0.2377), (79.9165213, 0.4961), (81.9166994, 0.0873)],
+    "Br": [(78.9183371, 0.5069), (80.9162906, 0.4931)],
+    "Rb": [(84.911789738, 0.7217), (86.909180527, 0.2783)],
+    "Y": [(88.9058483, 1.0)],
+    "Nb": [(92.9063781, 1.0)],
+    "Mo": [(91.906811, 0.1453), (93.9050883, 0.0915), (94.9058421, 0.1584), (95.9046795, 0.1667),
+           (96.9060215, 0.0960), (97.9054082, 0.2439), (99.907477, 0.0982)],
+    "Rh": [(102.905504, 1.0)],
+    "Pd": [(101.905609, 0.0102), (103.904036, 0.1114), (104.905085, 0.2233),
+           (105.903486, 0.2733), (107.903892, 0.2646), (109.905153, 0.1172)],
+    "Ag": [(106.905097, 0.51839), (108.904752, 0.48161)],
+    "Sn": [(111.904818, 0.0097), (113.902779, 0.0066), (114.903342, 0.0034), (115.901741, 0.1454),
+           (116.902952, 0.0768), (117.901603, 0.2422), (118.903308, 0.0859), (119.9021947, 0.3258),
+           (121.9034390, 0.0463), (123.9052739, 0.0579)],
+    "I": [(126.904473, 1.0)],
+    "Cs": [(132.905451933, 1.0)],
+    "Ir": [(190.9605940, 0.373), (192.9629264, 0.627)],
+    "Pt": [(189.959932, 0.00012), (191.9610380, 0.00782), (193.9626803, 0.3286),
+           (194.9647911, 0.3378), (195.9649515, 0.2521), (197.967893, 0.07356)],
+    "Au": [(196.9665687, 1.0)],
+    "Hg": [(195.965833, 0.0015), (197.9667690, 0.0997), (198.9682799, 0.1687), (199.9683260, 0.2310),
+           (200.9703023, 0.1318), (201.9706430, 0.2986), (203.9734939, 0.0687)],
+    "Pb": [(203.9730436, 0.014), (205.9744653, 0.241), (206.9758969, 0.221), (207.9766521, 0.524)],
+    "Bi": [(208.9803987, 1.0)],
+    "Th": [(232.0380553, 1.0)],
+}
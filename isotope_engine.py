@@ -0,0 +1,211 @@
+"""
+Isotope Engine - Monoisotopic mass and isotope distributions by FFT convolution
+
+Each element's isotope pattern is placed on a mass grid of width `resolution`
+(Da). The pattern of n atoms of one element is the n-fold self-convolution,
+computed as the n-th power of its FFT. Element patterns are then convolved
+together. Alongside the probabilities a mass-weighted spectrum is convolved,
+so every peak reports its exact centroid mass rather than the grid position.
+Grids longer than MAX_GRID_SIZE bins (huge formulas at fine resolution) are
+refused rather than allocated.
+
+Per-element, per-count distributions are cached, so formulas that share
+fragments (C6H5, (CH2)n, ...) reuse the expensive part.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from isotope_data import ELECTRON_MASS, ISOTOPES
+
+DEFAULT_RESOLUTION = 1.0
+DEFAULT_THRESHOLD = 1e-4
+MIN_RESOLUTION = 1e-4
+FFT_MIN_LENGTH = 64  # below this np.convolve is faster than an FFT round trip
+MAX_GRID_SIZE = 1 << 22  # bins in one distribution, about 32 MB per spectrum
+
+
+def _fft_size(size):
+    """Power-of-two FFT length for a grid of size bins, refusing grids above MAX_GRID_SIZE"""
+    if size > MAX_GRID_SIZE:
+        raise ValueError("Isotope pattern is too large; use a coarser resolution or a smaller formula")
+    return 1 << (size - 1).bit_length()
+
+
+def _prune(probabilities, weighted, threshold):
+    """Trim bins below threshold * max from both ends and zero the rest"""
+    probabilities = np.clip(probabilities, 0.0, None)
+    if probabilities.size == 0:
+        return probabilities, weighted
+    keep = probabilities >= threshold * probabilities.max()
+    indices = np.flatnonzero(keep)
+    first, last = indices[0], indices[-1] + 1
+    probabilities = np.where(keep, probabilities, 0.0)[first:last]
+    weighted = np.where(keep, weighted, 0.0)[first:last]
+    return probabilities, weighted
+
+
+def _convolve(a, b):
+    """Linear convolution, via FFT for long inputs"""
+    if min(a.size, b.size) < FFT_MIN_LENGTH:
+        return np.convolve(a, b)
+    size = int(a.size + b.size - 1)
+    fft_size = _fft_size(size)
+    return np.fft.irfft(np.fft.rfft(a, fft_size) * np.fft.rfft(b, fft_size), fft_size)[:size]
+
+
+@lru_cache(maxsize=4096)
+def element_distribution(element, count, resolution, threshold):
+    """Isotope distribution of count atoms of one element.
+
+    Returns read-only (probabilities, mass-weighted probabilities) arrays on
+    the grid; the mass of bin i is weighted[i] / probabilities[i].
+    """
+    isotopes = ISOTOPES.get(element)
+    if isotopes is None:
+        raise ValueError(f"No isotope data for element {element}")
+
+    masses = np.array([mass for mass, _ in isotopes])
+    abundances = np.array([abundance for _, abundance in isotopes])
+    offsets = np.rint((masses - masses[0]) / resolution).astype(int)
+    length = int(offsets[-1]) + 1
+
+    single = np.zeros(length)
+    single_weighted = np.zeros(length)
+    np.add.at(single, offsets, abundances)
+    np.add.at(single_weighted, offsets, abundances * masses)
+
+    if count == 1:
+        probabilities, weighted = single, single_weighted
+    else:
+        # p^(*n) = IFFT(P^n); mass-weighted w_n = n * (w * p^(*(n-1))) = IFFT(n W P^(n-1))
+        size = count * (length - 1) + 1
+        fft_size = _fft_size(size)
+        spectrum = np.fft.rfft(single, fft_size)
+        weighted_spectrum = np.fft.rfft(single_weighted, fft_size)
+        power = spectrum ** (count - 1)
+        probabilities = np.fft.irfft(power * spectrum, fft_size)[:size]
+        weighted = count * np.fft.irfft(weighted_spectrum * power, fft_size)[:size]
+
+    probabilities, weighted = _prune(probabilities, weighted, threshold)
+    probabilities.setflags(write=False)
+    weighted.setflags(write=False)
+    return probabilities, weighted
+
+
+def monoisotopic_mass(element_counts):
+    """Sum of the most abundant isotope mass of each atom"""
+    total = 0.0
+    for element, count in element_counts.items():
+        isotopes = ISOTOPES.get(element)
+        if isotopes is None:
+            raise ValueError(f"No isotope data for element {element}")
+        total += count * max(isotopes, key=lambda isotope: isotope[1])[0]
+    return total
+
+
+def average_mass(element_counts):
+    """Abundance-weighted mass from the isotope table"""
+    return sum(count * sum(mass * abundance for mass, abundance in ISOTOPES[element])
+               for element, count in element_counts.items())
+
+
+def to_mz(mass, charge):
+    """Convert a neutral mass to m/z for a charge state (0 = neutral)"""
+    if not charge:
+        return mass
+    return (mass - charge * ELECTRON_MASS) / abs(charge)
+
+
+@lru_cache(maxsize=8192)
+def composition_pattern(composition, resolution, threshold):
+    """Peaks for a composition given as a sorted tuple of (element, count).
+
+    Returns a tuple of (mass, probability) pairs in increasing mass order.
+    """
+    probabilities = np.ones(1)
+    weighted = np.zeros(1)
+    for element, count in composition:
+        element_probabilities, element_weighted = element_distribution(element, count, resolution, threshold)
+        weighted = _convolve(weighted, element_probabilities) + _convolve(probabilities, element_weighted)
+        probabilities = _convolve(probabilities, element_probabilities)
+        probabilities, weighted = _prune(probabilities, weighted, threshold)
+
+    nonzero = probabilities > 0
+    masses = weighted[nonzero] / probabilities[nonzero]
+    return tuple(zip(masses.tolist(), probabilities[nonzero].tolist()))
+
+
+def pattern_options(resolution=DEFAULT_RESOLUTION, threshold=DEFAULT_THRESHOLD, charge=0, max_peaks=None):
+    """Check and convert IsotopeEngine.pattern() options, raise ValueError when out of range"""
+    resolution = float(resolution)
+    threshold = float(threshold)
+    charge = int(charge)
+    max_peaks = int(max_peaks) if max_peaks else None
+    if not MIN_RESOLUTION <= resolution <= 1.0:
+        raise ValueError(f"Resolution must be between {MIN_RESOLUTION} and 1.0 Da")
+    if not 0 < threshold < 1:
+        raise ValueError("Threshold must be between 0 and 1")
+    return resolution, threshold, charge, max_peaks
+
+
+class IsotopeEngine:
+    def __init__(self, calculator):
+        self.calculator = calculator
+
+    def composition(self, formula):
+        """Parse and validate a formula, return its element counts"""
+        if not isinstance(formula, str):
+            raise ValueError(f"Invalid chemical formula: {formula}")
+        element_counts = self.calculator.parse_formula(formula)
+        if not element_counts:
+            raise ValueError(f"Invalid chemical formula: {formula}")
+        if not self.calculator.validate_elements(element_counts):
+            raise ValueError(f"Invalid element in formula: {formula}")
+        return element_counts
+
+    def pattern(self, formula, resolution=DEFAULT_RESOLUTION, threshold=DEFAULT_THRESHOLD,
+                charge=0, max_peaks=None):
+        """Monoisotopic mass and isotope distribution of a formula.
+
+        resolution is the grid width in Da (1.0 gives nominal-mass clusters,
+        smaller values resolve fine structure); peaks below threshold times
+        the base peak are pruned.
+        """
+        resolution, threshold, charge, max_peaks = pattern_options(resolution, threshold, charge, max_peaks)
+
+        element_counts = self.composition(formula)
+        composition = tuple(sorted(element_counts.items()))
+        peaks = composition_pattern(composition, resolution, threshold)
+
+        base = max(probability for _, probability in peaks)
+        peak_list = [{
+            'mz' if charge else 'mass': to_mz(mass, charge),
+            'probability': probability,
+            'relative_abundance': 100.0 * probability / base
+        } for mass, probability in peaks]
+        if max_peaks:
+            peak_list = sorted(peak_list, key=lambda peak: -peak['probability'])[:max_peaks]
+            peak_list.sort(key=lambda peak: peak['mz' if charge else 'mass'])
+
+        mono = monoisotopic_mass(element_counts)
+        return {
+            'formula': formula,
+            'charge': charge,
+            'monoisotopic_mass': mono,
+            'monoisotopic_mz': to_mz(mono, charge) if charge else None,
+            'average_mass': average_mass(element_counts),
+            'resolution': resolution,
+            'threshold': threshold,
+            'peaks': peak_list
+        }
+
+    def batch(self, formulas, **options):
+        """Patterns for many formulas, one result or error dict per input"""
+        results = []
+        for formula in formulas:
+            try:
+                results.append(self.pattern(formula, **options))
+            except (TypeError, ValueError) as e:
+                results.append({'formula': formula, 'error': str(e)})
+        return results
@@ -0,0 +1,245 @@
+"""
+Jobs - Background queue for batch calculations that outlive a request
+
+Jobs are rows of the Job model, so any worker process can report on a job
+submitted to another one. Each process runs its own jobs on a small thread
+pool; no broker is needed and plain SQLite works. Handlers are generators
+that yield one result at a time, which is appended to a JSONL file under
+JOBS_DIR rather than kept in memory, and call progress(done, total) as they
+go. Progress writes are throttled, and the same call raises JobCancelled once
+a cancel has been requested. A kind can also register a validate(params)
+function, run at submit time so bad input is rejected before a job exists.
+
+Configuration:
+    JOBS_DIR                 where result files are written (default jobs/)
+    JOBS_WORKERS             worker threads per process (default 2)
+    JOBS_PROGRESS_INTERVAL   minimum seconds between progress writes (default 0.5)
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from models import Job
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ('queued', 'running')
+FINISHED_STATUSES = ('succeeded', 'failed', 'cancelled')
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def _process_alive(pid):
+    if pid is None or pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def map_items(items, func, progress):
+    """Yield func(item) for every item, reporting progress after each one.
+    An item that raises yields {'error': message} and the job carries on"""
+    total = len(items)
+    progress(0, total)
+    for index, item in enumerate(items):
+        try:
+            result = func(item)
+        except Exception as e:
+            logger.warning("Job item %d failed: %s", index, e)
+            result = {'error': str(e)}
+        yield result
+        progress(index + 1, total)
+
+
+class JobQueue:
+    def __init__(self):
+        self.handlers = {}
+        self.validators = {}
+        self.app = None
+        self.db = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app, db):
+        app.config.setdefault('JOBS_DIR', os.environ.get('JOBS_DIR', 'jobs'))
+        app.config.setdefault('JOBS_WORKERS', int(os.environ.get('JOBS_WORKERS', '2')))
+        app.config.setdefault('JOBS_PROGRESS_INTERVAL', float(os.environ.get('JOBS_PROGRESS_INTERVAL', '0.5')))
+        self.app = app
+        self.db = db
+
+    def register(self, kind, handler, validate=None):
+        """Register handler(params, progress) -> iterable of JSON-serializable results.
+        validate(params), if given, raises ValueError for bad params and may fill in defaults"""
+        self.handlers[kind] = handler
+        if validate is not None:
+            self.validators[kind] = validate
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.app.config['JOBS_WORKERS'],
+                                                    thread_name_prefix='job')
+            return self._executor
+
+    def recover(self):
+        """Fail jobs left queued or running by a process that no longer exists"""
+        interrupted = 0
+        for job in Job.query.filter(Job.status.in_(ACTIVE_STATUSES)).all():
+            if not _process_alive(job.worker_pid):
+                job.status = 'failed'
+                job.error = 'Interrupted by a server restart'
+                job.finished_at = self.db.func.current_timestamp()
+                interrupted += 1
+        if interrupted:
+            self.db.session.commit()
+            logger.warning("Marked %d interrupted job(s) as failed", interrupted)
+
+    def submit(self, kind, params):
+        """Store a new job and start it on this process's pool"""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}. Available: {', '.join(sorted(self.handlers))}")
+        if not isinstance(params, dict):
+            raise ValueError("Job params must be an object")
+        if kind in self.validators:
+            self.validators[kind](params)
+
+        job = Job(id=uuid.uuid4().hex, kind=kind, status='queued', params=json.dumps(params),
+                  worker_pid=os.getpid())
+        self.db.session.add(job)
+        self.db.session.commit()
+        self.executor.submit(self._run, job.id)
+        return job
+
+    def get(self, job_id):
+        return self.db.session.get(Job, job_id)
+
+    def cancel(self, job_id):
+        """Cancel a queued job now, or ask a running one to stop at its next progress report"""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        if job.status == 'queued':
+            job.status = 'cancelled'
+            job.finished_at = self.db.func.current_timestamp()
+        elif job.status == 'running':
+            job.cancel_requested = True
+        self.db.session.commit()
+        return job
+
+    def delete(self, job_id):
+        """Remove a finished job and its result file"""
+        job = self.get(job_id)
+        if job is None:
+            return False
+        if job.status not in FINISHED_STATUSES:
+            raise ValueError("Only finished jobs can be deleted; cancel it first")
+        if job.result_path and os.path.exists(job.result_path):
+            os.remove(job.result_path)
+        self.db.session.delete(job)
+        self.db.session.commit()
+        return True
+
+    def iter_results(self, job):
+        """Yield the result file line by line"""
+        with open(job.result_path, encoding='utf-8') as results:
+            for line in results:
+                yield line
+
+    def _update(self, job_id, **values):
+        Job.query.filter_by(id=job_id).update(values)
+        self.db.session.commit()
+
+    def _run(self, job_id):
+        with self.app.app_context():
+            try:
+                job = self.get(job_id)
+                if job is None or job.status != 'queued':
+                    return
+                handler = self.handlers[job.kind]
+                params = json.loads(job.params)
+                self._update(job_id, status='running', started_at=self.db.func.current_timestamp(),
+                             worker_pid=os.getpid())
+                self._execute(job_id, handler, params)
+            except Exception:
+                logger.exception("Job %s crashed", job_id)
+            finally:
+                self.db.session.remove()
+
+    def _execute(self, job_id, handler, params):
+        directory = self.app.config['JOBS_DIR']
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{job_id}.jsonl')
+        partial = path + '.part'
+        interval = self.app.config['JOBS_PROGRESS_INTERVAL']
+        last_report = [0.0]
+
+        def progress(done, total=None):
+            now = time.monotonic()
+            if now - last_report[0] < interval:
+                return
+            last_report[0] = now
+            values = {'progress_done': done}
+            if total is not None:
+                values['progress_total'] = total
+            self._update(job_id, **values)
+            cancel = self.db.session.query(Job.cancel_requested).filter_by(id=job_id).scalar()
+            if cancel:
+                raise JobCancelled()
+
+        count = 0
+        try:
+            with open(partial, 'w', encoding='utf-8') as out:
+                for result in handler(params, progress):
+                    out.write(json.dumps(result) + '\n')
+                    count += 1
+            os.replace(partial, path)
+        except JobCancelled:
+            self._discard(partial)
+            self._update(job_id, status='cancelled', finished_at=self.db.func.current_timestamp(),
+                         result_count=count)
+            return
+        except Exception as e:
+            self.db.session.rollback()
+            self._discard(partial)
+            logger.warning("Job %s failed: %s", job_id, e)
+            self._update(job_id, status='failed', error=str(e), finished_at=self.db.func.current_timestamp(),
+                         result_count=count)
+            return
+
+        job = self.get(job_id)
+        self._update(job_id, status='succeeded', result_path=path, result_count=count,
+                     progress_done=job.progress_total if job.progress_total is not None else count,
+                     finished_at=self.db.func.current_timestamp())
+
+    @staticmethod
+    def _discard(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def job_to_dict(job):
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'progress': {'done': job.progress_done, 'total': job.progress_total},
+        'result_count': job.result_count,
+        'error': job.error,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None
+    }
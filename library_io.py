@@ -0,0 +1,93 @@
+"""
+Library IO - CSV and JSON formats for bulk compound library import and export
+
+Both formats carry one compound per record with the columns in
+EXPORT_COLUMNS. Only name and formula are read back on import (molar masses
+are always recomputed), so an export can be edited and imported again.
+
+    CSV   header row, then one compound per line
+    JSON  a list of objects, or an object with a "compounds" list
+
+Exports are generators yielding text chunks, so a Flask Response can stream
+a large library without building it in memory.
+"""
+import csv
+import io
+import json
+
+FORMATS = ('csv', 'json')
+EXPORT_COLUMNS = ['name', 'formula', 'molar_mass', 'atomic_weight_table', 'created_at']
+
+
+def detect_format(format_name=None, filename=None, content_type=None):
+    """Format from an explicit name, else the file extension, else the content type"""
+    if format_name:
+        format_name = format_name.lower()
+        if format_name not in FORMATS:
+            raise ValueError(f"Format must be one of {', '.join(FORMATS)}")
+        return format_name
+    if filename and '.' in filename:
+        extension = filename.rsplit('.', 1)[1].lower()
+        if extension in FORMATS:
+            return extension
+    if content_type and 'json' in content_type:
+        return 'json'
+    return 'csv'
+
+
+def parse_import(text, format_name):
+    """Records of an import file as a list of dicts; raises ValueError if the file is malformed"""
+    if format_name == 'json':
+        try:
+            data = json.loads(text)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON: {e}")
+        if isinstance(data, dict):
+            data = data.get('compounds')
+        if not isinstance(data, list):
+            raise ValueError("JSON import must be a list of compounds or an object with a 'compounds' list")
+        return data
+
+    reader = csv.DictReader(io.StringIO(text))
+    # Header names are matched case-insensitively
+    reader.fieldnames = [(field or '').strip().lower() for field in (reader.fieldnames or [])]
+    missing = {'name', 'formula'} - set(reader.fieldnames)
+    if missing:
+        raise ValueError(f"CSV header is missing column(s): {', '.join(sorted(missing))}")
+    try:
+        return list(reader)
+    except csv.Error as e:
+        raise ValueError(f"Invalid CSV on line {reader.line_num}: {e}")
+
+
+def _export_row(compound):
+    row = {column: compound.get(column) for column in EXPORT_COLUMNS}
+    if row['created_at'] is not None:
+        row['created_at'] = row['created_at'].isoformat()
+    return row
+
+
+def iter_csv(compounds):
+    """Yield compounds as CSV text, one chunk per line"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    yield buffer.getvalue()
+    for compound in compounds:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(_export_row(compound))
+        yield buffer.getvalue()
+
+
+def iter_json(compounds):
+    """Yield compounds as a JSON list, one chunk per compound"""
+    separator = '[\n'
+    for compound in compounds:
+        yield separator + json.dumps(_export_row(compound))
+        separator = ',\n'
+    yield '[]\n' if separator == '[\n' else '\n]\n'
+
+
+def iter_export(compounds, format_name):
+    return iter_json(compounds) if format_name == 'json' else iter_csv(compounds)
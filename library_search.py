@@ -0,0 +1,225 @@
+"""
+Library Search - Indexed name/formula search over the compound library
+
+Backends, picked from the database dialect by create_search():
+    Fts5Search      SQLite: an FTS5 table with the trigram tokenizer, kept in
+                    sync with saved_compound by triggers
+    TrigramSearch   PostgreSQL: pg_trgm GIN indexes on lower(name) and
+                    lower(formula)
+    LikeSearch      anything else (or when the above cannot be set up):
+                    substring LIKE, no fuzzy matching
+
+Each backend only fetches candidates through its index: compounds sharing
+trigrams with the query or, for one or two characters, starting with it (a
+range scan over indexes on lower(name) and lower(formula)), at most
+CANDIDATE_LIMIT of them. Ranking is done here, the same way for
+every backend:
+    exact match > prefix > word prefix > substring > fuzzy
+with fuzzy matches needing a pg_trgm-style trigram similarity of at least
+FUZZY_THRESHOLD, and ties broken by similarity and name. So both indexed
+backends return identical results whenever the candidates fit the limit.
+"""
+import logging
+import re
+
+from sqlalchemy import text
+
+from models import SavedCompound, db
+
+logger = logging.getLogger(__name__)
+
+FUZZY_THRESHOLD = 0.3  # pg_trgm's default similarity_threshold
+CANDIDATE_LIMIT = 500
+MAX_QUERY_LENGTH = 100
+PREFIX_END = '\U0010ffff'  # sorts after any character, so q <= s < q + PREFIX_END means s starts with q
+
+EXACT, PREFIX, WORD_PREFIX, SUBSTRING, FUZZY = range(5)
+MATCH_KINDS = ('exact', 'prefix', 'word_prefix', 'substring', 'fuzzy')
+
+
+def trigrams(value):
+    """Trigram set of a string as pg_trgm builds it: per word, padded with two
+    leading spaces and one trailing space, lowercased"""
+    grams = set()
+    for word in re.findall(r'[0-9a-z]+', value.lower()):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a, b):
+    """pg_trgm similarity(): shared trigrams over all trigrams"""
+    a, b = trigrams(a), trigrams(b)
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def rank(query, name, formula):
+    """(match kind, similarity) of a compound for a normalized query, kind None if it does not match"""
+    name_lower, formula_lower = name.lower(), formula.lower()
+    score = max(similarity(query, name), similarity(query, formula))
+    if query in (name_lower, formula_lower):
+        kind = EXACT
+    elif name_lower.startswith(query) or formula_lower.startswith(query):
+        kind = PREFIX
+    elif any(word.startswith(query) for word in re.split(r'[\s,()\-]+', name_lower)):
+        kind = WORD_PREFIX
+    elif query in name_lower or query in formula_lower:
+        kind = SUBSTRING
+    elif score >= FUZZY_THRESHOLD:
+        kind = FUZZY
+    else:
+        kind = None
+    return kind, score
+
+
+def normalize(query):
+    return ' '.join(str(query or '').lower().split())[:MAX_QUERY_LENGTH]
+
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+class LikeSearch:
+    name = 'like'
+
+    def setup(self):
+        """Expression indexes that short prefix queries range-scan"""
+        with db.engine.begin() as connection:
+            for column in ('name', 'formula'):
+                connection.execute(text(f"CREATE INDEX IF NOT EXISTS ix_saved_compound_{column}_lower "
+                                        f"ON saved_compound (lower({column}))"))
+        return True
+
+    def _columns(self):
+        return db.select(SavedCompound.id, SavedCompound.name, SavedCompound.formula,
+                         SavedCompound.molar_mass, SavedCompound.created_at)
+
+    def _prefix_candidates(self, query):
+        """Short queries cannot use trigrams; a range on lower(name) and
+        lower(formula) is an anchored prefix match the indexes can serve"""
+        name, formula = db.func.lower(SavedCompound.name), db.func.lower(SavedCompound.formula)
+        end = query + PREFIX_END
+        return db.session.execute(self._columns().where(db.or_(
+            db.and_(name >= query, name < end), db.and_(formula >= query, formula < end))
+        ).order_by(SavedCompound.name).limit(CANDIDATE_LIMIT)).all()
+
+    def _candidates(self, query):
+        pattern = '%' + _escape_like(query) + '%'
+        return db.session.execute(self._columns().where(db.or_(
+            SavedCompound.name.ilike(pattern, escape='\\'), SavedCompound.formula.ilike(pattern, escape='\\'))
+        ).order_by(SavedCompound.name).limit(CANDIDATE_LIMIT)).all()
+
+    def search(self, query, limit=20):
+        """Best matching compounds for a query, best first"""
+        query = normalize(query)
+        if not query:
+            return []
+        rows = self._prefix_candidates(query) if len(query) < 3 else self._candidates(query)
+        results = []
+        for row in rows:
+            kind, score = rank(query, row.name, row.formula)
+            if kind is not None:
+                results.append((kind, -score, row.name, row))
+        results.sort(key=lambda result: result[:3])
+        return [{
+            'id': row.id,
+            'name': row.name,
+            'formula': row.formula,
+            'molar_mass': row.molar_mass,
+            'created_at': row.created_at,
+            'match': MATCH_KINDS[kind],
+            'score': round(-negative_score, 4)
+        } for kind, negative_score, _, row in results[:limit]]
+
+
+class Fts5Search(LikeSearch):
+    name = 'fts5'
+
+    def setup(self):
+        """Create the FTS table and its sync triggers, filling it if it is new"""
+        super().setup()
+        with db.engine.begin() as connection:
+            exists = connection.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'compound_search'")).first()
+            connection.execute(text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS compound_search USING fts5("
+                "name, formula, content='saved_compound', content_rowid='id', tokenize='trigram')"))
+            connection.execute(text(
+                "CREATE TRIGGER IF NOT EXISTS saved_compound_search_insert AFTER INSERT ON saved_compound BEGIN "
+                "INSERT INTO compound_search (rowid, name, formula) VALUES (new.id, new.name, new.formula); END"))
+            connection.execute(text(
+                "CREATE TRIGGER IF NOT EXISTS saved_compound_search_delete AFTER DELETE ON saved_compound BEGIN "
+                "INSERT INTO compound_search (compound_search, rowid, name, formula) "
+                "VALUES ('delete', old.id, old.name, old.formula); END"))
+            connection.execute(text(
+                "CREATE TRIGGER IF NOT EXISTS saved_compound_search_update "
+                "AFTER UPDATE OF name, formula ON saved_compound BEGIN "
+                "INSERT INTO compound_search (compound_search, rowid, name, formula) "
+                "VALUES ('delete', old.id, old.name, old.formula); "
+                "INSERT INTO compound_search (rowid, name, formula) VALUES (new.id, new.name, new.formula); END"))
+            if not exists:
+                connection.execute(text("INSERT INTO compound_search (compound_search) VALUES ('rebuild')"))
+                logger.info("Built the compound search index")
+        return True
+
+    def _candidates(self, query):
+        # Any shared trigram makes a candidate; bm25 puts the closest first
+        grams = {query[i:i + 3] for i in range(len(query) - 2)}
+        match = ' OR '.join('"' + gram.replace('"', '""') + '"' for gram in sorted(grams))
+        return db.session.execute(text(
+            "SELECT saved_compound.id, saved_compound.name, saved_compound.formula, "
+            "saved_compound.molar_mass, saved_compound.created_at "
+            "FROM compound_search JOIN saved_compound ON saved_compound.id = compound_search.rowid "
+            "WHERE compound_search MATCH :match ORDER BY compound_search.rank LIMIT :limit"
+        ).columns(SavedCompound.id, SavedCompound.name, SavedCompound.formula,
+                  SavedCompound.molar_mass, SavedCompound.created_at),
+            {'match': match, 'limit': CANDIDATE_LIMIT}).all()
+
+
+class TrigramSearch(LikeSearch):
+    name = 'pg_trgm'
+
+    def setup(self):
+        with db.engine.begin() as connection:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            connection.execute(text("CREATE INDEX IF NOT EXISTS ix_saved_compound_name_trgm "
+                                    "ON saved_compound USING gin (lower(name) gin_trgm_ops)"))
+            connection.execute(text("CREATE INDEX IF NOT EXISTS ix_saved_compound_formula_trgm "
+                                    "ON saved_compound USING gin (lower(formula) gin_trgm_ops)"))
+            # text_pattern_ops lets an anchored LIKE use the B-tree whatever the collation
+            for column in ('name', 'formula'):
+                connection.execute(text(f"CREATE INDEX IF NOT EXISTS ix_saved_compound_{column}_lower_pattern "
+                                        f"ON saved_compound (lower({column}) text_pattern_ops)"))
+        return True
+
+    def _prefix_candidates(self, query):
+        name, formula = db.func.lower(SavedCompound.name), db.func.lower(SavedCompound.formula)
+        pattern = _escape_like(query) + '%'
+        return db.session.execute(self._columns().where(db.or_(
+            name.like(pattern, escape='\\'), formula.like(pattern, escape='\\'))
+        ).order_by(SavedCompound.name).limit(CANDIDATE_LIMIT)).all()
+
+    def _candidates(self, query):
+        name, formula = db.func.lower(SavedCompound.name), db.func.lower(SavedCompound.formula)
+        pattern = '%' + _escape_like(query) + '%'
+        closeness = db.func.greatest(db.func.similarity(name, query), db.func.similarity(formula, query))
+        return db.session.execute(self._columns().where(db.or_(
+            name.op('%')(query), formula.op('%')(query),
+            name.like(pattern, escape='\\'), formula.like(pattern, escape='\\'))
+        ).order_by(closeness.desc()).limit(CANDIDATE_LIMIT)).all()
+
+
+def create_search(engine):
+    """Search backend for the database behind engine, set up and ready to use"""
+    dialect = engine.dialect.name
+    backend = {'sqlite': Fts5Search, 'postgresql': TrigramSearch}.get(dialect, LikeSearch)()
+    try:
+        backend.setup()
+    except Exception as e:
+        # e.g. SQLite built without FTS5, or no privilege to create pg_trgm
+        logger.warning("%s search unavailable, falling back to LIKE: %s", backend.name, e)
+        backend = LikeSearch()
+    return backend
@@ -0,0 +1,140 @@
+"""
+Logging Setup - Structured JSON logging written off the request thread
+
+Request threads only put records on a queue (QueueHandler); a background
+QueueListener formats them and does the actual I/O.
+
+Configuration:
+    LOG_LEVEL               root level (default INFO)
+    LOG_LEVELS              per-logger levels, e.g. "sqlalchemy.engine=INFO,query_counter=DEBUG"
+    LOG_FORMAT              "json" (default) or "text" for local development
+    LOG_FILE                optional file to write to in addition to stderr
+    LOG_DEBUG_SAMPLE_RATE   fraction of DEBUG records kept (default 1.0)
+    LOG_SAMPLE_RATES        per-logger DEBUG sample rates, e.g. "query_counter=0.01"
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+
+# Attributes every LogRecord has; anything else was passed through extra=
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'pid': record.process,
+            'thread': record.threadName,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = record.stack_info
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of DEBUG records, optionally per logger"""
+
+    def __init__(self, default_rate=1.0, rates=None):
+        super().__init__()
+        self.default_rate = default_rate
+        self.rates = rates or {}
+
+    def rate_for(self, name):
+        """Sample rate of the closest configured ancestor logger"""
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition('.')[0]
+        return self.default_rate
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        rate = self.rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps the traceback as exc_text instead of folding it into the message"""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+def parse_mapping(value):
+    """Parse "a=1,b.c=2" into {'a': '1', 'b.c': '2'}"""
+    mapping = {}
+    for item in (value or '').split(','):
+        name, sep, setting = item.partition('=')
+        if sep and name.strip():
+            mapping[name.strip()] = setting.strip()
+    return mapping
+
+
+def configure_logging():
+    """Route all logging through a queue to a background listener. Safe to call twice."""
+    global _listener
+    if _listener is not None:
+        return
+
+    if os.environ.get('LOG_FORMAT', 'json') == 'text':
+        formatter = logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s')
+    else:
+        formatter = JsonFormatter()
+
+    handlers = [logging.StreamHandler(sys.stderr)]
+    if os.environ.get('LOG_FILE'):
+        handlers.append(logging.FileHandler(os.environ['LOG_FILE']))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    rates = {name: float(rate) for name, rate in parse_mapping(os.environ.get('LOG_SAMPLE_RATES')).items()}
+    queue_handler = StructuredQueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(SamplingFilter(float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', '1.0')), rates))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(os.environ.get('LOG_LEVEL', 'INFO').upper())
+    for name, level in parse_mapping(os.environ.get('LOG_LEVELS')).items():
+        logging.getLogger(name).setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,235 @@
+"""
+Memory Profiling - Opt-in tracemalloc snapshots, snapshot diffs and
+in-process cache sizes for finding leaks in long-running workers
+
+Enable with:
+    MEMORY_PROFILING_ENABLED=1
+    PROFILING_SECRET=<long random string>   (shared with profiling.py)
+    MEMORY_PROFILING_FRAMES=10              (optional traceback depth)
+
+Endpoints (send the secret in the X-Profile-Token header):
+    GET  /debug/memory                        traced totals, snapshots, cache sizes, top sites
+    POST /debug/memory/snapshot               take a snapshot, returns its id
+    GET  /debug/memory/diff?from=1&to=2       top allocation sites grown between snapshots
+                                              (omit "to" to diff against a fresh snapshot)
+
+Sending SIGUSR2 to a worker process takes a snapshot and logs the diff
+against the previous one, for when the HTTP endpoints are unreachable.
+"""
+import hmac
+import logging
+import os
+import signal
+import sys
+import threading
+import tracemalloc
+from datetime import datetime, timezone
+
+from flask import abort, jsonify, request
+
+logger = logging.getLogger(__name__)
+
+MAX_SNAPSHOTS = 5
+DEFAULT_LIMIT = 20
+
+_caches = {}
+_snapshots = []  # (id, taken_at, snapshot), oldest first
+_next_snapshot_id = 1
+_lock = threading.Lock()
+_signalled = threading.Event()  # set by the SIGUSR2 handler, served by _signal_worker
+
+
+def register_cache(name, cache):
+    """Report an in-process cache in memory diagnostics.
+
+    cache may be an object with cache_info() (functools.lru_cache), any object
+    supporting len(), or a callable returning a dict of statistics.
+    """
+    _caches[name] = cache
+
+
+def cache_sizes():
+    """Return a dict of cache name -> statistics"""
+    sizes = {}
+    for name, cache in _caches.items():
+        try:
+            if hasattr(cache, 'cache_info'):
+                info = cache.cache_info()
+                sizes[name] = {'entries': info.currsize, 'maxsize': info.maxsize,
+                               'hits': info.hits, 'misses': info.misses}
+            elif hasattr(cache, '__len__'):
+                sizes[name] = {'entries': len(cache), 'container_bytes': sys.getsizeof(cache)}
+            else:
+                sizes[name] = cache()
+        except Exception as e:
+            sizes[name] = {'error': str(e)}
+    return sizes
+
+
+def _filtered(snapshot):
+    """Drop allocations made by tracemalloc and the import machinery"""
+    return snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        tracemalloc.Filter(False, '<unknown>'),
+    ))
+
+
+def take_snapshot():
+    """Take and keep a snapshot, return (id, snapshot)"""
+    global _next_snapshot_id
+    snapshot = _filtered(tracemalloc.take_snapshot())
+    with _lock:
+        snapshot_id = _next_snapshot_id
+        _next_snapshot_id += 1
+        _snapshots.append((snapshot_id, datetime.now(timezone.utc).isoformat(), snapshot))
+        del _snapshots[:-MAX_SNAPSHOTS]
+    return snapshot_id, snapshot
+
+
+def get_snapshot(snapshot_id):
+    """Return a kept snapshot by id or None"""
+    with _lock:
+        for kept_id, _, snapshot in _snapshots:
+            if kept_id == snapshot_id:
+                return snapshot
+    return None
+
+
+def _site(statistic):
+    frame = statistic.traceback[0]
+    return f"{frame.filename}:{frame.lineno}"
+
+
+def top_sites(snapshot, limit=DEFAULT_LIMIT):
+    """Largest allocation sites of a snapshot"""
+    return [{
+        'site': _site(stat),
+        'size_kb': round(stat.size / 1024, 1),
+        'count': stat.count
+    } for stat in snapshot.statistics('lineno')[:limit]]
+
+
+def diff_snapshots(old, new, limit=DEFAULT_LIMIT):
+    """Allocation sites that grew the most between two snapshots"""
+    return [{
+        'site': _site(stat),
+        'size_diff_kb': round(stat.size_diff / 1024, 1),
+        'size_kb': round(stat.size / 1024, 1),
+        'count_diff': stat.count_diff
+    } for stat in new.compare_to(old, 'lineno')[:limit]]
+
+
+def traced_memory():
+    """Current and peak traced memory in KiB"""
+    current, peak = tracemalloc.get_traced_memory()
+    return {'current_kb': round(current / 1024, 1), 'peak_kb': round(peak / 1024, 1)}
+
+
+def _log_snapshot():
+    """Take a snapshot and log it with the diff against the previous one"""
+    with _lock:
+        previous = _snapshots[-1][2] if _snapshots else None
+    snapshot_id, snapshot = take_snapshot()
+    logger.warning("Memory snapshot %d taken (pid %d): %s", snapshot_id, os.getpid(), traced_memory())
+    if previous is not None:
+        for entry in diff_snapshots(previous, snapshot, limit=10):
+            logger.warning("  %+.1f KiB  %s", entry['size_diff_kb'], entry['site'])
+    for name, stats in cache_sizes().items():
+        logger.warning("  cache %s: %s", name, stats)
+
+
+def _signal_worker():
+    while True:
+        _signalled.wait()
+        _signalled.clear()
+        try:
+            _log_snapshot()
+        except Exception as e:
+            logger.error("Memory snapshot failed: %s", e)
+
+
+def _handle_signal(signum, frame):
+    # The interrupted code may hold _lock or the logging locks, so the
+    # snapshot is taken on the worker thread rather than in the handler
+    _signalled.set()
+
+
+def init_app(app):
+    """Start tracemalloc and install the diagnostics endpoints when enabled"""
+    app.config.setdefault('MEMORY_PROFILING_ENABLED', os.environ.get('MEMORY_PROFILING_ENABLED') == '1')
+    app.config.setdefault('MEMORY_PROFILING_FRAMES', int(os.environ.get('MEMORY_PROFILING_FRAMES', '10')))
+    app.config.setdefault('PROFILING_SECRET', os.environ.get('PROFILING_SECRET', ''))
+
+    if not app.config['MEMORY_PROFILING_ENABLED']:
+        return
+    if not app.config['PROFILING_SECRET']:
+        logger.warning("MEMORY_PROFILING_ENABLED is set but PROFILING_SECRET is empty; memory profiling stays off")
+        return
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(app.config['MEMORY_PROFILING_FRAMES'])
+
+    if app.jinja_env.cache is not None:
+        register_cache('jinja_templates', app.jinja_env.cache)
+
+    try:
+        signal.signal(signal.SIGUSR2, _handle_signal)
+        threading.Thread(target=_signal_worker, name='memory-snapshot', daemon=True).start()
+    except (ValueError, AttributeError):
+        # Not in the main thread, or no SIGUSR2 on this platform
+        logger.info("SIGUSR2 memory snapshot handler not installed")
+
+    def require_secret():
+        token = request.headers.get('X-Profile-Token', '')
+        if not hmac.compare_digest(token.encode(), app.config['PROFILING_SECRET'].encode()):
+            abort(404)
+
+    @app.route('/debug/memory')
+    def memory_status():
+        """Traced memory, kept snapshots, cache sizes and current top sites"""
+        require_secret()
+        limit = request.args.get('limit', DEFAULT_LIMIT, type=int)
+        with _lock:
+            kept = [{'id': kept_id, 'taken_at': taken_at} for kept_id, taken_at, _ in _snapshots]
+        return jsonify({
+            'pid': os.getpid(),
+            'traced': traced_memory(),
+            'snapshots': kept,
+            'caches': cache_sizes(),
+            'top_sites': top_sites(_filtered(tracemalloc.take_snapshot()), limit)
+        })
+
+    @app.route('/debug/memory/snapshot', methods=['POST'])
+    def memory_snapshot():
+        """Take a snapshot to diff against later"""
+        require_secret()
+        snapshot_id, _ = take_snapshot()
+        return jsonify({'id': snapshot_id, 'pid': os.getpid(), 'traced': traced_memory()})
+
+    @app.route('/debug/memory/diff')
+    def memory_diff():
+        """Top allocation sites grown between two snapshots"""
+        require_secret()
+        limit = request.args.get('limit', DEFAULT_LIMIT, type=int)
+        old = get_snapshot(request.args.get('from', type=int))
+        if old is None:
+            return jsonify({'error': 'Unknown "from" snapshot'}), 404
+
+        to_id = request.args.get('to', type=int)
+        if to_id is None:
+            to_id, new = take_snapshot()
+        else:
+            new = get_snapshot(to_id)
+            if new is None:
+                return jsonify({'error': 'Unknown "to" snapshot'}), 404
+
+        return jsonify({
+            'pid': os.getpid(),
+            'from': request.args.get('from', type=int),
+            'to': to_id,
+            'traced': traced_memory(),
+            'caches': cache_sizes(),
+            'diff': diff_snapshots(old, new, limit)
+        })
@@ -0,0 +1,271 @@
+"""
+Metrics - Request timing, per-stage breakdown and counters exposed at /metrics
+in the Prometheus text exposition format
+
+Stages recorded for every request:
+    parse   - formula parsing and molar mass calculation (see stage())
+    db      - time spent executing SQL, measured with SQLAlchemy cursor events
+    render  - Jinja template rendering, measured with Flask template signals
+
+In-process caches registered with register_cache() are read when /metrics is
+rendered (mmcalc_cache_hits, mmcalc_cache_misses, mmcalc_cache_entries).
+
+Metrics live in process memory, so each gunicorn worker reports its own values.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response, g, has_request_context, request, before_render_template, template_rendered
+from sqlalchemy import event
+
+import slow_log
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_labels(names, values):
+    """Render a label set as {a="1",b="2"}"""
+    if not names:
+        return ''
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+def _format_value(value):
+    """Render a sample value the way Prometheus expects"""
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        """Increment the counter for a label set"""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels):
+        """Current value for a label set"""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        return self.values.get(key, 0)
+
+    def collect(self):
+        """Return the exposition lines for this counter"""
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self.lock:
+            for key, value in sorted(self.values.items()):
+                lines.append(f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self.values = {}  # label key -> [bucket counts..., sum, count]
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        """Record one observation for a label set"""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def collect(self):
+        """Return the exposition lines for this histogram"""
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        names = self.labelnames + ('le',)
+        with self.lock:
+            for key, state in sorted(self.values.items()):
+                for bound, count in zip(self.buckets, state):
+                    labels = _format_labels(names, key + (_format_value(bound),))
+                    lines.append(f'{self.name}_bucket{labels} {count}')
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f'{self.name}_sum{labels} {_format_value(state[-2])}')
+                lines.append(f'{self.name}_count{labels} {state[-1]}')
+        return lines
+
+
+class CacheStats:
+    """Gauges read at scrape time from the cache_info() of registered caches
+    (functools.lru_cache or anything with the same hits/misses/currsize fields)"""
+
+    FIELDS = (
+        ('hits', 'hits', 'Cache hits since the cache was created or last cleared.'),
+        ('misses', 'misses', 'Cache misses since the cache was created or last cleared.'),
+        ('entries', 'currsize', 'Entries currently held in the cache.'),
+    )
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.caches = {}
+
+    def add(self, name, cache):
+        self.caches[name] = cache
+
+    def collect(self):
+        """Return the exposition lines for every registered cache"""
+        infos = {name: cache.cache_info() for name, cache in sorted(self.caches.items())}
+        lines = []
+        for suffix, field, documentation in self.FIELDS:
+            name = f'{self.prefix}_{suffix}'
+            lines.extend([f'# HELP {name} {documentation}', f'# TYPE {name} gauge'])
+            for cache, info in infos.items():
+                lines.append(f'{name}{_format_labels(("cache",), (cache,))} {_format_value(getattr(info, field))}')
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        """Add a metric to the registry and return it"""
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Render every registered metric in the text exposition format"""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.collect())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+REQUEST_DURATION = registry.register(Histogram(
+    'mmcalc_request_duration_seconds', 'Total request latency.', ('endpoint', 'method')))
+STAGE_DURATION = registry.register(Histogram(
+    'mmcalc_request_stage_duration_seconds', 'Time spent in each request stage.', ('endpoint', 'stage')))
+REQUESTS = registry.register(Counter(
+    'mmcalc_requests_total', 'Requests handled.', ('endpoint', 'method', 'status')))
+CACHE_REQUESTS = registry.register(Counter(
+    'mmcalc_cache_requests_total', 'Cache lookups by result.', ('cache', 'result')))
+HISTORY_WRITES = registry.register(Counter(
+    'mmcalc_history_writes_total', 'Calculation history writes.', ('status',)))
+CACHE_STATS = registry.register(CacheStats('mmcalc_cache'))
+
+
+def _add_stage_time(name, elapsed):
+    """Accumulate time for a stage of the current request"""
+    if has_request_context() and 'metrics_stages' in g:
+        g.metrics_stages[name] = g.metrics_stages.get(name, 0.0) + elapsed
+
+
+@contextmanager
+def stage(name):
+    """Time a block of code as a named stage of the current request.
+
+    The block is also recorded as a span for the slow request log.
+    """
+    start = time.perf_counter()
+    try:
+        with slow_log.span(name):
+            yield
+    finally:
+        _add_stage_time(name, time.perf_counter() - start)
+
+
+def record_cache(cache, hit):
+    """Count a cache lookup as a hit or a miss"""
+    CACHE_REQUESTS.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+def register_cache(name, cache):
+    """Export a cache's hits, misses and size with every /metrics scrape"""
+    CACHE_STATS.add(name, cache)
+
+
+def record_history_write(success):
+    """Count a calculation history insert"""
+    HISTORY_WRITES.inc(status='ok' if success else 'error')
+
+
+def _endpoint_label():
+    """Low-cardinality endpoint label for the current request"""
+    return request.endpoint or 'unmatched'
+
+
+def _before_request():
+    g.metrics_start = time.perf_counter()
+    g.metrics_stages = {}
+
+
+def _after_request(response):
+    start = g.pop('metrics_start', None)
+    stages = g.pop('metrics_stages', {})
+    if start is None or request.endpoint == 'metrics':
+        return response
+
+    endpoint = _endpoint_label()
+    REQUEST_DURATION.observe(time.perf_counter() - start, endpoint=endpoint, method=request.method)
+    REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    for name, elapsed in stages.items():
+        STAGE_DURATION.observe(elapsed, endpoint=endpoint, stage=name)
+    return response
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('metrics_query_start')
+    if starts:
+        _add_stage_time('db', time.perf_counter() - starts.pop())
+
+
+def _before_render(sender, template, context, **extra):
+    if has_request_context():
+        g.metrics_render_start = time.perf_counter()
+
+
+def _after_render(sender, template, context, **extra):
+    if has_request_context():
+        start = g.pop('metrics_render_start', None)
+        if start is not None:
+            _add_stage_time('render', time.perf_counter() - start)
+
+
+def init_app(app, db):
+    """Install the timing hooks and the /metrics endpoint on a Flask app"""
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(db.engine, 'after_cursor_execute', _after_cursor_execute)
+
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus scrape endpoint"""
+        return Response(registry.render(), content_type=CONTENT_TYPE)
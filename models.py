@@ -11,24 +11,75 @@ class SavedCompound(db.Model):
     name = db.Column(db.String(100), unique=True, nullable=False)
     formula = db.Column(db.String(200), nullable=False)
     molar_mass = db.Column(db.Float, nullable=False)
+    atomic_weight_table = db.Column(db.String(20), nullable=True)  # table version molar_mass was computed with
+    composition_hash = db.Column(db.String(16), nullable=True, index=True)  # of the Hill-order formula
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
     
     def __repr__(self):
         return f'<SavedCompound {self.name}: {self.formula}>'
 
+class CompoundElement(db.Model):
+    # Inverted index of SavedCompound compositions: one row per element of each compound
+    compound_id = db.Column(db.Integer, db.ForeignKey('saved_compound.id', ondelete='CASCADE'), primary_key=True)
+    element = db.Column(db.String(3), primary_key=True)
+    count = db.Column(db.Integer, nullable=False)
+
+    # Covers "compounds with element X (and count in a range)" without touching the table
+    __table_args__ = (db.Index('ix_compound_element_element_count', 'element', 'count', 'compound_id'),)
+
+    def __repr__(self):
+        return f'<CompoundElement {self.compound_id}: {self.element}{self.count}>'
+
+class Formula(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    formula = db.Column(db.String(200), unique=True, nullable=False)  # as written, whitespace removed
+    composition = db.Column(db.Text, nullable=False)  # JSON element -> count
+    composition_hash = db.Column(db.String(16), nullable=True, index=True)  # of the Hill-order formula
+    molar_mass = db.Column(db.Float, nullable=False)
+    atomic_weight_table = db.Column(db.String(20), nullable=True)  # table version molar_mass was computed with
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+    def __repr__(self):
+        return f'<Formula {self.formula}>'
+
 class CalculationHistory(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    formula = db.Column(db.String(200), nullable=False)
+    formula_id = db.Column(db.Integer, db.ForeignKey('formula.id'), nullable=False, index=True)
+    formula_entry = db.relationship('Formula', lazy='joined')
     mode = db.Column(db.String(10), nullable=False)  # '1', '2', '3'
     molar_mass = db.Column(db.Float, nullable=False)
+    atomic_weight_table = db.Column(db.String(20), nullable=True)  # table version molar_mass was computed with
     input_value = db.Column(db.Float, nullable=True)  # moles or mass input
     result_value = db.Column(db.Float, nullable=True)  # reagent mass or calculated moles
     unit = db.Column(db.String(10), default='mol')  # 'mol' or 'mmol'
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
     
+    @property
+    def formula(self):
+        return self.formula_entry.formula if self.formula_entry else None
+
     def __repr__(self):
         return f'<CalculationHistory {self.formula} mode {self.mode}>'
 
+class Job(db.Model):
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)  # 'queued', 'running', 'succeeded', 'failed', 'cancelled'
+    params = db.Column(db.Text, nullable=False)  # JSON
+    progress_done = db.Column(db.Integer, default=0)
+    progress_total = db.Column(db.Integer, nullable=True)
+    result_count = db.Column(db.Integer, default=0)
+    result_path = db.Column(db.String(500), nullable=True)  # JSONL file, one result per line
+    error = db.Column(db.Text, nullable=True)
+    worker_pid = db.Column(db.Integer, nullable=True)
+    cancel_requested = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.kind} {self.status}>'
+
 class UserSettings(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     setting_key = db.Column(db.String(50), unique=True, nullable=False)
@@ -0,0 +1,138 @@
+"""
+Plate Planner - Reagent masses for well plates and dilution series in one
+vectorized pass over stored molar masses
+
+Units: concentration in mM, volume in uL, mass in mg.
+    mass (mg) = concentration (mmol/L) * volume (uL) * 1e-6 (L/uL) * molar mass (g/mol)
+"""
+import csv
+import io
+
+import numpy as np
+
+PLATE_LAYOUTS = {
+    6: (2, 3),
+    24: (4, 6),
+    96: (8, 12),
+    384: (16, 24),
+}
+
+MAX_WELLS = 100 * 384  # compounds x concentrations x volumes in one plan
+MAX_DILUTION_STEPS = 32
+
+CSV_COLUMNS = ['plate', 'well', 'compound', 'formula', 'molar_mass', 'concentration_mM', 'volume_uL', 'mass_mg']
+
+
+def well_names(plate_size):
+    """Well labels of a plate in row-major order: A1, A2, ... H12"""
+    if plate_size not in PLATE_LAYOUTS:
+        raise ValueError(f"Plate size must be one of {', '.join(str(size) for size in sorted(PLATE_LAYOUTS))}")
+    rows, columns = PLATE_LAYOUTS[plate_size]
+    names = []
+    for row in range(rows):
+        # Row labels run A..Z then AA, AB.. for very large plates
+        label = chr(ord('A') + row) if row < 26 else 'A' + chr(ord('A') + row - 26)
+        names.extend(f"{label}{column + 1}" for column in range(columns))
+    return names
+
+
+def dilution_series(top, factor, steps):
+    """Concentrations of a serial dilution, starting at top"""
+    if factor <= 1:
+        raise ValueError("Dilution factor must be greater than 1")
+    if steps < 1:
+        raise ValueError("A dilution series needs at least one step")
+    if steps > MAX_DILUTION_STEPS:
+        raise ValueError(f"A dilution series can have at most {MAX_DILUTION_STEPS} steps")
+    return top / np.power(float(factor), np.arange(steps))
+
+
+def compute_masses(molar_masses, concentrations, volumes):
+    """Mass in mg for every compound x concentration x volume combination.
+
+    Returns an array of shape (compounds, concentrations, volumes).
+    """
+    molar_masses = np.asarray(molar_masses, dtype=float)
+    concentrations = np.asarray(concentrations, dtype=float)
+    volumes = np.asarray(volumes, dtype=float)
+    if not (np.isfinite(concentrations).all() and np.isfinite(volumes).all()):
+        raise ValueError("Concentrations and volumes must be finite numbers")
+    if (concentrations < 0).any() or (volumes < 0).any():
+        raise ValueError("Concentrations and volumes must not be negative")
+    # mM * uL * g/mol = 1e-9 g = 1e-6 mg
+    return molar_masses[:, None, None] * concentrations[None, :, None] * volumes[None, None, :] * 1e-6
+
+
+class PlatePlan:
+    def __init__(self, compounds, concentrations, volumes, plate_size=96):
+        """compounds is a list of dicts with name, formula and molar_mass"""
+        if not compounds:
+            raise ValueError("Select at least one compound")
+        if len(concentrations) == 0 or len(volumes) == 0:
+            raise ValueError("Provide at least one concentration and one volume")
+        if len(compounds) * len(concentrations) * len(volumes) > MAX_WELLS:
+            raise ValueError(f"A plate plan can have at most {MAX_WELLS} wells")
+
+        self.compounds = compounds
+        self.concentrations = np.asarray(concentrations, dtype=float)
+        self.volumes = np.asarray(volumes, dtype=float)
+        self.plate_size = plate_size
+        self.wells = well_names(plate_size)
+        self.masses = compute_masses([compound['molar_mass'] for compound in compounds],
+                                     self.concentrations, self.volumes)
+
+    @property
+    def well_count(self):
+        return self.masses.size
+
+    @property
+    def plate_count(self):
+        return -(-self.well_count // self.plate_size)
+
+    def rows(self):
+        """Yield one dict per well, filling plates in row-major order"""
+        # Flat index -> (compound, concentration, volume) without a Python triple loop
+        compound_index, concentration_index, volume_index = np.unravel_index(
+            np.arange(self.well_count), self.masses.shape)
+        flat_masses = self.masses.ravel()
+
+        for i in range(self.well_count):
+            compound = self.compounds[compound_index[i]]
+            yield {
+                'plate': i // self.plate_size + 1,
+                'well': self.wells[i % self.plate_size],
+                'compound': compound.get('name') or compound['formula'],
+                'formula': compound['formula'],
+                'molar_mass': compound['molar_mass'],
+                'concentration_mM': float(self.concentrations[concentration_index[i]]),
+                'volume_uL': float(self.volumes[volume_index[i]]),
+                'mass_mg': float(flat_masses[i])
+            }
+
+    def totals(self):
+        """Total mass needed per compound across all wells, in mg"""
+        per_compound = self.masses.reshape(len(self.compounds), -1).sum(axis=1)
+        return [{'compound': compound.get('name') or compound['formula'],
+                 'formula': compound['formula'],
+                 'total_mass_mg': float(total)}
+                for compound, total in zip(self.compounds, per_compound)]
+
+    def to_dict(self):
+        return {
+            'plate_size': self.plate_size,
+            'plates': self.plate_count,
+            'wells': list(self.rows()),
+            'totals': self.totals()
+        }
+
+    def iter_csv(self):
+        """Yield the plan as CSV text, one chunk per line"""
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        yield buffer.getvalue()
+        for row in self.rows():
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow(row)
+            yield buffer.getvalue()
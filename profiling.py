@@ -0,0 +1,108 @@
+"""
+Profiling - Opt-in cProfile capture of individual requests
+
+Enable with both environment variables:
+    PROFILING_ENABLED=1
+    PROFILING_SECRET=<long random string>
+
+Then send the secret with the slow request, either as a header or a query
+parameter:
+    curl -H "X-Profile-Token: <secret>" https://.../calculate?mode=1
+    curl "https://.../history?_profile=<secret>"
+
+The matched view (including template rendering) runs under cProfile and two
+files are written to PROFILING_DIR (default: profiles/):
+    <timestamp>-<endpoint>-<pid>.pstats   load with pstats or snakeviz
+    <timestamp>-<endpoint>-<pid>.txt      top functions by cumulative time
+"""
+import cProfile
+import hmac
+import io
+import logging
+import os
+import pstats
+import time
+
+from urllib.parse import urlencode
+
+from flask import g, request
+
+logger = logging.getLogger(__name__)
+
+TOKEN_HEADER = 'X-Profile-Token'
+TOKEN_PARAM = '_profile'
+SUMMARY_LINES = 30
+
+
+def _requested(secret):
+    """True when the current request carries the profiling secret"""
+    token = request.headers.get(TOKEN_HEADER) or request.args.get(TOKEN_PARAM)
+    if not token:
+        return False
+    return hmac.compare_digest(token.encode(), secret.encode())
+
+
+def _profiled_path():
+    """Request path and query string without the profiling secret"""
+    query = urlencode([(key, value) for key, value in request.args.items(multi=True) if key != TOKEN_PARAM])
+    return f"{request.path}?{query}" if query else request.path
+
+
+def write_profile(profiler, directory, endpoint):
+    """Write the pstats dump and a text summary, return the pstats path"""
+    os.makedirs(directory, exist_ok=True)
+    now = time.time()
+    stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(now)) + f"{int(now * 1000) % 1000:03d}"
+    base = os.path.join(directory, f"{stamp}-{endpoint}-{os.getpid()}")
+
+    profiler.dump_stats(f"{base}.pstats")
+
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.strip_dirs().sort_stats('cumulative').print_stats(SUMMARY_LINES)
+    with open(f"{base}.txt", 'w') as f:
+        f.write(f"{request.method} {_profiled_path()}\n\n")
+        f.write(stream.getvalue())
+
+    return f"{base}.pstats"
+
+
+def init_app(app):
+    """Install the profiling hooks when PROFILING_ENABLED and PROFILING_SECRET are set"""
+    app.config.setdefault('PROFILING_ENABLED', os.environ.get('PROFILING_ENABLED') == '1')
+    app.config.setdefault('PROFILING_SECRET', os.environ.get('PROFILING_SECRET', ''))
+    app.config.setdefault('PROFILING_DIR', os.environ.get('PROFILING_DIR', 'profiles'))
+
+    if not app.config['PROFILING_ENABLED']:
+        return
+    if not app.config['PROFILING_SECRET']:
+        logger.warning("PROFILING_ENABLED is set but PROFILING_SECRET is empty; profiling stays off")
+        return
+
+    @app.before_request
+    def start_profiler():
+        if request.endpoint and _requested(app.config['PROFILING_SECRET']):
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+
+    @app.after_request
+    def stop_profiler(response):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return response
+
+        profiler.disable()
+        try:
+            path = write_profile(profiler, app.config['PROFILING_DIR'], request.endpoint)
+            response.headers['X-Profile-File'] = os.path.basename(path)
+            logger.info("Profile for %s %s written to %s", request.method, request.path, path)
+        except OSError as e:
+            logger.error("Failed to write profile: %s", e)
+        return response
+
+    @app.teardown_request
+    def discard_profiler(exc):
+        # The view raised before after_request could run
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
@@ -0,0 +1,112 @@
+"""
+Query Counter - Count SQL queries and their total time for each request, and
+assert that code stays within a declared query budget
+
+In debug mode (or with SQL_QUERY_HEADERS=1) every response carries
+X-Query-Count and X-Query-Time-Ms headers; the same numbers are always
+logged at DEBUG level.
+"""
+import logging
+import os
+import time
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.statements = []
+
+    def record(self, statement, elapsed):
+        """Record one executed statement"""
+        self.count += 1
+        self.total_time += elapsed
+        self.statements.append(statement)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryCounter:
+    """Context manager counting every query executed on an engine while active"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.stats = QueryStats()
+        self._starts = []
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        self._starts.append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        start = self._starts.pop() if self._starts else time.perf_counter()
+        self.stats.record(statement, time.perf_counter() - start)
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._before)
+        event.listen(self.engine, 'after_cursor_execute', self._after)
+        return self.stats
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(self.engine, 'before_cursor_execute', self._before)
+        event.remove(self.engine, 'after_cursor_execute', self._after)
+        return False
+
+
+def assert_query_budget(app, db, client, method, path, budget, data=None):
+    """Issue a request through the test client and fail if it runs more than budget queries"""
+    with app.app_context():
+        engine = db.engine
+    with QueryCounter(engine) as stats:
+        response = client.open(path, method=method, data=data)
+
+    if stats.count > budget:
+        statements = '\n'.join(f"  {i + 1}. {statement}" for i, statement in enumerate(stats.statements))
+        raise QueryBudgetExceeded(
+            f"{method} {path} ran {stats.count} queries, budget is {budget}:\n{statements}")
+    return response, stats
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_counter_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('query_counter_start')
+    start = starts.pop() if starts else time.perf_counter()
+    if has_request_context() and 'query_stats' in g:
+        g.query_stats.record(statement, time.perf_counter() - start)
+
+
+def _before_request():
+    g.query_stats = QueryStats()
+
+
+def _after_request(response):
+    stats = g.pop('query_stats', None)
+    if stats is None:
+        return response
+
+    logger.debug("%s %s: %d queries in %.2f ms", request.method, request.path,
+                 stats.count, stats.total_time * 1000)
+    if current_app.debug or current_app.config.get('SQL_QUERY_HEADERS'):
+        response.headers['X-Query-Count'] = str(stats.count)
+        response.headers['X-Query-Time-Ms'] = f"{stats.total_time * 1000:.2f}"
+    return response
+
+
+def init_app(app, db):
+    """Install per-request query counting on a Flask app"""
+    app.config.setdefault('SQL_QUERY_HEADERS', os.environ.get('SQL_QUERY_HEADERS') == '1')
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(db.engine, 'after_cursor_execute', _after_cursor_execute)
@@ -0,0 +1,428 @@
+"""
+Reaction Table - Incrementally evaluated stoichiometry sheet
+
+Every value in the table is a cell (row id, field). Derived cells declare the
+cells they depend on, and editing a cell recomputes only its transitive
+dependents in topological order, stopping wherever a value comes out
+unchanged. Each edit returns just the cells whose values changed.
+
+Units: moles in mol, mass in g, volume in mL, density in g/mL, molarity in mol/L.
+
+Each row gets its amount from exactly one source:
+    'equivalents'  moles = basis moles * equivalents / basis equivalents
+    'moles'        entered directly
+    'mass'         moles = mass / molar mass
+    'volume'       moles from volume and density, or volume and molarity
+Rows without a basis are roots (typically the reference reagent). A row's
+basis can be any other row, so a product of one step can be the basis of the
+next step in a multistep table. When a row's amount is entered directly, its
+equivalents are back-calculated from its basis.
+"""
+import math
+import threading
+import uuid
+from collections import OrderedDict, deque
+
+ROW_FIELDS = ('formula', 'role', 'basis', 'source', 'equivalents', 'molar_mass',
+              'moles', 'mass', 'volume', 'density', 'molarity')
+AMOUNT_FIELDS = ('moles', 'mass', 'volume')
+EDITABLE_FIELDS = ('formula', 'role', 'basis', 'equivalents', 'density', 'molarity') + AMOUNT_FIELDS
+ROLES = ('reactant', 'reagent', 'product', 'solvent')
+
+TABLE_ROW = '_table'
+LIMITING_CELL = (TABLE_ROW, 'limiting')
+
+
+def _number(value):
+    """Parse a numeric cell value, None for blank"""
+    if value is None or value == '':
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Not a number: {value}")
+    if not math.isfinite(number):
+        raise ValueError("Values must be finite numbers")
+    if number < 0:
+        raise ValueError("Values must not be negative")
+    return number
+
+
+def _divide(numerator, denominator):
+    if numerator is None or not denominator:
+        return None
+    return numerator / denominator
+
+
+class ReactionTable:
+    def __init__(self, calculator):
+        self.calculator = calculator
+        self.rows = OrderedDict()  # row id -> {'basis': id or None, 'source': field}
+        self.values = {}  # (row id, field) -> value
+        self.rules = {}  # derived cell -> (dependency cells, compute function)
+        self.dependents = {}  # cell -> set of derived cells that read it
+        self.lock = threading.RLock()  # held by callers for each edit
+        self._next_row = 1
+
+    # Graph maintenance
+
+    def _set_rule(self, cell, deps, compute):
+        self._drop_rule(cell)
+        self.rules[cell] = (tuple(deps), compute)
+        for dep in deps:
+            self.dependents.setdefault(dep, set()).add(cell)
+
+    def _drop_rule(self, cell):
+        rule = self.rules.pop(cell, None)
+        if rule:
+            for dep in rule[0]:
+                self.dependents.get(dep, set()).discard(cell)
+
+    def _install_row_rules(self, row_id):
+        """(Re)build the derived cells of one row, return them"""
+        row = self.rows[row_id]
+        basis = row['basis']
+        source = row['source']
+        v = self.values
+
+        def cell(field, row=row_id):
+            return (row, field)
+
+        installed = []
+
+        def rule(field, deps, compute):
+            self._set_rule(cell(field), deps, compute)
+            installed.append(cell(field))
+
+        for field in ('equivalents', 'moles', 'mass', 'volume'):
+            self._drop_rule(cell(field))
+
+        rule('molar_mass', [cell('formula')], lambda: self._molar_mass(v.get(cell('formula'))))
+
+        if source == 'equivalents':
+            if basis is None:
+                rule('moles', [], lambda: None)
+            else:
+                rule('moles', [cell('moles', basis), cell('equivalents', basis), cell('equivalents')],
+                     lambda: _divide(
+                         None if v.get(cell('moles', basis)) is None or v.get(cell('equivalents')) is None
+                         else v[cell('moles', basis)] * v[cell('equivalents')],
+                         v.get(cell('equivalents', basis))))
+        elif source == 'mass':
+            rule('moles', [cell('mass'), cell('molar_mass')],
+                 lambda: _divide(v.get(cell('mass')), v.get(cell('molar_mass'))))
+        elif source == 'volume':
+            rule('moles', [cell('volume'), cell('density'), cell('molarity'), cell('molar_mass')],
+                 lambda: self._moles_from_volume(row_id))
+
+        if source != 'equivalents' and basis is not None:
+            # Amount entered directly: back-calculate equivalents from the basis
+            rule('equivalents', [cell('moles'), cell('moles', basis), cell('equivalents', basis)],
+                 lambda: _divide(
+                     None if v.get(cell('moles')) is None or v.get(cell('equivalents', basis)) is None
+                     else v[cell('moles')] * v[cell('equivalents', basis)],
+                     v.get(cell('moles', basis))))
+
+        if source != 'mass':
+            rule('mass', [cell('moles'), cell('molar_mass')],
+                 lambda: None if v.get(cell('moles')) is None or v.get(cell('molar_mass')) is None
+                 else v[cell('moles')] * v[cell('molar_mass')])
+        if source != 'volume':
+            rule('volume', [cell('mass'), cell('moles'), cell('density'), cell('molarity')],
+                 lambda: self._volume(row_id))
+
+        return installed
+
+    def _install_table_rules(self):
+        """Limiting reagent depends on every reactant's moles and equivalents"""
+        deps = []
+        for row_id in self.rows:
+            deps.extend([(row_id, 'role'), (row_id, 'moles'), (row_id, 'equivalents')])
+        self._set_rule(LIMITING_CELL, deps, self._limiting_reagent)
+        return [LIMITING_CELL]
+
+    # Cell computations
+
+    def _formula(self, formula):
+        """Validate a formula cell value, blank allowed"""
+        if formula is None or formula == '':
+            return ''
+        if not isinstance(formula, str) or self.calculator.element_counts(formula) is None:
+            raise ValueError(f"Invalid chemical formula: {formula}")
+        return formula.strip()
+
+    def _molar_mass(self, formula):
+        if not formula:
+            return None
+        if self.calculator.element_counts(formula) is None:
+            return None
+        return self.calculator.calculate_molar_mass(formula)
+
+    def _moles_from_volume(self, row_id):
+        v = self.values
+        volume = v.get((row_id, 'volume'))
+        if volume is None:
+            return None
+        if v.get((row_id, 'density')):
+            return _divide(volume * v[(row_id, 'density')], v.get((row_id, 'molar_mass')))
+        if v.get((row_id, 'molarity')):
+            return volume / 1000 * v[(row_id, 'molarity')]
+        return None
+
+    def _volume(self, row_id):
+        v = self.values
+        if v.get((row_id, 'density')):
+            return _divide(v.get((row_id, 'mass')), v[(row_id, 'density')])
+        if v.get((row_id, 'molarity')):
+            moles = _divide(v.get((row_id, 'moles')), v[(row_id, 'molarity')])
+            return moles * 1000 if moles is not None else None
+        return None
+
+    def _limiting_reagent(self):
+        """Reactant with the fewest moles per equivalent"""
+        best = None
+        best_ratio = None
+        for row_id in self.rows:
+            if self.values.get((row_id, 'role')) != 'reactant':
+                continue
+            ratio = _divide(self.values.get((row_id, 'moles')), self.values.get((row_id, 'equivalents')))
+            if ratio is not None and (best_ratio is None or ratio < best_ratio):
+                best, best_ratio = row_id, ratio
+        return best
+
+    # Evaluation
+
+    def _recompute(self, dirty, forced=()):
+        """Re-evaluate everything downstream of dirty cells, return {cell: value} of changes"""
+        affected = set()
+        queue = deque(set(dirty) | set(forced))
+        while queue:
+            current = queue.popleft()
+            for dependent in self.dependents.get(current, ()):
+                if dependent not in affected:
+                    affected.add(dependent)
+                    queue.append(dependent)
+        affected |= {cell for cell in forced if cell in self.rules}
+
+        # Kahn's algorithm over the affected subgraph
+        indegree = {cell: 0 for cell in affected}
+        for cell in affected:
+            for dep in self.rules[cell][0]:
+                if dep in affected:
+                    indegree[cell] += 1
+        ready = deque(cell for cell, degree in indegree.items() if degree == 0)
+        order = []
+        while ready:
+            current = ready.popleft()
+            order.append(current)
+            for dependent in self.dependents.get(current, ()):
+                if dependent in indegree:
+                    indegree[dependent] -= 1
+                    if indegree[dependent] == 0:
+                        ready.append(dependent)
+        if len(order) != len(affected):
+            raise ValueError("Circular dependency between rows")
+
+        changed = set(dirty)
+        forced = set(forced)
+        updates = {}
+        for current in order:
+            deps, compute = self.rules[current]
+            if current not in forced and not any(dep in changed for dep in deps):
+                continue
+            new_value = compute()
+            if current not in self.values or self.values[current] != new_value:
+                self.values[current] = new_value
+                changed.add(current)
+                updates[current] = new_value
+        return updates
+
+    # Public API
+
+    def add_row(self, formula, role='reactant', basis=None, equivalents=None, density=None,
+                molarity=None, row_id=None, **amount):
+        """Add a row, return the changed cells.
+
+        Pass at most one of moles=, mass= or volume= to enter the amount
+        directly; otherwise the amount comes from equivalents of the basis.
+        """
+        if row_id is None:
+            while f"r{self._next_row}" in self.rows:
+                self._next_row += 1
+            row_id = f"r{self._next_row}"
+        row_id = str(row_id)
+        if row_id in self.rows or row_id == TABLE_ROW:
+            raise ValueError(f"Row {row_id} already exists")
+        if basis is not None and basis not in self.rows:
+            raise ValueError(f"Unknown basis row: {basis}")
+        if role not in ROLES:
+            raise ValueError(f"Role must be one of {', '.join(ROLES)}")
+        amount = {field: value for field, value in amount.items() if value not in (None, '')}
+        unknown = set(amount) - set(AMOUNT_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        if len(amount) > 1:
+            raise ValueError("Enter only one of moles, mass or volume")
+
+        # Build every input first so a bad value leaves the table untouched
+        source = next(iter(amount), 'equivalents')
+        inputs = {
+            'formula': self._formula(formula),
+            'role': role,
+            'basis': basis,
+            'source': source,
+            'density': _number(density),
+            'molarity': _number(molarity),
+        }
+        if source == 'equivalents' or basis is None:
+            inputs['equivalents'] = _number(equivalents if equivalents is not None else 1)
+        for field, value in amount.items():
+            inputs[field] = _number(value)
+
+        self.rows[row_id] = {'basis': basis, 'source': source}
+        for field, value in inputs.items():
+            self.values[(row_id, field)] = value
+
+        forced = self._install_row_rules(row_id) + self._install_table_rules()
+        updates = self._recompute([(row_id, field) for field in inputs], forced)
+        updates.update({(row_id, field): value for field, value in inputs.items()})
+        return row_id, self._format(updates)
+
+    def remove_row(self, row_id):
+        """Remove a row; rows based on it become roots, with equivalents reset
+        to 1 where they were back-calculated from it. Return the changed cells."""
+        if row_id not in self.rows:
+            raise ValueError(f"Unknown row: {row_id}")
+        for field in ROW_FIELDS:
+            self._drop_rule((row_id, field))
+            self.values.pop((row_id, field), None)
+            self.dependents.pop((row_id, field), None)
+        del self.rows[row_id]
+
+        updates = {}
+        for other_id, row in self.rows.items():
+            if row['basis'] == row_id:
+                row['basis'] = None
+                self.values[(other_id, 'basis')] = None
+                updates[(other_id, 'basis')] = None
+                dirty = [(other_id, 'basis')]
+                if row['source'] != 'equivalents':
+                    # Equivalents were back-calculated from the removed row; as a
+                    # root the row gets the same default as add_row gives one
+                    self.values[(other_id, 'equivalents')] = 1.0
+                    updates[(other_id, 'equivalents')] = 1.0
+                    dirty.append((other_id, 'equivalents'))
+                updates.update(self._recompute(dirty, self._install_row_rules(other_id)))
+        updates.update(self._recompute([], self._install_table_rules()))
+        return self._format(updates)
+
+    def set_cell(self, row_id, field, value):
+        """Edit one cell, return only the cells whose values changed"""
+        return self.set_cells([(row_id, field, value)])
+
+    def set_cells(self, edits):
+        """Apply several edits and recompute once, return the changed cells"""
+        # Validate everything first so a bad edit leaves the table untouched
+        normalized = []
+        for row_id, field, value in edits:
+            if row_id not in self.rows:
+                raise ValueError(f"Unknown row: {row_id}")
+            if field not in EDITABLE_FIELDS:
+                raise ValueError(f"Field {field} cannot be edited")
+            if field == 'basis':
+                value = value or None
+                if value is not None:
+                    self._check_basis(row_id, value)
+            elif field == 'role':
+                if value not in ROLES:
+                    raise ValueError(f"Role must be one of {', '.join(ROLES)}")
+            elif field == 'formula':
+                value = self._formula(value)
+            else:
+                value = _number(value)
+            normalized.append((row_id, field, value))
+
+        dirty = []
+        structural = set()
+        updates = {}
+        for row_id, field, value in normalized:
+            row = self.rows[row_id]
+            if field == 'basis':
+                row['basis'] = value
+                structural.add(row_id)
+
+            new_source = None
+            if field in AMOUNT_FIELDS:
+                new_source = field
+            elif field == 'equivalents' and row['basis'] is not None:
+                new_source = 'equivalents'
+            if new_source and new_source != row['source']:
+                row['source'] = new_source
+                self.values[(row_id, 'source')] = new_source
+                updates[(row_id, 'source')] = new_source
+                structural.add(row_id)
+
+            if self.values.get((row_id, field)) != value or row_id in structural:
+                self.values[(row_id, field)] = value
+                updates[(row_id, field)] = value
+                dirty.append((row_id, field))
+
+        forced = []
+        for row_id in structural:
+            forced.extend(self._install_row_rules(row_id))
+        updates.update(self._recompute(dirty, forced))
+        return self._format(updates)
+
+    def _check_basis(self, row_id, basis):
+        if basis not in self.rows:
+            raise ValueError(f"Unknown basis row: {basis}")
+        current = basis
+        while current is not None:
+            if current == row_id:
+                raise ValueError("A row cannot be based on itself, directly or indirectly")
+            current = self.rows[current]['basis']
+
+    def _format(self, updates):
+        return [{'row': row_id, 'field': field, 'value': value}
+                for (row_id, field), value in updates.items()]
+
+    def to_dict(self):
+        """Full table contents"""
+        return {
+            'rows': [dict({'id': row_id}, **{field: self.values.get((row_id, field)) for field in ROW_FIELDS})
+                     for row_id in self.rows],
+            'limiting': self.values.get(LIMITING_CELL)
+        }
+
+
+class ReactionTableStore:
+    """Bounded in-process store of open tables, least recently used evicted first"""
+
+    def __init__(self, calculator, max_tables=256):
+        self.calculator = calculator
+        self.max_tables = max_tables
+        self.tables = OrderedDict()
+        self.lock = threading.Lock()
+
+    def create(self):
+        table_id = uuid.uuid4().hex[:12]
+        table = ReactionTable(self.calculator)
+        with self.lock:
+            self.tables[table_id] = table
+            while len(self.tables) > self.max_tables:
+                self.tables.popitem(last=False)
+        return table_id, table
+
+    def get(self, table_id):
+        with self.lock:
+            table = self.tables.get(table_id)
+            if table is not None:
+                self.tables.move_to_end(table_id)
+            return table
+
+    def delete(self, table_id):
+        with self.lock:
+            return self.tables.pop(table_id, None) is not None
+
+    def __len__(self):
+        return len(self.tables)
@@ -0,0 +1,159 @@
+"""
+Recompute Masses - Bring stored molar masses up to date with an atomic-weight table
+
+SavedCompound, Formula and CalculationHistory rows keep the molar mass they
+were computed with, plus the version of the atomic-weight table used
+(atomic_weight_table, NULL when unknown). After the weights change, this
+recomputes every row computed with another table:
+
+    1. saved_compound and formula: rows are read in id order, chunk by chunk;
+       each chunk's masses come from one vectorized molar_masses() call and
+       are written back with a single executemany UPDATE
+    2. calculation_history: one set-based UPDATE per chunk copies the new
+       mass from the row's formula and rescales the stored result (reagent
+       mass scales with the molar mass, moles inversely)
+
+Every chunk is its own transaction, so an interrupted run keeps its progress
+and simply resumes where it stopped when started again. Rows with formulas
+that cannot be parsed are left untouched.
+
+Usage:
+    python recompute_masses.py [--table VERSION] [--chunk-size N] [--all]
+
+--table defaults to the atomic weight table chosen on the settings page;
+--all recomputes rows already tagged with the target table too.
+"""
+import argparse
+import logging
+import math
+
+from sqlalchemy import and_, bindparam, case, func, or_, select, true
+
+from models import CalculationHistory, Formula, SavedCompound, db
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def _stale(table, version, force):
+    """Rows whose mass was not computed with version"""
+    if force:
+        return true()
+    return or_(table.c.atomic_weight_table.is_(None), table.c.atomic_weight_table != version)
+
+
+def _count(table, version, force):
+    return db.session.execute(select(func.count()).select_from(table).where(_stale(table, version, force))).scalar()
+
+
+def recompute_formula_masses(model, calculator, chunk_size=DEFAULT_CHUNK_SIZE, force=False, progress=None):
+    """Recompute molar_mass of a table with a formula column, return the number of rows updated"""
+    table = model.__table__
+    version = calculator.table_version
+    total = _count(table, version, force)
+    update = table.update().where(table.c.id == bindparam('row_id')) \
+        .values(molar_mass=bindparam('mass'), atomic_weight_table=version)
+
+    last_id, done, updated = 0, 0, 0
+    while True:
+        with db.engine.begin() as connection:
+            rows = connection.execute(
+                select(table.c.id, table.c.formula)
+                .where(table.c.id > last_id, _stale(table, version, force))
+                .order_by(table.c.id).limit(chunk_size)).all()
+            if not rows:
+                break
+            masses = calculator.molar_masses([formula for _, formula in rows])
+            params = [{'row_id': row_id, 'mass': float(mass)}
+                      for (row_id, _), mass in zip(rows, masses) if not math.isnan(mass)]
+            if params:
+                connection.execute(update, params)
+        last_id = rows[-1][0]
+        done += len(rows)
+        updated += len(params)
+        if progress:
+            progress(table.name, done, total)
+    return updated
+
+
+def recompute_history_masses(version, chunk_size=DEFAULT_CHUNK_SIZE, force=False, progress=None):
+    """Copy recomputed formula masses into calculation_history, return the number of rows updated.
+
+    Only rows whose formula was recomputed with version are touched, so
+    recompute_formula_masses(Formula, ...) has to run first.
+    """
+    history = CalculationHistory.__table__
+    formula = Formula.__table__
+    new_mass = select(formula.c.molar_mass).where(formula.c.id == history.c.formula_id).scalar_subquery()
+    formula_version = select(formula.c.atomic_weight_table) \
+        .where(formula.c.id == history.c.formula_id).scalar_subquery()
+    result_value = case(
+        (and_(history.c.mode == '2', history.c.molar_mass > 0),
+         history.c.result_value * new_mass / history.c.molar_mass),
+        (and_(history.c.mode == '3', new_mass > 0),
+         history.c.result_value * history.c.molar_mass / new_mass),
+        else_=history.c.result_value)
+    total = _count(history, version, force)
+
+    last_id, done, updated = 0, 0, 0
+    while True:
+        with db.engine.begin() as connection:
+            ids = connection.execute(
+                select(history.c.id).where(history.c.id > last_id, _stale(history, version, force))
+                .order_by(history.c.id).limit(chunk_size)).scalars().all()
+            if not ids:
+                break
+            # SET expressions see the old molar_mass, so the result is rescaled correctly
+            updated += connection.execute(
+                history.update()
+                .where(history.c.id.between(ids[0], ids[-1]), _stale(history, version, force),
+                       formula_version == version)
+                .values(molar_mass=new_mass, result_value=result_value, atomic_weight_table=version)
+            ).rowcount
+        last_id = ids[-1]
+        done += len(ids)
+        if progress:
+            progress(history.name, done, total)
+    return updated
+
+
+def recompute(calculator, chunk_size=DEFAULT_CHUNK_SIZE, force=False, progress=None):
+    """Recompute every stored molar mass with calculator's table, return rows updated per table"""
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be at least 1")
+    counts = {}
+    for model in (SavedCompound, Formula):
+        counts[model.__tablename__] = recompute_formula_masses(model, calculator, chunk_size, force, progress)
+    counts[CalculationHistory.__tablename__] = recompute_history_masses(
+        calculator.table_version, chunk_size, force, progress)
+    logger.info("Recomputed molar masses with %s: %s", calculator.table_version, counts)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute stored molar masses with an atomic-weight table")
+    parser.add_argument('--table', help="atomic weight table version (default: the configured table)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="rows per transaction")
+    parser.add_argument('--all', action='store_true', help="also recompute rows already on the target table")
+    args = parser.parse_args()
+
+    # Importing the app creates missing tables and runs the schema migration
+    import app
+    from atomic_weights import DEFAULT_TABLE
+    from calculator import MolarMassCalculator
+
+    def progress(table, done, total):
+        print(f"  {table}: {done}/{total}", flush=True)
+
+    with app.app.app_context():
+        calculator = MolarMassCalculator.for_table(
+            args.table or app.get_setting('atomic_weight_table', DEFAULT_TABLE))
+        print(f"Recomputing molar masses with {calculator.table.name}")
+        counts = recompute(calculator, args.chunk_size, args.all, progress)
+    for table, count in counts.items():
+        print(f"{table}: {count} row(s) updated")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,305 @@
+"""
+Slow Log - Record a span tree for every request and write the ones slower
+than a threshold to a JSONL file, plus an offline analyzer for that file
+
+Each entry holds a nested span tree rooted at the view:
+    view
+    ├── parse            formula parsing (metrics.stage)
+    ├── sql              one span per statement, with the SQL text
+    ├── render           template rendering, SQL run from templates nests here
+    └── history_commit   calculation history insert
+
+Configuration:
+    SLOW_REQUEST_THRESHOLD_MS   latency above which a request is logged (default 1000)
+    SLOW_REQUEST_LOG            JSONL path (default logs/slow_requests.jsonl)
+
+Analyze a log offline with:
+    python slow_log.py logs/slow_requests.jsonl
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from flask import g, has_request_context, request, before_render_template, template_rendered
+from sqlalchemy import event
+
+MAX_STATEMENT_LENGTH = 500
+
+_write_lock = threading.Lock()
+
+
+class Span:
+    def __init__(self, name, attrs=None):
+        self.name = name
+        self.attrs = attrs or {}
+        self.start = time.perf_counter()
+        self.end = None
+        self.children = []
+
+    @property
+    def duration(self):
+        return (self.end or time.perf_counter()) - self.start
+
+    def to_dict(self, origin):
+        """Serialize with offsets relative to origin, in milliseconds"""
+        data = {
+            'name': self.name,
+            'start_ms': round((self.start - origin) * 1000, 3),
+            'duration_ms': round(self.duration * 1000, 3),
+        }
+        if self.attrs:
+            data.update(self.attrs)
+        if self.children:
+            data['children'] = [child.to_dict(origin) for child in self.children]
+        return data
+
+
+class Trace:
+    def __init__(self):
+        self.root = Span('view')
+        self.stack = [self.root]
+        self.query_count = 0
+
+    def open(self, name, attrs=None):
+        span = Span(name, attrs)
+        self.stack[-1].children.append(span)
+        self.stack.append(span)
+        return span
+
+    def close(self, name):
+        # Only close the innermost span if it is the one expected, so an
+        # unbalanced event can never pop the root
+        if len(self.stack) > 1 and self.stack[-1].name == name:
+            span = self.stack.pop()
+            span.end = time.perf_counter()
+
+
+def _current_trace():
+    if has_request_context():
+        return g.get('slow_trace')
+    return None
+
+
+@contextmanager
+def span(name, **attrs):
+    """Record a block of code as a child span of the current request"""
+    trace = _current_trace()
+    if trace is None:
+        yield
+        return
+    trace.open(name, attrs)
+    try:
+        yield
+    finally:
+        trace.close(name)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    trace = _current_trace()
+    if trace is not None:
+        trace.query_count += 1
+        trace.open('sql', {'statement': statement[:MAX_STATEMENT_LENGTH]})
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    trace = _current_trace()
+    if trace is not None:
+        trace.close('sql')
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute does not run for a statement that raised
+    trace = _current_trace()
+    if trace is not None:
+        trace.close('sql')
+
+
+def _before_render(sender, template, context, **extra):
+    trace = _current_trace()
+    if trace is not None:
+        trace.open('render', {'template': template.name})
+
+
+def _after_render(sender, template, context, **extra):
+    trace = _current_trace()
+    if trace is not None:
+        trace.close('render')
+
+
+def write_entry(path, entry):
+    """Append one JSON line to the slow log"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    line = json.dumps(entry, sort_keys=True)
+    with _write_lock:
+        with open(path, 'a') as f:
+            f.write(line + '\n')
+
+
+def init_app(app, db):
+    """Install span recording and slow-request logging on a Flask app"""
+    app.config.setdefault('SLOW_REQUEST_THRESHOLD_MS', float(os.environ.get('SLOW_REQUEST_THRESHOLD_MS', '1000')))
+    app.config.setdefault('SLOW_REQUEST_LOG', os.environ.get('SLOW_REQUEST_LOG', os.path.join('logs', 'slow_requests.jsonl')))
+
+    @app.before_request
+    def start_trace():
+        g.slow_trace = Trace()
+
+    @app.after_request
+    def finish_trace(response):
+        trace = g.pop('slow_trace', None)
+        if trace is None:
+            return response
+
+        trace.root.end = time.perf_counter()
+        duration_ms = trace.root.duration * 1000
+        if duration_ms < app.config['SLOW_REQUEST_THRESHOLD_MS']:
+            return response
+
+        entry = {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'pid': os.getpid(),
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint or 'unmatched',
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 3),
+            'query_count': trace.query_count,
+            'spans': trace.root.to_dict(trace.root.start)
+        }
+        try:
+            write_entry(app.config['SLOW_REQUEST_LOG'], entry)
+        except OSError as e:
+            app.logger.error("Failed to write slow request log: %s", e)
+        return response
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(db.engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(db.engine, 'handle_error', _handle_error)
+
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+
+
+# Offline analysis
+
+def self_times(span_dict, totals=None):
+    """Sum exclusive (self) time per span name over a serialized span tree"""
+    if totals is None:
+        totals = {}
+    children = span_dict.get('children', [])
+    child_time = sum(child['duration_ms'] for child in children)
+    name = span_dict['name']
+    totals[name] = totals.get(name, 0.0) + max(span_dict['duration_ms'] - child_time, 0.0)
+    for child in children:
+        self_times(child, totals)
+    return totals
+
+
+def dominant_span(entry):
+    """Span name with the largest exclusive time in an entry"""
+    totals = self_times(entry['spans'])
+    return max(totals.items(), key=lambda item: item[1])[0]
+
+
+def collect_statements(span_dict, totals):
+    """Accumulate (count, total ms) per SQL statement"""
+    if span_dict['name'] == 'sql':
+        count, total = totals.get(span_dict['statement'], (0, 0.0))
+        totals[span_dict['statement']] = (count + 1, total + span_dict['duration_ms'])
+    for child in span_dict.get('children', []):
+        collect_statements(child, totals)
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(int(pct / 100 * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def analyze(entries, top=10):
+    """Group slow requests by route and by dominant span"""
+    by_route = {}
+    by_dominant = {}
+    statements = {}
+
+    for entry in entries:
+        by_route.setdefault(f"{entry['method']} {entry['endpoint']}", []).append(entry['duration_ms'])
+        by_dominant.setdefault(dominant_span(entry), []).append(entry['duration_ms'])
+        collect_statements(entry['spans'], statements)
+
+    def summarize(groups):
+        rows = []
+        for key, durations in groups.items():
+            durations.sort()
+            rows.append({
+                'key': key,
+                'count': len(durations),
+                'p50_ms': _percentile(durations, 50),
+                'p95_ms': _percentile(durations, 95),
+                'max_ms': durations[-1]
+            })
+        return sorted(rows, key=lambda row: (-row['count'], -row['max_ms']))
+
+    top_statements = sorted(statements.items(), key=lambda item: -item[1][1])[:top]
+    return {
+        'requests': len(entries),
+        'by_route': summarize(by_route),
+        'by_dominant_span': summarize(by_dominant),
+        'top_statements': [{'statement': statement, 'count': count, 'total_ms': round(total, 3)}
+                           for statement, (count, total) in top_statements]
+    }
+
+
+def read_entries(path):
+    """Read a slow log, skipping lines that are not valid JSON"""
+    entries = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+    return entries
+
+
+def print_report(report):
+    print(f"{report['requests']} slow requests\n")
+    for title, key in (('By route', 'by_route'), ('By dominant span', 'by_dominant_span')):
+        print(title)
+        print(f"  {'':<32}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+        for row in report[key]:
+            print(f"  {row['key']:<32}{row['count']:>7}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['max_ms']:>10.1f}")
+        print()
+    print("Top SQL statements by total time")
+    for row in report['top_statements']:
+        statement = ' '.join(row['statement'].split())
+        print(f"  {row['total_ms']:>10.1f} ms  x{row['count']:<5} {statement[:100]}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a slow request log")
+    parser.add_argument('path', nargs='?', default=os.path.join('logs', 'slow_requests.jsonl'))
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    parser.add_argument('--top', type=int, default=10, help="Number of SQL statements to list")
+    args = parser.parse_args(argv)
+
+    report = analyze(read_entries(args.path), top=args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,22 @@
+import pytest
+from flask import Flask
+
+from calculator import MolarMassCalculator
+from models import db
+
+
+@pytest.fixture
+def calculator():
+    return MolarMassCalculator()
+
+
+@pytest.fixture
+def database(tmp_path):
+    """App context bound to an empty SQLite database of its own"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'test.db'}"
+    db.init_app(app)
+    with app.app_context():
+        yield db
+        db.session.remove()
+        db.engine.dispose()
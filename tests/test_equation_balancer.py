@@ -0,0 +1,48 @@
+import pytest
+
+from equation_balancer import EquationBalancer
+
+
+@pytest.fixture
+def balancer(calculator):
+    return EquationBalancer(calculator)
+
+
+@pytest.mark.parametrize('equation, balanced', [
+    ('H2 + O2 -> H2O', '2 H2 + O2 -> 2 H2O'),
+    ('Fe + O2 -> Fe2O3', '4 Fe + 3 O2 -> 2 Fe2O3'),
+    ('C3H8 + O2 -> CO2 + H2O', 'C3H8 + 5 O2 -> 3 CO2 + 4 H2O'),
+    ('KMnO4 + HCl -> KCl + MnCl2 + H2O + Cl2', '2 KMnO4 + 16 HCl -> 2 KCl + 2 MnCl2 + 8 H2O + 5 Cl2'),
+    ('Cu + HNO3 -> Cu(NO3)2 + NO + H2O', '3 Cu + 8 HNO3 -> 3 Cu(NO3)2 + 2 NO + 4 H2O'),
+])
+def test_known_equations(balancer, equation, balanced):
+    result = balancer.balance(equation)
+    assert result['equation'] == balanced
+    assert result['reactant_mass'] == pytest.approx(result['product_mass'])
+
+
+def test_reactants_and_products_lists(balancer):
+    result = balancer.balance(['H2', 'O2'], ['H2O'])
+    assert [species['coefficient'] for species in result['species']] == [2, 1, 2]
+
+
+def test_given_coefficients_are_ignored_and_cached(balancer):
+    assert balancer.balance('2 H2 + O2 -> H2O')['equation'] == '2 H2 + O2 -> 2 H2O'
+    assert balancer.balance('H2 + O2 -> H2O')['cached']
+
+
+@pytest.mark.parametrize('equation, message', [
+    ('H2 -> O2', 'elements do not match'),
+    ('H2 + O2 -> H2O + H2O2', 'more than one independent balanced form'),
+    ('H2O -> H2O', 'only appear once'),
+    ('H2 + O2', 'exactly one arrow'),
+])
+def test_unbalanceable_equations(balancer, equation, message):
+    with pytest.raises(ValueError, match=message):
+        balancer.balance(equation)
+
+
+def test_balance_many_reports_errors_per_equation(balancer):
+    results = balancer.balance_many(['H2 + O2 -> H2O', 'junk'])
+    assert results[0]['equation'] == '2 H2 + O2 -> 2 H2O'
+    assert results[1]['input'] == 'junk' and 'error' in results[1]
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+from sqlalchemy import inspect, text
+
+import formula_table
+from formula_table import FormulaRegistry
+from models import CalculationHistory, Formula, SavedCompound
+
+
+@pytest.fixture
+def registry(calculator, database):
+    database.create_all()
+    return FormulaRegistry(calculator)
+
+
+def test_intern_returns_one_id_per_formula(registry, database):
+    water = registry.intern('H2O')
+    assert registry.intern('H2O') == water
+    assert registry.intern(' H2 O ') == water
+    assert registry.intern('NaCl') != water
+    assert database.session.query(Formula).count() == 2
+    # A new row is only cached once it has been read back, so the third lookup is the hit
+    assert registry.cache_info().hits == 1
+
+
+def test_intern_fills_in_the_row(registry, database):
+    row = database.session.get(Formula, registry.intern('C6H12O6'))
+    assert json.loads(row.composition) == {'C': 6, 'H': 12, 'O': 6}
+    assert row.molar_mass == pytest.approx(180.156, abs=1e-3)
+    assert row.atomic_weight_table == registry.calculator.table_version
+    assert row.composition_hash == registry.calculator.composition_hash('C6H12O6')
+
+
+def test_intern_rejects_empty_formulas(registry):
+    with pytest.raises(ValueError):
+        registry.intern('  ')
+
+
+def test_usage_groups_spellings_of_one_compound(registry, database):
+    for formula in ('CH3OH', 'CH4O', 'CH3OH', 'H2O'):
+        database.session.add(CalculationHistory(formula_id=registry.intern(formula), mode='1', molar_mass=1.0))
+    database.session.commit()
+    usage = registry.usage()
+    assert [entry['count'] for entry in usage] == [3, 1]
+    assert usage[1]['formula'] == 'H2O'
+
+
+LEGACY_SCHEMA = [
+    'CREATE TABLE saved_compound (id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL UNIQUE, '
+    'formula VARCHAR(200) NOT NULL, molar_mass FLOAT NOT NULL, created_at DATETIME)',
+    'CREATE TABLE calculation_history (id INTEGER PRIMARY KEY, formula VARCHAR(200) NOT NULL, '
+    'mode VARCHAR(10) NOT NULL, molar_mass FLOAT NOT NULL, input_value FLOAT, result_value FLOAT, '
+    'unit VARCHAR(10), created_at DATETIME)',
+]
+
+
+def test_migrate_legacy_database(calculator, database):
+    with database.engine.begin() as connection:
+        for statement in LEGACY_SCHEMA:
+            connection.execute(text(statement))
+        connection.execute(text("INSERT INTO saved_compound (name, formula, molar_mass) VALUES "
+                                "('Water', 'H2O', 18.015), ('Broken', 'KCl)', 74.55)"))
+        connection.execute(text("INSERT INTO calculation_history (formula, mode, molar_mass) VALUES "
+                                "('H2O', '1', 18.015), ('H2 O', '1', 18.015), ('NaCl', '1', 58.44)"))
+
+    registry = FormulaRegistry(calculator)
+    assert formula_table.migrate(registry)
+
+    columns = {column['name'] for column in inspect(database.engine).get_columns('calculation_history')}
+    assert 'formula' not in columns and {'formula_id', 'atomic_weight_table'} <= columns
+    history = database.session.query(CalculationHistory).order_by(CalculationHistory.id).all()
+    assert [entry.formula for entry in history] == ['H2O', 'H2O', 'NaCl']
+    assert history[0].formula_id == history[1].formula_id
+    # Masses computed before the migration have an unknown table
+    assert all(entry.atomic_weight_table is None for entry in history)
+
+    compounds = {compound.name: compound for compound in database.session.query(SavedCompound)}
+    assert compounds['Water'].composition_hash == calculator.composition_hash('H2O')
+    assert compounds['Broken'].composition_hash is None
+
+    # Interning after the migration finds the migrated rows
+    assert registry.intern('NaCl') == history[2].formula_id
+    assert not formula_table.migrate(registry)
@@ -0,0 +1,41 @@
+import pytest
+
+from isotope_engine import IsotopeEngine
+
+
+@pytest.fixture
+def isotopes(calculator):
+    return IsotopeEngine(calculator)
+
+
+def test_glucose_monoisotopic_mass(isotopes):
+    result = isotopes.pattern('C6H12O6')
+    assert result['monoisotopic_mass'] == pytest.approx(180.0634, abs=1e-4)
+    assert result['average_mass'] == pytest.approx(180.156, abs=1e-3)
+    assert result['peaks'][0]['relative_abundance'] == 100.0
+    # M+1 is mostly 13C: about 6.6 % per 6 carbons plus 2H and 17O
+    assert result['peaks'][1]['relative_abundance'] == pytest.approx(6.86, abs=0.05)
+
+
+def test_chlorine_isotope_pattern(isotopes):
+    peaks = isotopes.pattern('Cl2')['peaks']
+    assert [round(peak['mass']) for peak in peaks] == [70, 72, 74]
+    assert [round(peak['relative_abundance']) for peak in peaks] == [100, 64, 10]
+
+
+def test_charge_reports_mz(isotopes):
+    result = isotopes.pattern('C6H12O6', charge=1)
+    assert 'mz' in result['peaks'][0]
+    assert result['monoisotopic_mz'] == pytest.approx(180.0634 - 0.000549, abs=1e-4)
+
+
+@pytest.mark.parametrize('options', [{'resolution': 5}, {'threshold': 0}, {'threshold': 'x'}])
+def test_bad_options(isotopes, options):
+    with pytest.raises(ValueError):
+        isotopes.pattern('H2O', **options)
+
+
+def test_batch_reports_invalid_formulas(isotopes):
+    results = isotopes.batch(['H2O', 'Xx2'])
+    assert results[0]['monoisotopic_mass'] == pytest.approx(18.0106, abs=1e-4)
+    assert 'error' in results[1]
@@ -0,0 +1,57 @@
+import pytest
+
+from calculator import MolarMassCalculator
+from formula_table import FormulaRegistry
+from models import CalculationHistory, Formula, SavedCompound
+from recompute_masses import recompute
+
+
+@pytest.fixture
+def integer_weights():
+    return MolarMassCalculator.for_table('integer')
+
+
+@pytest.fixture
+def stored(calculator, database):
+    """Rows computed with the default table, plus a compound of unknown table"""
+    database.create_all()
+    registry = FormulaRegistry(calculator)
+    water = registry.intern('H2O')
+    mass = calculator.calculate_molar_mass('H2O')
+    version = calculator.table_version
+    database.session.add_all([
+        CalculationHistory(formula_id=water, mode='1', molar_mass=mass, atomic_weight_table=version),
+        # 2 mol of water weigh 2 * M g; 10 g of water are 10 / M mol
+        CalculationHistory(formula_id=water, mode='2', molar_mass=mass, input_value=2.0,
+                           result_value=2.0 * mass, atomic_weight_table=version),
+        CalculationHistory(formula_id=water, mode='3', molar_mass=mass, input_value=10.0,
+                           result_value=10.0 / mass, atomic_weight_table=version),
+        SavedCompound(name='Water', formula='H2O', molar_mass=18.015),
+        SavedCompound(name='Broken', formula='KCl)', molar_mass=74.55),
+    ])
+    database.session.commit()
+
+
+def test_history_results_are_rescaled(stored, database, integer_weights):
+    counts = recompute(integer_weights, chunk_size=2)
+    assert counts == {'saved_compound': 1, 'formula': 1, 'calculation_history': 3}
+
+    assert database.session.query(Formula).one().molar_mass == 18.0
+    modes = {entry.mode: entry for entry in database.session.query(CalculationHistory)}
+    assert all(entry.molar_mass == 18.0 and entry.atomic_weight_table == 'integer' for entry in modes.values())
+    assert modes['2'].result_value == pytest.approx(36.0)  # reagent mass scales with the molar mass
+    assert modes['3'].result_value == pytest.approx(10.0 / 18.0)  # moles scale inversely
+
+
+def test_unparseable_compounds_are_left_alone(stored, database, integer_weights):
+    recompute(integer_weights)
+    compounds = {compound.name: compound for compound in database.session.query(SavedCompound)}
+    assert compounds['Water'].molar_mass == 18.0
+    assert compounds['Broken'].molar_mass == 74.55
+    assert compounds['Broken'].atomic_weight_table is None
+
+
+def test_rerun_only_touches_stale_rows(stored, integer_weights):
+    recompute(integer_weights)
+    assert recompute(integer_weights) == {'saved_compound': 0, 'formula': 0, 'calculation_history': 0}
+    assert recompute(integer_weights, force=True)['calculation_history'] == 3